@@ -1,9 +1,31 @@
 # /home/frappe/frappe-bench/apps/helpdesk/helpdesk/api/ai_log.py
 
 from __future__ import annotations
+import json
 from typing import Any, Dict, List
 import frappe
-from frappe.utils import now_datetime, cint
+from frappe.model.naming import parse_naming_series
+from frappe.utils import now_datetime, cint, cstr
+
+from helpdesk.helpdesk.doctype.ai_interaction_rollup.ai_interaction_rollup import (
+    record as record_rollup,
+)
+from helpdesk.helpdesk.utils.settings_snapshot import get_ai_settings
+
+LOG_DT = "AI Interaction Log"
+NAMING_SERIES = "AIL-.YYYY.-.########"
+
+# TR: Tamponlu yazım — kayıtlar istek içinde DB'ye değil Redis listesine gider;
+#     `flush` (dakikalık cron veya eşik aşımında kuyruğa alınan iş) toplu ekler.
+BUFFER_KEY = "helpdesk:ai_log:buffer"
+FLUSH_BATCH = 500
+FLUSH_MAX_BATCHES = 20
+# TR: Satır satır denemede de hiç yazılamayan parti (DB/şema hatası olabilir)
+#     bu kadar ardışık denemeden sonra ölü mektup listesine taşınır.
+DEAD_LETTER_KEY = "helpdesk:ai_log:dead"
+DEAD_LETTER_MAX = 10000
+FAILED_FLUSHES_KEY = "helpdesk:ai_log:failed_flushes"
+FLUSH_MAX_ATTEMPTS = 5
 
 def _safe_get_ticket_subject(ticket: str | None) -> str:
     """# TR: HD Ticket başlığını güvenli biçimde al (yoksa boş döner)."""
@@ -45,9 +67,12 @@ def _compose_subject(
     preview_flag: int | bool,
     request: Dict[str, Any] | None,
     result: Dict[str, Any] | None,
+    ticket_subject: str | None = None,
 ) -> str:
-    """# TR: Anlamlı ve tutarlı subject oluşturur."""
-    ticket_subject = _safe_get_ticket_subject(ticket)
+    """# TR: Anlamlı ve tutarlı subject oluşturur.
+    ticket_subject verilmezse HD Ticket başlığı tek sorguyla okunur (flush toplu okur)."""
+    if ticket_subject is None:
+        ticket_subject = _safe_get_ticket_subject(ticket)
     parts = []  # TR: Subject parçaları
 
     # TR: [Status] [Source/Direction]
@@ -80,6 +105,45 @@ def _compose_subject(
         subject = f"{action} — {ticket}"
     return subject[:140]  # TR: Aşırı uzamayı kes
 
+def _direction(direction: str | None, result: Dict[str, Any] | None) -> str:
+    # TR: Direction — sonuç varsa Response, yoksa Request (manuel değer öncelikli)
+    if direction:
+        return direction
+    try:
+        has_result = bool(result) and (len(result) > 0)
+    except Exception:
+        has_result = False
+    return "Response" if has_result else "Request"
+
+
+def _buffering_enabled() -> bool:
+    try:
+        return bool(cint(getattr(get_ai_settings(), "ai_log_buffered", 0)))
+    except Exception:
+        return False
+
+
+def _flush_size() -> int:
+    try:
+        return max(cint(getattr(get_ai_settings(), "ai_log_flush_size", 0)) or 200, 1)
+    except Exception:
+        return 200
+
+
+def _push(entry: Dict[str, Any]):
+    """# TR: Kaydı Redis listesine ekle; eşik aşılırsa flush işini kuyruğa al."""
+    cache = frappe.cache()
+    cache.rpush(BUFFER_KEY, json.dumps(entry, default=str))
+    size = _flush_size()
+    if cache.llen(BUFFER_KEY) % size == 0:
+        frappe.enqueue(
+            "helpdesk.api.ai_log.flush",
+            queue="short",
+            job_id="helpdesk:ai_log:flush",
+            deduplicate=True,
+        )
+
+
 def write(
     ticket: str,
     action: str,
@@ -93,13 +157,39 @@ def write(
     subject: str | None = None,              # NEW: isteğe bağlı subject
     direction: str | None = None,            # NEW: isteğe bağlı direction
 ):
+    preview_flag = 1 if cint(preview) else 0
+    if _buffering_enabled():
+        # TR: Tamponlu yol — DB'ye dokunmaz, çağıranın transaction'ını commit etmez.
+        #     Subject boşsa flush sırasında toplu ticket başlığı sorgusuyla oluşturulur.
+        try:
+            _push({
+                "ticket": ticket,
+                "action": action,
+                "status": status,
+                "source": source,
+                "preview": preview_flag,
+                "subject": (subject or "").strip(),
+                "direction": _direction(direction, result),
+                "subject_direction": direction,
+                "request_json": frappe.as_json(request or {}),
+                "result_json": frappe.as_json(result or {}),
+                "meta_json": frappe.as_json(meta) if meta else None,
+                "event_ts": str(now_datetime()),
+                "user": getattr(frappe.session, "user", None),
+                "ip_address": getattr(frappe.local, "request_ip", None),
+            })
+            return
+        except Exception as e:
+            # TR: Redis erişilemezse doğrudan yazıma düş
+            frappe.log_error(f"ai_log.buffer: {e}", "HelpdeskAI")
+
     try:
-        doc = frappe.new_doc("AI Interaction Log")
+        doc = frappe.new_doc(LOG_DT)
         doc.ticket = ticket
         doc.action = action
         doc.status = status
         doc.source = source
-        doc.preview = 1 if cint(preview) else 0
+        doc.preview = preview_flag
 
         # TR: Subject — verilen değeri kullan; yoksa akıllı oluşturucu
         doc.subject = (subject or "").strip() or _compose_subject(
@@ -113,15 +203,7 @@ def write(
             result=result,
         )
 
-        # TR: Direction — sonuç varsa Response, yoksa Request (manuel değer öncelikli)
-        if direction:
-            doc.direction = direction
-        else:
-            try:
-                has_result = bool(result) and (len(result) > 0)
-            except Exception:
-                has_result = False
-            doc.direction = "Response" if has_result else "Request"
+        doc.direction = _direction(direction, result)
 
         doc.request_json = frappe.as_json(request or {})
         doc.result_json  = frappe.as_json(result  or {})
@@ -138,6 +220,169 @@ def write(
             pass
 
         doc.insert(ignore_permissions=True)
+        record_rollup([doc.as_dict()])
         frappe.db.commit()
     except Exception as e:
         frappe.log_error(f"ai_log.write: {e}", "HelpdeskAI")
+
+
+# ---------------------------------------------------------------------------
+# Toplu yazım (flush)
+# ---------------------------------------------------------------------------
+
+def _drain(count: int) -> List[bytes]:
+    """# TR: Listenin başından `count` kaydı atomik olarak al (MULTI/EXEC)."""
+    cache = frappe.cache()
+    key = cache.make_key(BUFFER_KEY)
+    pipe = cache.pipeline()
+    pipe.lrange(key, 0, count - 1)
+    pipe.ltrim(key, count, -1)
+    rows, _ = pipe.execute()
+    return rows or []
+
+
+def _requeue(raw: List[bytes]):
+    """# TR: Yazılamayan kayıtları sıralarını koruyarak listenin başına geri koy."""
+    cache = frappe.cache()
+    cache.pipeline().lpush(cache.make_key(BUFFER_KEY), *reversed(raw)).execute()
+
+
+def _dead_letter(raw: List[bytes]):
+    """# TR: Yazılamayan kayıtları ayrı listeye al (incelemek için; boyutu sınırlı)."""
+    cache = frappe.cache()
+    key = cache.make_key(DEAD_LETTER_KEY)
+    pipe = cache.pipeline()
+    pipe.rpush(key, *raw)
+    pipe.ltrim(key, -DEAD_LETTER_MAX, -1)
+    pipe.execute()
+
+
+def _insert_each(pairs: List[tuple]) -> tuple[int, List[bytes]]:
+    """# TR: Toplu ekleme başarısız olunca satırları tek tek dene; (yazılan, hatalı ham) döner."""
+    written, failed = 0, []
+    for r, entry in pairs:
+        try:
+            _insert_batch([entry])
+            frappe.db.commit()
+            written += 1
+        except Exception:
+            frappe.db.rollback()
+            failed.append(r)
+    return written, failed
+
+
+def _reserve_names(count: int) -> List[str]:
+    """# TR: Seri sayacını tek seferde `count` kadar ilerletip isim bloğu ayırır."""
+    prefix = parse_naming_series(NAMING_SERIES.rsplit(".", 1)[0] + ".")
+    current = frappe.db.sql("SELECT `current` FROM `tabSeries` WHERE `name`=%s FOR UPDATE", prefix)
+    if current and current[0][0] is not None:
+        start = cint(current[0][0])
+        frappe.db.sql("UPDATE `tabSeries` SET `current` = `current` + %s WHERE `name`=%s", (count, prefix))
+    else:
+        start = 0
+        frappe.db.sql("INSERT INTO `tabSeries` (`name`, `current`) VALUES (%s, %s)", (prefix, count))
+    digits = len(NAMING_SERIES.rsplit(".", 1)[1])
+    return [f"{prefix}{i:0{digits}d}" for i in range(start + 1, start + count + 1)]
+
+
+def _ticket_subjects(tickets: List[str]) -> Dict[str, str]:
+    if not tickets:
+        return {}
+    rows = frappe.get_all(
+        "HD Ticket", filters={"name": ["in", tickets]}, fields=["name", "subject"]
+    )
+    return {r.name: (r.subject or "").strip() for r in rows}
+
+
+def _insert_batch(entries: List[Dict[str, Any]]):
+    subjects = _ticket_subjects(
+        sorted({cstr(e["ticket"]) for e in entries if e.get("ticket") and not e.get("subject")})
+    )
+    names = _reserve_names(len(entries))
+    now = now_datetime()
+    fields = [
+        "name", "owner", "creation", "modified", "modified_by", "docstatus", "idx",
+        "naming_series", "subject", "ticket", "action", "source", "direction", "status",
+        "preview", "event_ts", "request_json", "result_json", "meta_json", "user", "ip_address",
+    ]
+    values = []
+    for name, e in zip(names, entries):
+        subject = e.get("subject") or _compose_subject(
+            ticket=e.get("ticket"),
+            action=e.get("action"),
+            status=e.get("status"),
+            source=e.get("source"),
+            direction=e.get("subject_direction"),
+            preview_flag=e.get("preview"),
+            request=json.loads(e.get("request_json") or "{}"),
+            result=json.loads(e.get("result_json") or "{}"),
+            ticket_subject=subjects.get(cstr(e.get("ticket")), ""),
+        )
+        user = e.get("user") or "Guest"
+        values.append((
+            name, user, now, now, user, 0, 0,
+            NAMING_SERIES, subject, e.get("ticket") or None, e.get("action"), e.get("source"),
+            e.get("direction"), e.get("status"), cint(e.get("preview")), e.get("event_ts"),
+            e.get("request_json"), e.get("result_json"), e.get("meta_json"), e.get("user"),
+            e.get("ip_address"),
+        ))
+    frappe.db.bulk_insert(LOG_DT, fields, values)
+    record_rollup(entries)
+
+
+def flush(max_batches: int = FLUSH_MAX_BATCHES) -> int:
+    """
+    # TR: Redis tamponundaki kayıtları FLUSH_BATCH'lik parçalar halinde toplu ekler.
+    Dakikalık cron ve eşik aşımında kuyruğa alınan iş çağırır. Eklenen kayıt sayısını döner.
+    """
+    written = 0
+    cache = frappe.cache()
+    for _ in range(max(cint(max_batches), 1)):
+        raw = _drain(FLUSH_BATCH)
+        if not raw:
+            break
+        pairs = []
+        for r in raw:
+            try:
+                pairs.append((r, json.loads(r)))
+            except Exception:
+                continue
+        try:
+            if pairs:
+                _insert_batch([e for _, e in pairs])
+            frappe.db.commit()
+            written += len(pairs)
+            cache.delete_value(FAILED_FLUSHES_KEY)
+            continue
+        except Exception as e:
+            frappe.db.rollback()
+            error = e
+
+        # TR: Tek bozuk kayıt tüm partiyi kilitlemesin: satır satır yaz, kalanları ayır
+        ok, failed = _insert_each(pairs)
+        written += ok
+        if ok:
+            cache.delete_value(FAILED_FLUSHES_KEY)
+            if failed:
+                _dead_letter(failed)
+                frappe.log_error(
+                    f"ai_log.flush: {len(failed)} entries moved to {DEAD_LETTER_KEY}: {error}",
+                    "HelpdeskAI",
+                )
+            continue
+
+        # TR: Hiçbiri yazılamadı → muhtemelen geçici hata; sırayı koruyup sonra tekrar dene
+        attempts = cint(cache.get_value(FAILED_FLUSHES_KEY)) + 1
+        if attempts >= FLUSH_MAX_ATTEMPTS:
+            _dead_letter(raw)
+            cache.delete_value(FAILED_FLUSHES_KEY)
+            frappe.log_error(
+                f"ai_log.flush: batch moved to {DEAD_LETTER_KEY} after {attempts} attempts: {error}",
+                "HelpdeskAI",
+            )
+            continue
+        cache.set_value(FAILED_FLUSHES_KEY, attempts)
+        _requeue(raw)
+        frappe.log_error(f"ai_log.flush: {error}", "HelpdeskAI")
+        break
+    return written
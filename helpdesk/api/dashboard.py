@@ -1,8 +1,45 @@
+import hashlib
+from functools import partial
+
 import frappe
 from frappe import _
 
+from helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee import (
+    assigned_tickets_condition,
+)
+from helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch import (
+    get_percentiles,
+)
 from helpdesk.utils import agent_only
 
+ROLLUP_DOCTYPE = "HD Ticket Daily Rollup"
+
+DASHBOARD_VERSION_KEY = "helpdesk:dashboard:version"
+DASHBOARD_CACHE_KEY = "helpdesk:dashboard:{0}:{1}:{2}"
+DASHBOARD_CACHE_TTL = 10 * 60
+DASHBOARD_TYPES = ("number_card", "master", "trend")
+
+# Ranges the dashboard offers as presets ("Last N Days"), kept pre-computed
+# per team by `prewarm_cache`
+PREWARM_RANGES = (7, 30, 90)
+PREWARM_KEY = "helpdesk:dashboard:prewarm:{0}:{1}"
+PREWARM_STAMP_KEY = "helpdesk:dashboard:prewarm_stamp:{0}:{1}"
+PREWARM_TTL = 60 * 60
+
+# Ticket fields that feed the dashboard; other edits keep the cache
+DASHBOARD_FIELDS = (
+    "status",
+    "agent_group",
+    "_assign",
+    "priority",
+    "ticket_type",
+    "via_customer_portal",
+    "agreement_status",
+    "first_responded_on",
+    "resolution_date",
+    "feedback_rating",
+)
+
 
 @frappe.whitelist()
 @agent_only
@@ -33,6 +70,19 @@ def get_dashboard_data(dashboard_type, filters=None):
     if not to_date:
         to_date = frappe.utils.nowdate()
 
+    days = None if agent else get_prewarm_days(from_date, to_date)
+    if days:
+        data = get_prewarmed(dashboard_type, days, team)
+        if data is not None:
+            return data
+
+    return build_dashboard_data(dashboard_type, from_date, to_date, team, agent)
+
+
+def build_dashboard_data(dashboard_type, from_date, to_date, team=None, agent=None):
+    """
+    Compute (or read from the per-version cache) one dashboard payload.
+    """
     _filters = frappe._dict(
         from_date=from_date,
         to_date=to_date,
@@ -44,118 +94,195 @@ def get_dashboard_data(dashboard_type, filters=None):
         conds += f" AND agent_group='{_filters.team}'"
 
     if _filters.agent:
-        conds += f" AND JSON_SEARCH(_assign, 'one', '{_filters.agent}') IS NOT NULL"
+        conds += f" AND {assigned_tickets_condition(_filters.agent)}"
 
     if dashboard_type == "number_card":
-        return get_number_card_data(from_date, to_date, conds)
+        return get_cached(
+            "number_card",
+            (from_date, to_date, team, agent),
+            lambda: get_number_card_data(from_date, to_date, conds)
+            # Time sketches have no agent dimension
+            + ([] if agent else get_percentile_cards(from_date, to_date, team)),
+        )
     elif dashboard_type == "master":
-        return get_master_dashboard_data(
-            from_date, to_date, _filters.team, _filters.agent
+        return get_cached(
+            "master",
+            (from_date, to_date, team, agent),
+            lambda: get_master_dashboard_data(
+                from_date, to_date, _filters.team, _filters.agent
+            ),
         )
     elif dashboard_type == "trend":
-        return get_trend_data(from_date, to_date, conds)
+        return get_trend_data(from_date, to_date, conds, _filters.team, _filters.agent)
 
 
-def get_number_card_data(from_date, to_date, conds=""):
+def _get_version():
+    version = frappe.cache().get_value(DASHBOARD_VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(DASHBOARD_VERSION_KEY, version)
+    return version
+
+
+def _bump_version():
+    frappe.cache().set_value(DASHBOARD_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def invalidate_cache(doc=None, method=None):
     """
-    Get number card data for the dashboard.
+    HD Ticket doc_events: drop cached dashboard data when a ticket that feeds
+    it is created, deleted or has one of `DASHBOARD_FIELDS` changed.
     """
+    if doc and method == "on_update" and doc.get_doc_before_save():
+        if not any(doc.has_value_changed(f) for f in DASHBOARD_FIELDS):
+            return
+    _bump_version()
+    # Another worker may have cached pre-commit data under the new version
+    frappe.db.after_commit.add(_bump_version)
 
-    ticket_chart_data = get_ticket_count(from_date, to_date, conds)
-    sla_fulfilled_count = get_sla_fulfilled_count(from_date, to_date, conds)
-    avg_first_response_time = get_avg_first_response_time(from_date, to_date, conds)
-    avg_resolution_time = get_avg_resolution_time(from_date, to_date, conds)
-    avg_feedback_score = get_avg_feedback_score(from_date, to_date, conds)
-
-    return [
-        ticket_chart_data,
-        sla_fulfilled_count,
-        avg_first_response_time,
-        avg_resolution_time,
-        avg_feedback_score,
-    ]
+    if doc:
+        stamps = get_stale_prewarm_stamps(doc)
+        _bump_prewarm_stamps(stamps)
+        frappe.db.after_commit.add(partial(_bump_prewarm_stamps, stamps))
 
 
-def get_ticket_count(from_date, to_date, conds="", return_result=False):
+def get_cached(dashboard_type, key, build):
     """
-    Get ticket data for the dashboard.
+    Return `build()` cached per dashboard version and (range, team, agent) key.
     """
-    diff = frappe.utils.date_diff(to_date, from_date)
-    if diff == 0:
-        diff = 1
+    digest = hashlib.md5(frappe.as_json(key).encode()).hexdigest()
+    cache_key = DASHBOARD_CACHE_KEY.format(_get_version(), dashboard_type, digest)
+    data = frappe.cache().get_value(cache_key)
+    if data is None:
+        data = build()
+        frappe.cache().set_value(cache_key, data, expires_in_sec=DASHBOARD_CACHE_TTL)
+    return data
 
-    result = frappe.db.sql(
-        f"""
-		SELECT
-            COUNT(CASE
-                WHEN creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-                {conds}
-                THEN name
-                ELSE NULL
-            END) as current_month_tickets,
-
-            COUNT(CASE
-                WHEN creation >= %(prev_from_date)s AND creation < %(from_date)s 
-                {conds}
-                THEN name
-                ELSE NULL
-            END) as prev_month_tickets
-		FROM `tabHD Ticket`
-    """,
-        {
-            "from_date": from_date,
-            "to_date": to_date,
-            "prev_from_date": frappe.utils.add_days(from_date, -diff),
-        },
-        as_dict=1,
-    )
 
-    if return_result:
-        return result
+def _get_prewarm_stamp(team, days):
+    key = PREWARM_STAMP_KEY.format(team or "", days)
+    stamp = frappe.cache().get_value(key)
+    if not stamp:
+        stamp = frappe.generate_hash(length=10)
+        frappe.cache().set_value(key, stamp)
+    return stamp
 
-    current_month_tickets = result[0].current_month_tickets or 0
-    prev_month_tickets = result[0].prev_month_tickets or 0
 
-    delta_in_percentage = (
-        (current_month_tickets - prev_month_tickets) / prev_month_tickets * 100
-        if prev_month_tickets
-        else 0
-    )
+def _bump_prewarm_stamps(stamps):
+    for team, days in stamps:
+        frappe.cache().set_value(
+            PREWARM_STAMP_KEY.format(team, days), frappe.generate_hash(length=10)
+        )
 
-    return {
-        "title": "Tickets",
-        "value": current_month_tickets,
-        "delta": delta_in_percentage,
-        "deltaSuffix": "%",
-        "negativeIsBetter": True,
-        "tooltip": "Total number of tickets created",
+
+def get_stale_prewarm_stamps(doc):
+    """
+    (team, days) pre-warmed payloads a ticket change affects: all teams and the
+    ticket's old and new team, for every range whose window, including the
+    previous period the number cards compare against, covers its creation.
+    """
+    if not doc.get("creation"):
+        return []
+    age = frappe.utils.date_diff(frappe.utils.nowdate(), doc.creation)
+    before = doc.get_doc_before_save()
+    teams = {
+        "",
+        doc.get("agent_group") or "",
+        before and before.get("agent_group") or "",
     }
+    return [
+        (team, days) for days in PREWARM_RANGES if age <= 2 * days for team in teams
+    ]
+
 
+def get_prewarm_days(from_date, to_date):
+    """Days in (from_date, to_date) when it is a preset range ending today."""
+    if frappe.utils.getdate(to_date) != frappe.utils.getdate():
+        return None
+    days = frappe.utils.date_diff(to_date, from_date)
+    return days if days in PREWARM_RANGES else None
+
+
+def get_prewarmed(dashboard_type, days, team=None):
+    """Pre-warmed payload, or None when missing or stale."""
+    data = frappe.cache().get_value(PREWARM_KEY.format(team or "", days))
+    if (
+        not data
+        or data["to_date"] != frappe.utils.nowdate()
+        or data["stamp"] != _get_prewarm_stamp(team, days)
+    ):
+        return None
+    return data[dashboard_type]
+
+
+def prewarm_cache():
+    """
+    Scheduled: compute the standard ranges for all teams and for every team.
+    Payloads whose stamp has not moved since they were built are kept.
+    """
+    to_date = frappe.utils.nowdate()
+    teams = [None, *frappe.get_all("HD Team", pluck="name")]
+    for days in PREWARM_RANGES:
+        from_date = frappe.utils.add_days(to_date, -days)
+        for team in teams:
+            if get_prewarmed("number_card", days, team) is not None:
+                continue
+            # Read before building: a change while building leaves it stale
+            data = {"stamp": _get_prewarm_stamp(team, days), "to_date": to_date}
+            for dashboard_type in DASHBOARD_TYPES:
+                data[dashboard_type] = build_dashboard_data(
+                    dashboard_type, from_date, to_date, team
+                )
+            frappe.cache().set_value(
+                PREWARM_KEY.format(team or "", days), data, expires_in_sec=PREWARM_TTL
+            )
 
-def get_sla_fulfilled_count(from_date, to_date, conds=""):
+
+def get_number_card_data(from_date, to_date, conds=""):
     """
-    Get the percent of SLA tickets fulfilled for the dashboard.
+    Get number card data for the dashboard.
+
+    All cards and their previous-period values come from a single scan of the
+    tickets created in [previous period start, to_date].
     """
     diff = frappe.utils.date_diff(to_date, from_date)
     if diff == 0:
         diff = 1
 
+    current = "creation >= %(from_date)s"
+    previous = "creation < %(from_date)s"
+    resolved = "status in ('Resolved', 'Closed')"
     result = frappe.db.sql(
         f"""
-        SELECT 
-            COUNT(CASE 
-                WHEN creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY) AND agreement_status = 'Fulfilled'
-                {conds}
-                THEN name
-                ELSE NULL
-            END) as current_month_fulfilled,
-            COUNT(CASE 
-                WHEN creation >= %(prev_from_date)s AND creation < %(from_date)s AND agreement_status = 'Fulfilled'
-                {conds}
-                THEN name 
-                ELSE NULL
-            END) as prev_month_fulfilled
+        SELECT
+            COUNT(CASE WHEN {current} THEN name END) as current_tickets,
+            COUNT(CASE WHEN {previous} THEN name END) as prev_tickets,
+            COUNT(CASE WHEN {current} AND {resolved} THEN name END) as current_resolved,
+            COUNT(CASE WHEN {previous} AND {resolved} THEN name END) as prev_resolved,
+            COUNT(CASE WHEN {current} AND agreement_status = 'Fulfilled' THEN name END)
+                as current_fulfilled,
+            COUNT(CASE WHEN {previous} AND agreement_status = 'Fulfilled' THEN name END)
+                as prev_fulfilled,
+            AVG(CASE WHEN {current} AND first_responded_on IS NOT NULL
+                THEN TIMESTAMPDIFF(SECOND, creation, first_responded_on) END)
+                as current_first_response,
+            AVG(CASE WHEN {previous} AND first_responded_on IS NOT NULL
+                THEN TIMESTAMPDIFF(SECOND, creation, first_responded_on) END)
+                as prev_first_response,
+            AVG(CASE WHEN {current} AND {resolved}
+                THEN TIMESTAMPDIFF(DAY, creation, resolution_date) END)
+                as current_resolution,
+            AVG(CASE WHEN {previous} AND {resolved}
+                THEN TIMESTAMPDIFF(DAY, creation, resolution_date) END)
+                as prev_resolution,
+            AVG(CASE WHEN {current} AND feedback_rating > 0 THEN feedback_rating END)
+                as current_feedback,
+            AVG(CASE WHEN {previous} AND feedback_rating > 0 THEN feedback_rating END)
+                as prev_feedback
         FROM `tabHD Ticket`
+        WHERE creation >= %(prev_from_date)s
+            AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+            {conds}
     """,
         {
             "from_date": from_date,
@@ -163,219 +290,224 @@ def get_sla_fulfilled_count(from_date, to_date, conds=""):
             "prev_from_date": frappe.utils.add_days(from_date, -diff),
         },
         as_dict=1,
-    )
+    )[0]
 
-    current_month_fulfilled = result[0].current_month_fulfilled or 0
-    prev_month_fulfilled = result[0].prev_month_fulfilled or 0
+    return [
+        ticket_count_card(result.current_tickets or 0, result.prev_tickets or 0),
+        sla_fulfilled_card(
+            result.current_fulfilled or 0,
+            result.prev_fulfilled or 0,
+            result.current_resolved or 0,
+            result.prev_resolved or 0,
+        ),
+        first_response_card(result.current_first_response, result.prev_first_response),
+        resolution_card(result.current_resolution, result.prev_resolution),
+        feedback_card(result.current_feedback, result.prev_feedback),
+    ]
 
-    # Only these tickets should be counted
-    conds += " AND status in ('Resolved', 'Closed')"
 
-    ticket_count = (
-        get_ticket_count(from_date, to_date, conds, True)[0] if len(result) > 0 else 1
+def get_percentile_cards(from_date, to_date, team=None):
+    """
+    p90 first response and resolution cards, merged from the daily time
+    sketches of the period and of the previous one.
+    """
+    diff = frappe.utils.date_diff(to_date, from_date) or 1
+    current = get_percentiles(from_date, to_date, team)
+    prev = get_percentiles(
+        frappe.utils.add_days(from_date, -diff),
+        frappe.utils.add_days(from_date, -1),
+        team,
     )
+    return [
+        percentile_card(
+            "First Response", current.first_response, prev.first_response, 3600, "hrs"
+        ),
+        percentile_card(
+            "Resolution", current.resolution, prev.resolution, 86400, "days"
+        ),
+    ]
 
-    current_month_fulfilled_percentage = (
-        current_month_fulfilled / ticket_count.current_month_tickets * 100
-        if ticket_count.current_month_tickets
-        else 0
-    )
-    prev_month_fulfilled_percentage = (
-        prev_month_fulfilled / ticket_count.prev_month_tickets * 100
-        if ticket_count.prev_month_tickets
-        else 0
-    )
-    delta_in_percentage = (
-        current_month_fulfilled_percentage - prev_month_fulfilled_percentage
+
+def percentile_card(label, current, prev, unit_seconds, unit):
+    p50, p90, p99 = (
+        (current.get(p) or 0) / unit_seconds for p in ("p50", "p90", "p99")
     )
+    prev_p90 = (prev.p90 or 0) / unit_seconds
+    return {
+        "title": f"P90 {label}",
+        "value": p90,
+        "suffix": f" {unit}",
+        "delta": p90 - prev_p90 if prev_p90 else 0,
+        "deltaSuffix": f" {unit}",
+        "negativeIsBetter": True,
+        "tooltip": f"90% of tickets within this time "
+        f"(median {p50:.1f} {unit}, p99 {p99:.1f} {unit})",
+    }
+
+
+def ticket_count_card(current, prev):
+    return {
+        "title": "Tickets",
+        "value": current,
+        "delta": (current - prev) / prev * 100 if prev else 0,
+        "deltaSuffix": "%",
+        "negativeIsBetter": True,
+        "tooltip": "Total number of tickets created",
+    }
+
+
+def sla_fulfilled_card(
+    current_fulfilled, prev_fulfilled, current_resolved, prev_resolved
+):
+    # Percentages are over resolved/closed tickets only
+    current = current_fulfilled / current_resolved * 100 if current_resolved else 0
+    prev = prev_fulfilled / prev_resolved * 100 if prev_resolved else 0
     return {
         "title": "% SLA Fulfilled",
-        "value": current_month_fulfilled_percentage,
+        "value": current,
         "suffix": "%",
-        "delta": delta_in_percentage,
+        "delta": current - prev,
         "deltaSuffix": "%",
         "tooltip": "% of tickets created that were resolved within SLA",
     }
 
 
-def get_avg_first_response_time(from_date, to_date, conds=""):
-    """
-    first_response_time is the time taken to first respond to a ticket.
-    Get average first response time for the dashboard.
-    """
-    diff = frappe.utils.date_diff(to_date, from_date)
-    if diff == 0:
-        diff = 1
-
-    result = frappe.db.sql(
-        f"""
-        SELECT 
-            AVG(CASE 
-                WHEN creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY) AND first_responded_on IS NOT NULL
-                {conds}
-                THEN TIMESTAMPDIFF(SECOND, creation, first_responded_on)
-                ELSE NULL
-            END) as current_month_avg,
-            AVG(CASE 
-                When creation >= %(prev_from_date)s AND creation < %(from_date)s AND first_responded_on IS NOT NULL
-                {conds}
-                THEN TIMESTAMPDIFF(SECOND, creation, first_responded_on)
-                ELSE NULL
-            END) as prev_month_avg
-        FROM `tabHD Ticket`
-    """,
-        {
-            "from_date": from_date,
-            "to_date": to_date,
-            "prev_from_date": frappe.utils.add_days(from_date, -diff),
-        },
-        as_dict=1,
-    )
+def first_response_card(current_seconds, prev_seconds):
     seconds_to_hours = 3600
-    current_month_avg = (
-        result[0].current_month_avg / seconds_to_hours
-        if result[0].current_month_avg
-        else 0
-    )
-    prev_month_avg = (
-        result[0].prev_month_avg / seconds_to_hours if result[0].prev_month_avg else 0
-    )
-
-    delta = current_month_avg - prev_month_avg if prev_month_avg else 0
-
+    current = current_seconds / seconds_to_hours if current_seconds else 0
+    prev = prev_seconds / seconds_to_hours if prev_seconds else 0
     return {
         "title": "Avg. First Response",
-        "value": current_month_avg,
+        "value": current,
         "suffix": " hrs",
-        "delta": delta,
+        "delta": current - prev if prev else 0,
         "deltaSuffix": " hrs",
         "negativeIsBetter": True,
         "tooltip": "Avg. time taken to first respond to a ticket",
     }
 
 
-def get_avg_resolution_time(from_date, to_date, conds=""):
-    """
-    Get average resolution time for the dashboard.
-    """
-    diff = frappe.utils.date_diff(to_date, from_date)
-    if diff == 0:
-        diff = 1
-
-    result = frappe.db.sql(
-        f"""
-        SELECT 
-            AVG(CASE 
-                WHEN status in ('Resolved', 'Closed') AND creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
-                {conds}
-                THEN TIMESTAMPDIFF(DAY, creation, resolution_date)
-                ELSE NULL
-            END) as current_month_avg,
-            AVG(CASE 
-                When status in ('Resolved', 'Closed') AND creation >= %(prev_from_date)s AND creation < %(from_date)s
-                {conds}
-                THEN TIMESTAMPDIFF(DAY, creation, resolution_date)
-                ELSE NULL
-            END) as prev_month_avg
-        FROM `tabHD Ticket`
-    """,
-        {
-            "from_date": from_date,
-            "to_date": to_date,
-            "prev_from_date": frappe.utils.add_days(from_date, -diff),
-        },
-        as_dict=1,
-    )
-    current_month_avg = result[0].current_month_avg or 0
-    prev_month_avg = result[0].prev_month_avg or 0
-
-    delta = current_month_avg - prev_month_avg if prev_month_avg else 0
+def resolution_card(current, prev):
+    current = current or 0
+    prev = prev or 0
     return {
         "title": "Avg. Resolution",
-        "value": current_month_avg,
+        "value": current,
         "suffix": " days",
-        "delta": delta,
+        "delta": current - prev if prev else 0,
         "deltaSuffix": " days",
         "negativeIsBetter": True,
         "tooltip": "Avg. time taken to resolve a ticket",
     }
 
 
-def get_avg_feedback_score(from_date, to_date, conds=""):
-    """
-    Get average feedback score for the dashboard.
-    """
-    diff = frappe.utils.date_diff(to_date, from_date)
-    if diff == 0:
-        diff = 1
-
-    result = frappe.db.sql(
-        f"""
-        SELECT 
-            AVG(CASE 
-                WHEN creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY) AND feedback_rating > 0
-                {conds}
-                THEN feedback_rating 
-                ELSE NULL
-            END) as current_month_avg,
-            AVG(CASE 
-                WHEN creation >= %(prev_from_date)s AND creation < %(from_date)s AND feedback_rating > 0 
-                {conds}
-                THEN feedback_rating 
-                ELSE NULL
-            END) as prev_month_avg
-        FROM `tabHD Ticket`
-    """,
-        {
-            "from_date": from_date,
-            "to_date": to_date,
-            "prev_from_date": frappe.utils.add_days(from_date, -diff),
-        },
-        as_dict=1,
-    )
-
-    current_month_avg = result[0].current_month_avg or 0
-    prev_month_avg = result[0].prev_month_avg or 0
-
-    delta = current_month_avg - prev_month_avg
-
+def feedback_card(current, prev):
+    current = current or 0
+    prev = prev or 0
     return {
         "title": "Avg. Feedback Rating",
-        "value": current_month_avg * 5,
+        "value": current * 5,
         "suffix": "/5",
-        "delta": delta * 5,
+        "delta": (current - prev) * 5,
         "deltaSuffix": " stars",
         "tooltip": "Avg. feedback rating for the tickets resolved",
     }
 
 
-def get_master_dashboard_data(from_date, to_date, team=None, agent=None):
-    filters = {
-        "creation": ["between", [from_date, to_date]],
-    }
+def get_rollup_filters(from_date, to_date, team=None):
+    filters = {"day": ["between", [from_date, to_date]]}
     if team:
         filters["agent_group"] = team
-    if agent:
-        filters["_assign"] = ["like", f"%{agent}%"]
-    team_data = get_team_chart_data(from_date, to_date, filters)
-    ticket_type_data = get_ticket_type_chart_data(from_date, to_date, filters)
-    ticket_priority_data = get_ticket_priority_chart_data(from_date, to_date, filters)
-    ticket_channel_data = get_ticket_channel_chart_data(from_date, to_date, filters)
+    return filters
+
 
-    return [team_data, ticket_type_data, ticket_priority_data, ticket_channel_data]
+# (chart key, HD Ticket field, rollup field) of the master dashboard breakdowns
+BREAKDOWNS = (
+    ("team", "agent_group", "agent_group"),
+    ("type", "ticket_type", "ticket_type"),
+    ("priority", "priority", "priority"),
+    ("channel", "via_customer_portal", "channel"),
+)
 
 
-def get_team_chart_data(from_date, to_date, filters=None):
+def get_breakdown_counts(from_date, to_date, team=None, agent=None):
     """
-    Get team chart data for the dashboard.
+    Ticket counts per team, type, priority and channel in a single scan, from
+    the daily rollup without an agent filter or from HD Ticket for an agent.
+
+    MariaDB has no GROUPING SETS, so the query groups by all four dimensions
+    and the (small) combined result is folded into one distribution each.
     """
-    result = frappe.get_all(
-        "HD Ticket",
-        fields=["agent_group as team", "count(name) as count"],
-        filters=filters,
-        group_by="agent_group",
-        order_by="count desc",
+    # The rollup has no agent dimension; per-agent charts read the tickets
+    rollup = not agent
+    fields = [b[2] if rollup else b[1] for b in BREAKDOWNS]
+    if rollup:
+        rows = frappe.get_all(
+            ROLLUP_DOCTYPE,
+            fields=[*fields, "sum(created) as count"],
+            filters=get_rollup_filters(from_date, to_date, team),
+            group_by=", ".join(fields),
+        )
+    else:
+        rows = get_agent_ticket_counts(fields, from_date, to_date, team, agent)
+
+    keys = [b[0] for b in BREAKDOWNS]
+    totals = {key: {} for key in keys}
+    for row in rows:
+        for key, field in zip(keys, fields):
+            value = row.get(field)
+            if key == "channel" and not rollup:
+                value = "Portal" if value == 1 else "Email"
+            totals[key][value] = totals[key].get(value, 0) + row.count
+
+    breakdowns = {}
+    for key, counts in totals.items():
+        result = [
+            frappe._dict({key: value, "count": count})
+            for value, count in counts.items()
+        ]
+        if key == "channel":
+            result.sort(key=lambda r: r.channel, reverse=True)
+        else:
+            result.sort(key=lambda r: r.count, reverse=True)
+        breakdowns[key] = result
+    return breakdowns
+
+
+def get_agent_ticket_counts(fields, from_date, to_date, team, agent):
+    """Counts of the agent's tickets grouped by `fields` (semi-join on the assignee index)."""
+    group_by = ", ".join(fields)
+    conditions = [assigned_tickets_condition(agent)]
+    if team:
+        conditions.append("agent_group = %(team)s")
+    return frappe.db.sql(
+        f"""
+        SELECT {group_by}, COUNT(*) AS count
+        FROM `tabHD Ticket`
+        WHERE creation >= %(from_date)s
+            AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+            AND {" AND ".join(conditions)}
+        GROUP BY {group_by}
+        """,
+        {"from_date": from_date, "to_date": to_date, "team": team},
+        as_dict=True,
     )
+
+
+def get_master_dashboard_data(from_date, to_date, team=None, agent=None):
+    breakdowns = get_breakdown_counts(from_date, to_date, team, agent)
+    return [
+        get_team_chart_data(breakdowns["team"]),
+        get_ticket_type_chart_data(breakdowns["type"]),
+        get_ticket_priority_chart_data(breakdowns["priority"]),
+        get_ticket_channel_chart_data(breakdowns["channel"]),
+    ]
+
+
+def get_team_chart_data(result):
+    """
+    Get team chart data for the dashboard.
+    """
     for r in result:
         if not r.team:
             r.team = "No Team"
@@ -399,17 +531,10 @@ def get_team_chart_data(from_date, to_date, filters=None):
         )
 
 
-def get_ticket_type_chart_data(from_date, to_date, filters=None):
+def get_ticket_type_chart_data(result):
     """
     Get ticket type chart data for the dashboard.
     """
-    result = frappe.get_all(
-        "HD Ticket",
-        fields=["ticket_type as type", "count(name) as count"],
-        filters=filters,
-        group_by="ticket_type",
-        order_by="count desc",
-    )
     # based on length show different chart, if len greater than 5 then show pie chart else bar chart
     if len(result) < 7:
         return get_pie_chart_config(
@@ -430,17 +555,10 @@ def get_ticket_type_chart_data(from_date, to_date, filters=None):
         )
 
 
-def get_ticket_priority_chart_data(from_date, to_date, filters=None):
+def get_ticket_priority_chart_data(result):
     """
     Get ticket priority chart data for the dashboard.
     """
-    result = frappe.get_all(
-        "HD Ticket",
-        fields=["priority as priority", "count(name) as count"],
-        filters=filters,
-        group_by="priority",
-        order_by="count desc",
-    )
     # based on length show different chart, if len greater than 5 then show pie chart else bar chart
     if len(result) < 7:
         return get_pie_chart_config(
@@ -466,21 +584,10 @@ def get_ticket_priority_chart_data(from_date, to_date, filters=None):
         )
 
 
-def get_ticket_channel_chart_data(from_date, to_date, filters=None):
+def get_ticket_channel_chart_data(result):
     """
     Get ticket channel chart data for the dashboard.
     """
-    result = frappe.get_all(
-        "HD Ticket",
-        fields=["via_customer_portal as channel ", "count(name) as count"],
-        filters=filters,
-        group_by="via_customer_portal",
-        order_by="via_customer_portal desc",
-    )
-
-    for row in result:
-        row.channel = "Portal" if row.channel == 1 else "Email"
-
     return get_pie_chart_config(
         result,
         "Tickets by Channel",
@@ -490,13 +597,15 @@ def get_ticket_channel_chart_data(from_date, to_date, filters=None):
     )
 
 
-def get_trend_data(from_date, to_date, conds=""):
+def get_trend_data(from_date, to_date, conds="", team=None, agent=None):
     """
     Get trend data for the dashboard.
     """
+    # Read the daily rollup unless filtering by agent (no agent dimension there)
+    rollup = None if agent else get_rollup_filters(from_date, to_date, team)
 
-    ticket_trend_data = get_ticket_trend_data(from_date, to_date, conds)
-    feedback_trend_data = get_feedback_trend_data(from_date, to_date, conds)
+    ticket_trend_data = get_ticket_trend_data(from_date, to_date, conds, rollup)
+    feedback_trend_data = get_feedback_trend_data(from_date, to_date, conds, rollup)
 
     return [
         ticket_trend_data,
@@ -504,10 +613,26 @@ def get_trend_data(from_date, to_date, conds=""):
     ]
 
 
-def get_ticket_trend_data(from_date, to_date, conds=""):
+def get_ticket_trend_data(from_date, to_date, conds="", rollup=None):
     """
     Trend data for tickets in the dashboard. Ticket treand +SLA fulfilled
     """
+    if rollup is not None:
+        result = frappe.get_all(
+            ROLLUP_DOCTYPE,
+            fields=[
+                "day as date",
+                "sum(open_count) as open",
+                "sum(resolved) as closed",
+                "sum(sla_fulfilled) as SLA_fulfilled",
+            ],
+            filters=rollup,
+            group_by="day",
+            order_by="day",
+        )
+        avg_tickets = get_avg_tickets_per_day(from_date, to_date, conds, rollup)
+        return get_ticket_trend_chart(result, avg_tickets)
+
     result = frappe.db.sql(
         f"""
             SELECT 
@@ -528,6 +653,10 @@ def get_ticket_trend_data(from_date, to_date, conds=""):
         as_dict=1,
     )
     avg_tickets = get_avg_tickets_per_day(from_date, to_date, conds)
+    return get_ticket_trend_chart(result, avg_tickets)
+
+
+def get_ticket_trend_chart(result, avg_tickets):
     subtitle = f"Average tickets per day is around {avg_tickets:.0f}"
     return get_bar_chart_config(
         result,
@@ -554,10 +683,33 @@ def get_ticket_trend_data(from_date, to_date, conds=""):
     )
 
 
-def get_feedback_trend_data(from_date, to_date, conds=""):
+def get_feedback_trend_data(from_date, to_date, conds="", rollup=None):
     """
     Get feedback trend data for the dashboard.
     """
+    if rollup is not None:
+        result = frappe.get_all(
+            ROLLUP_DOCTYPE,
+            fields=[
+                "day as date",
+                "sum(feedback_sum) as rating_sum",
+                "sum(feedback_count) as rated_tickets",
+            ],
+            filters=rollup,
+            group_by="day",
+            order_by="day",
+        )
+        total_sum = total_count = 0
+        for row in result:
+            rating_sum = row.pop("rating_sum") or 0
+            total_sum += rating_sum
+            total_count += row.rated_tickets or 0
+            row.rating = (
+                rating_sum / row.rated_tickets * 5 if row.rated_tickets else None
+            )
+        avg_rating = total_sum / total_count * 5 if total_count else 0
+        return get_feedback_trend_chart(result, avg_rating)
+
     result = frappe.db.sql(
         f"""
         SELECT 
@@ -595,7 +747,10 @@ def get_feedback_trend_data(from_date, to_date, conds=""):
         pluck=True,
     )
     avg_rating = avg_rating_result[0] if avg_rating_result[0] else 0
+    return get_feedback_trend_chart(result, avg_rating)
 
+
+def get_feedback_trend_chart(result, avg_rating):
     subtitle = f"Average feedback rating per day is around {avg_rating:.1f} stars"
 
     return get_bar_chart_config(
@@ -664,10 +819,20 @@ def get_conditions_from_filters(filters):
     return " AND ".join(conditions) if conditions else ""
 
 
-def get_avg_tickets_per_day(from_date, to_date, conds=""):
+def get_avg_tickets_per_day(from_date, to_date, conds="", rollup=None):
     """
     Get average tickets per day for the dashboard.
     """
+    if rollup is not None:
+        total_tickets = frappe.get_all(
+            ROLLUP_DOCTYPE,
+            fields=["sum(created) as total"],
+            filters=rollup,
+            pluck="total",
+        )[0]
+        days = frappe.utils.date_diff(to_date, from_date) + 1
+        return (total_tickets or 0) / (days or 1)
+
     result = frappe.db.sql(
         f"""
             SELECT 
@@ -0,0 +1,179 @@
+"""
+Streaming CSV / NDJSON exports of list views and script reports.
+
+Rows are encoded and sent as they are read, so a worker holds one chunk at a
+time instead of the whole result:
+
+* Lists are read through `frappe.get_list`, which applies the same permission
+  query conditions, user permissions and sharing rules as the list view, in
+  keyset pages on `name` (each page is a bounded primary key range scan).
+* Script reports run through `frappe.desk.query_report.run` with their usual
+  permission checks and their rows are streamed. The helpdesk reports
+  aggregate in SQL, so their rows grow with entities / periods, not tickets.
+"""
+
+import csv
+import io
+import json
+
+import frappe
+from frappe import _
+from frappe.utils.response import json_handler
+from werkzeug.wrappers import Response
+
+from helpdesk.api.doc import handle_at_me_support
+
+EXPORT_CHUNK = 2000
+FORMATS = {
+    "CSV": ("text/csv; charset=utf-8", "csv"),
+    "NDJSON": ("application/x-ndjson", "ndjson"),
+}
+
+
+@frappe.whitelist()
+def export_list(
+    doctype: str,
+    fields=None,
+    filters=None,
+    file_format: str = "CSV",
+    chunk_size: int = EXPORT_CHUNK,
+):
+    """Stream every `doctype` row the user can read that matches `filters`."""
+    _check_format(file_format)
+    if not frappe.has_permission(doctype, "export"):
+        frappe.throw(
+            _("Not permitted to export {0}").format(_(doctype)), frappe.PermissionError
+        )
+
+    fields = frappe.parse_json(fields or "[]") or _default_fields(doctype)
+    if "name" not in fields:
+        fields.append("name")
+    filters = frappe.parse_json(filters or "{}")
+    if isinstance(filters, dict):
+        filters = handle_at_me_support(filters)
+    chunk_size = max(1, min(frappe.utils.cint(chunk_size), EXPORT_CHUNK))
+
+    return _stream(
+        lambda: _list_rows(doctype, fields, filters, chunk_size),
+        fields,
+        file_format,
+        frappe.scrub(doctype),
+    )
+
+
+@frappe.whitelist()
+def export_report(report_name: str, filters=None, file_format: str = "CSV"):
+    """Stream the rows of a script report run with `filters`."""
+    from frappe.desk.query_report import run
+
+    _check_format(file_format)
+    ref_doctype = frappe.db.get_value("Report", report_name, "ref_doctype")
+    if ref_doctype and not frappe.has_permission(ref_doctype, "export"):
+        frappe.throw(
+            _("Not permitted to export {0}").format(_(ref_doctype)),
+            frappe.PermissionError,
+        )
+
+    result = run(report_name, filters=frappe.parse_json(filters or "{}"))
+    keys = [_column_key(column) for column in result.get("columns") or []]
+
+    def rows():
+        for row in result.get("result") or []:
+            if isinstance(row, dict):
+                yield row
+            else:
+                yield dict(zip(keys, row))
+
+    return _stream(rows, keys, file_format, frappe.scrub(report_name))
+
+
+def _check_format(file_format):
+    if file_format not in FORMATS:
+        frappe.throw(_("Unsupported export format: {0}").format(file_format))
+
+
+def _default_fields(doctype):
+    meta = frappe.get_meta(doctype)
+    return ["name", *(df.fieldname for df in meta.fields if df.in_list_view)]
+
+
+def _column_key(column):
+    if isinstance(column, dict):
+        return column.get("fieldname") or frappe.scrub(column.get("label") or "")
+    # "Label:Fieldtype/Options:Width"
+    return frappe.scrub(str(column).split(":")[0])
+
+
+def _as_filter_list(doctype, filters):
+    if isinstance(filters, list):
+        return list(filters)
+    return [
+        [doctype, key, *(value if isinstance(value, (list, tuple)) else ("=", value))]
+        for key, value in filters.items()
+    ]
+
+
+def _list_rows(doctype, fields, filters, chunk_size):
+    filters = _as_filter_list(doctype, filters)
+    last = None
+    while True:
+        page_filters = (
+            filters if last is None else [*filters, [doctype, "name", "<", last]]
+        )
+        rows = frappe.get_list(
+            doctype,
+            fields=fields,
+            filters=page_filters,
+            order_by="name desc",
+            limit_page_length=chunk_size,
+        )
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1].name
+
+
+def _encode(rows, keys, file_format):
+    if file_format == "NDJSON":
+        for row in rows:
+            yield (json.dumps(row, default=json_handler) + "\n").encode()
+        return
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=keys, extrasaction="ignore")
+    writer.writeheader()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % EXPORT_CHUNK == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _stream(rows, keys, file_format, filename):
+    mimetype, extension = FORMATS[file_format]
+    site, sites_path = frappe.local.site, frappe.local.sites_path
+    user = frappe.session.user
+
+    def generate():
+        # Werkzeug iterates the body after `frappe.destroy()` has released the
+        # request's context, so the generator sets up (and tears down) its own
+        owns_context = not getattr(frappe.local, "site", None)
+        if owns_context:
+            frappe.init(site=site, sites_path=sites_path)
+        try:
+            if owns_context:
+                frappe.connect()
+                frappe.set_user(user)
+            yield from _encode(rows(), keys, file_format)
+        finally:
+            if owns_context:
+                frappe.destroy()
+
+    response = Response(generate(), mimetype=mimetype)
+    response.headers[
+        "Content-Disposition"
+    ] = f'attachment; filename="{filename}.{extension}"'
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
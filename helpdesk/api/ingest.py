@@ -10,12 +10,28 @@ NOT: Güvenlik için ileride API Key/Secret eklenecek. Şimdilik açık (allow_g
 from __future__ import annotations
 
 # (1) TR: Tipler ve yardımcılar
-from typing import Any, Dict, List, Iterable
+from typing import Any, Dict, List, Iterable, Tuple
+import base64
+import hashlib
 import json
 import re
+import time
 
 import frappe
-from frappe.utils import cint, flt, cstr
+from frappe.query_builder import DocType, Order
+from frappe.query_builder.functions import Sum
+from frappe.utils import add_days, cint, flt, cstr, get_datetime, getdate
+from werkzeug.wrappers import Response
+
+from helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox import (
+    record_field_changes as record_ticket_field_changes,
+)
+from helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster import (
+    update_for_ticket as update_cluster_rollup,
+)
+from helpdesk.helpdesk.doctype.problem_ticket.problem_ticket import get_subject_hash
+from helpdesk.helpdesk.utils.settings_snapshot import get_ai_settings
+from helpdesk.utils import publish_event
 
 # --- AI Interaction Log (MERKEZİ) -------------------------------------------
 # (L01) AI log yazımı için tek import — mevcut dosyayı bozmadan sadece ekleme
@@ -33,9 +49,9 @@ except Exception:  # (L03) Emniyet: import başarısızsa no-op fonksiyon
 # ---------------------------------------------------------------------------
 
 def _settings():
-    """HelpdeskAI Settings tekil dokümanı (varsa)."""
+    """HelpdeskAI Settings salt-okunur snapshot'ı (varsa); kayıtta geçersiz kılınır."""
     try:
-        return frappe.get_single("HelpdeskAI Settings")
+        return get_ai_settings()
     except Exception:
         return None
 
@@ -101,13 +117,155 @@ def _pluck(lst: Iterable[Dict[str, Any]], key: str) -> List[Any]:
     return [r.get(key) for r in lst or [] if r.get(key)]
 
 
+# ---------------------------------------------------------------------------
+# Keyset sayfalama (modified, name)
+# ---------------------------------------------------------------------------
+# TR: Offset yerine son satırın (modified, name) anahtarıyla devam edilir; derin
+#     sayfalar da `modified` indeksinden sabit maliyetle okunur ve güncellenen
+#     satırlar sayfalar arasında kaymaz. Cursor opak bir base64url token'dır.
+
+def _encode_cursor(row: Dict[str, Any]) -> str:
+    raw = json.dumps([cstr(row.get("modified")), row.get("name")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(token: str) -> Tuple[str, Any]:
+    """Token → (modified, name). Watermark olarak düz tarih/saat de kabul edilir (name=None)."""
+    token = cstr(token).strip()
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        modified, name = json.loads(raw)
+        return cstr(modified), name
+    except Exception:
+        pass
+    try:
+        return cstr(get_datetime(token)), None
+    except Exception:
+        frappe.throw(f"Invalid cursor: {token}", frappe.ValidationError)
+
+
+def _keyset_page(
+    query,
+    table,
+    limit: int = 50,
+    start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    `query` seçimine keyset koşulu + sıralama ekler. Seçimde `modified` ve `name` olmalı.
+    - cursor: modified desc, name desc; bir önceki sayfanın `next_cursor` değeri
+    - changes_since: modified asc, name asc; watermark'tan SONRA değişen satırlar
+    - ikisi de yoksa eski offset (start) davranışı, aynı sıralama ile
+    """
+    limit = cint(limit) or 50
+    token = changes_since or cursor
+    order = Order.asc if changes_since else Order.desc
+    if token:
+        modified, name = _decode_cursor(token)
+        after = (lambda a, b: a > b) if changes_since else (lambda a, b: a < b)
+        crit = after(table.modified, modified)
+        if name is not None:
+            crit = crit | ((table.modified == modified) & after(table.name, name))
+        query = query.where(crit)
+    elif cint(start):
+        query = query.offset(cint(start))
+
+    query = query.orderby(table.modified, order=order).orderby(table.name, order=order)
+    rows = query.limit(limit + 1).run(as_dict=True)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    last = _encode_cursor(rows[-1]) if rows else None
+    page: Dict[str, Any] = {"has_more": has_more, "next_cursor": last if has_more else None}
+    if changes_since:
+        # TR: Boş sayfada watermark aynen döner; istemci bir sonraki yoklamada kullanır
+        page["watermark"] = last or cstr(changes_since)
+    return rows, page
+
+
+def _list_page(
+    doctype: str,
+    fields: List[str],
+    filters: Dict[str, Any],
+    limit: int = 50,
+    start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    query = frappe.qb.get_query(doctype, fields=fields, filters=filters)
+    return _keyset_page(query, DocType(doctype), limit, start, cursor, changes_since)
+
+
 # ---------------------------------------------------------------------------
 # GET – KATALOG / LİSTELER
 # ---------------------------------------------------------------------------
 
-@frappe.whitelist(allow_guest=True, methods=["GET"])
-def get_teams(include_members: int | bool = 0, include_tags: int | bool = 0):
-    # TR: Takım listesi, opsiyonel üye detayları
+# ---------------------------------------------------------------------------
+# Katalog önbelleği (takımlar / üyeler / routing context)
+# ---------------------------------------------------------------------------
+# TR: Katalog sadece HD Team / HD Team Member değişince değişir. Her değişiklik
+#     sürüm anahtarını yeniler (hooks.doc_events); yanıtlar sürüm başına bir kez
+#     üretilip Redis'te tutulur ve ETag taşır. If-None-Match eşleşirse 304 döner.
+
+CATALOG_VERSION_KEY = "helpdesk:ingest:catalog_version"
+CATALOG_CACHE_KEY = "helpdesk:ingest:catalog:{0}:{1}"
+CATALOG_CACHE_TTL = 24 * 3600  # L: eski sürümlerin anahtarları kendiliğinden düşer
+
+
+def _catalog_version() -> str:
+    version = frappe.cache().get_value(CATALOG_VERSION_KEY)
+    if not version:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def _bump_catalog_version():
+    frappe.cache().set_value(CATALOG_VERSION_KEY, frappe.generate_hash(length=10))
+
+
+def invalidate_catalog(doc=None, method=None):
+    """
+    doc_events: HD Team / HD Team Member.
+    Hemen (aynı istek yeni veriyi görsün) ve commit sonrası (başka worker commit
+    öncesi eski veriyi yeni sürüm altına yazmış olabilir) iki kez yenilenir.
+    """
+    _bump_catalog_version()
+    frappe.db.after_commit.add(_bump_catalog_version)
+
+
+def _cached_catalog(variant: str, build) -> Tuple[str, Any]:
+    """(etag, veri) — veri sürüm başına bir kez `build()` ile üretilir."""
+    version = _catalog_version()
+    key = CATALOG_CACHE_KEY.format(version, variant)
+    data = frappe.cache().get_value(key)
+    if data is None:
+        data = build()
+        frappe.cache().set_value(key, data, expires_in_sec=CATALOG_CACHE_TTL)
+    etag = '"{0}"'.format(hashlib.sha1(f"{version}:{variant}".encode()).hexdigest()[:20])
+    return etag, data
+
+
+def _etag_response(etag: str, payload: Dict[str, Any]):
+    """If-None-Match eşleşirse gövdesiz 304, aksi halde ETag başlıklı payload."""
+    request = getattr(frappe.local, "request", None)
+    inm = request.headers.get("If-None-Match") if request else None
+    if inm and (inm.strip() == "*" or etag in [t.strip() for t in inm.split(",")]):
+        resp = Response(status=304)
+        resp.headers["ETag"] = etag
+        resp.headers["Cache-Control"] = "private, no-cache"
+        return resp
+
+    headers = getattr(frappe.local, "response_headers", None)
+    if headers is not None:
+        headers["ETag"] = etag
+        headers["Cache-Control"] = "private, no-cache"
+    payload["etag"] = etag
+    return payload
+
+
+def _build_teams(include_members: bool) -> List[Dict[str, Any]]:
     doctype = "HD Team"
     fields = ["name"]
     if frappe.db.has_column(doctype, "team_name"):
@@ -117,11 +275,12 @@ def get_teams(include_members: int | bool = 0, include_tags: int | bool = 0):
 
     teams = frappe.get_all(doctype, fields=fields, order_by="modified desc")
 
-    if cint(include_members):
+    if include_members:
         child_dt = "HD Team Member"
         user_field = "user"
         if frappe.db.table_exists(child_dt):
-            by_team = frappe.get_all(child_dt, fields=["parent", user_field], limit=10000)
+            # TR: Önbelleklendiği için üst sınır yok (eskiden 10000 satırda kesiliyordu)
+            by_team = frappe.get_all(child_dt, fields=["parent", user_field], limit_page_length=0)
             members_map: Dict[str, List[str]] = {}
             for row in by_team:
                 members_map.setdefault(row["parent"], []).append(row[user_field])
@@ -130,21 +289,48 @@ def get_teams(include_members: int | bool = 0, include_tags: int | bool = 0):
         else:
             for t in teams:
                 t["members"] = []
+    return teams
 
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def get_teams(include_members: int | bool = 0, include_tags: int | bool = 0):
+    # TR: Takım listesi, opsiyonel üye detayları
+    with_members = bool(cint(include_members))
+    etag, teams = _cached_catalog(
+        f"teams:{int(with_members)}", lambda: _build_teams(with_members)
+    )
     # include_tags: şu an kullanılmıyor
-    return {"ok": True, "teams": teams}
+    return _etag_response(etag, {"ok": True, "teams": teams})
 
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
 def get_team_members(team: str) -> Dict[str, Any]:
     """Tek takımın üyeleri."""
-    members = frappe.get_all(
-        "HD Team Member",
-        fields=["user"],
-        filters={"parent": team, "parenttype": "HD Team"},
-        order_by="idx asc",
-    )
-    return {"ok": True, "team": team, "members": _pluck(members, "user")}
+
+    def build():
+        members = frappe.get_all(
+            "HD Team Member",
+            fields=["user"],
+            filters={"parent": team, "parenttype": "HD Team"},
+            order_by="idx asc",
+        )
+        return _pluck(members, "user")
+
+    etag, members = _cached_catalog(f"members:{team}", build)
+    return _etag_response(etag, {"ok": True, "team": team, "members": members})
+
+
+TICKET_LIST_FIELDS = [
+    "name",
+    "subject",
+    "status",
+    "priority",
+    "agent_group",
+    "customer",
+    "opening_date",
+    "opening_time",
+    "modified",
+]
 
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
@@ -153,31 +339,18 @@ def get_tickets_by_team(
     status: str | None = None,
     limit: int = 50,
     start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
 ) -> Dict[str, Any]:
-    """Takıma atanmış HD Ticket'lar."""
+    """Takıma atanmış HD Ticket'lar (offset, cursor veya changes_since)."""
     filters: Dict[str, Any] = {"agent_group": team}
     if status:
         filters["status"] = status
 
-    tickets = frappe.get_all(
-        "HD Ticket",
-        fields=[
-            "name",
-            "subject",
-            "status",
-            "priority",
-            "agent_group",
-            "customer",
-            "opening_date",
-            "opening_time",
-            "modified",
-        ],
-        filters=filters,
-        limit_start=start,
-        limit_page_length=limit,
-        order_by="modified desc",
+    tickets, page = _list_page(
+        "HD Ticket", TICKET_LIST_FIELDS, filters, limit, start, cursor, changes_since
     )
-    return {"ok": True, "team": team, "tickets": tickets}
+    return {"ok": True, "team": team, "tickets": tickets, **page}
 
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
@@ -186,52 +359,40 @@ def get_tickets_by_user(
     status: str | None = None,
     limit: int = 50,
     start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
 ) -> Dict[str, Any]:
     """
     Kullanıcıya atanmış biletler.
-    Frappe'de atamalar ToDo üstünden tutulur.
+    Atamalar HD Ticket Assignee indeksinden okunur (ToDo'nun normalize kopyası);
+    (agent, unassigned_on, ticket) indeksi üstünden tek JOIN sorgusu.
     """
-    assigned = frappe.get_all(
-        "ToDo",
-        fields=["reference_name"],
-        filters={
-            "reference_type": "HD Ticket",
-            "allocated_to": user,
-            "status": ["!=", "Closed"],
-        },
-        limit_page_length=1000,
+    Assignee = DocType("HD Ticket Assignee")
+    Ticket = DocType("HD Ticket")
+    query = (
+        frappe.qb.from_(Ticket)
+        .join(Assignee)
+        .on(Assignee.ticket == Ticket.name)
+        .select(*[Ticket[f] for f in TICKET_LIST_FIELDS])
+        .distinct()
+        .where(Assignee.agent == user)
+        .where(Assignee.unassigned_on.isnull())
     )
-    ticket_names = _pluck(assigned, "reference_name")
-    if not ticket_names:
-        return {"ok": True, "user": user, "tickets": []}
-
-    filters: Dict[str, Any] = {"name": ["in", ticket_names]}
     if status:
-        filters["status"] = status
+        query = query.where(Ticket.status == status)
 
-    tickets = frappe.get_all(
-        "HD Ticket",
-        fields=[
-            "name",
-            "subject",
-            "status",
-            "priority",
-            "agent_group",
-            "customer",
-            "opening_date",
-            "opening_time",
-            "modified",
-        ],
-        filters=filters,
-        limit_start=start,
-        limit_page_length=limit,
-        order_by="modified desc",
-    )
-    return {"ok": True, "user": user, "tickets": tickets}
+    tickets, page = _keyset_page(query, Ticket, limit, start, cursor, changes_since)
+    return {"ok": True, "user": user, "tickets": tickets, **page}
 
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
-def get_articles(q: str | None = None, limit: int = 50, start: int = 0) -> Dict[str, Any]:
+def get_articles(
+    q: str | None = None,
+    limit: int = 50,
+    start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
+) -> Dict[str, Any]:
     """
     Bilgi bankası makaleleri (HD Article). Alan adları değişebileceği için
     asgari set döndürülür (name, title, content benzeri).
@@ -248,15 +409,8 @@ def get_articles(q: str | None = None, limit: int = 50, start: int = 0) -> Dict[
         if like_field:
             filters[like_field] = ["like", f"%{q}%"]
 
-    res = frappe.get_all(
-        "HD Article",
-        fields=fields,
-        filters=filters,
-        limit_start=start,
-        limit_page_length=limit,
-        order_by="modified desc",
-    )
-    return {"ok": True, "articles": res}
+    res, page = _list_page("HD Article", fields, filters, limit, start, cursor, changes_since)
+    return {"ok": True, "articles": res, **page}
 
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
@@ -298,9 +452,14 @@ def get_ticket(ticket: str, fields: str | None = None) -> Dict[str, Any]:
 
 @frappe.whitelist(allow_guest=True, methods=["GET"])
 def get_routing_context():
-    ctx: Dict[str, Any] = {}
-    ctx["teams"] = get_teams(include_members=1, include_tags=1)
-    return {"ok": True, "context": ctx}
+    def build():
+        ctx: Dict[str, Any] = {}
+        ctx["teams"] = {"ok": True, "teams": _build_teams(True)}
+        return ctx
+
+    # TR: Bağlam sürüm başına bir kez kurulur
+    etag, ctx = _cached_catalog("routing", build)
+    return _etag_response(etag, {"ok": True, "context": ctx})
 
 
 # ---------------------------------------------------------------------------
@@ -347,12 +506,57 @@ def _append_text(base: str, new: str, do_append: bool) -> str:
     return new
 
 
+# --- Hızlı yazma yolu (sadece AI alanları) ----------------------------------
+# TR: Bu alanlar SLA, eskalasyon, atama ve arama indeksini etkilemez. Sadece
+#     bunlara dokunan güncellemeler doc.save() yerine kolon bazlı UPDATE ile
+#     yazılır; LINK/CHECK alanları her zaman tam kaydetme yolundan geçer.
+FAST_WRITE_FIELDS = TEXT_FIELDS | FLOAT_FIELDS | set(SELECT_FIELDS) | DATA_FIELDS
+
+
+def _setting_flag(fieldname: str, default: int) -> bool:
+    """Check alanı; alan henüz yoksa (migrate öncesi) verilen varsayılan geçerli."""
+    st = _settings()
+    v = getattr(st, fieldname, None) if st else None
+    if v is None or v == "":
+        return bool(default)
+    return bool(cint(v))
+
+
+def _only_fast_fields(updates: Dict[str, Any]) -> bool:
+    keys = {k for k in updates if k in ALLOWED_FIELDS}
+    return bool(keys) and keys <= FAST_WRITE_FIELDS
+
+
+def _get_ticket_values(ticket: str, fields: Iterable[str]) -> Dict[str, Any]:
+    """Tam doküman yüklemeden sadece gereken kolonlar (append için taban metin)."""
+    row = frappe.db.get_value("HD Ticket", ticket, ["name", *fields], as_dict=True)
+    if not row:
+        frappe.throw(f"HD Ticket {ticket} not found", frappe.DoesNotExistError)
+    return row
+
+
+def _fast_write_ticket(ticket: str, values: Dict[str, Any]) -> None:
+    """
+    Hook'suz yazım: tek UPDATE + tek realtime olayı.
+    SLA, eskalasyon, atama kuralları, arama indeksi ve Version kaydı çalışmaz.
+    `modified` davranışı HelpdeskAI Settings > ai_fast_write_update_modified ile seçilir.
+    """
+    frappe.db.set_value(
+        "HD Ticket",
+        ticket,
+        values,
+        update_modified=_setting_flag("ai_fast_write_update_modified", 1),
+    )
+    publish_event("helpdesk:ticket-update", ticket)
+
+
 def _apply_ticket_updates(
     ticket: str,
     updates: Dict[str, Any],
     append: bool = False,
     clean_html: bool = True,
     respect_shadow: bool = True,
+    fast_write: bool | None = None,
 ) -> Dict[str, Any]:
     if not updates:
         try:
@@ -362,7 +566,21 @@ def _apply_ticket_updates(
             pass
         return {"ok": False, "error": "No fields to update"}
 
-    doc = _get_doc("HD Ticket", ticket)
+    # TR: fast_write=None → ayara göre karar; benchmark/test için zorlanabilir
+    if fast_write is None:
+        fast = _only_fast_fields(updates) and _setting_flag("ai_fast_write", 1)
+    else:
+        fast = bool(fast_write) and _only_fast_fields(updates)
+    if fast:
+        doc = None
+        base_fields = [k for k in updates if k in TEXT_FIELDS] if append else []
+        if "cluster_hash" in updates:
+            # TR: Küme rollup'ı için eski küme/durum (hook'suz yolda elle güncellenir)
+            base_fields += ["cluster_hash", "status", "creation"]
+        src = _get_ticket_values(ticket, base_fields)
+    else:
+        doc = _get_doc("HD Ticket", ticket)
+        src = doc
     changed: Dict[str, Any] = {}
     shadow = bool(respect_shadow and _is_shadow(ticket))
 
@@ -373,46 +591,29 @@ def _apply_ticket_updates(
             val = cstr(v)
             if clean_html:
                 val = _clean_html(val)
-            base = cstr(getattr(doc, k) or "")
+            base = cstr(src.get(k) or "")
             val = _append_text(base, val, append)  # HATA düzeltildi: doğru string birleştirme
-            if not shadow:
-                setattr(doc, k, val)
             changed[k] = val
         elif k in FLOAT_FIELDS:
-            val = flt(v)
-            if not shadow:
-                setattr(doc, k, val)
-            changed[k] = val
+            changed[k] = flt(v)
         elif k in SELECT_FIELDS:
             allowed = SELECT_FIELDS[k]
             val = cstr(v)
             if val and val not in allowed:
                 frappe.throw(f"Invalid value for {k}. Allowed: {sorted(allowed)}")
-            if not shadow:
-                setattr(doc, k, val)
             changed[k] = val
         elif k in LINK_FIELDS:
             doctype = LINK_FIELDS[k]
             if v:
                 if not frappe.db.exists(doctype, v):
                     frappe.throw(f"Linked doc not found: {doctype} {v}")
-                if not shadow:
-                    setattr(doc, k, v)
                 changed[k] = v
             else:
-                if not shadow:
-                    setattr(doc, k, None)
                 changed[k] = None
         elif k in CHECK_FIELDS:
-            val = 1 if cint(v) else 0
-            if not shadow:
-                setattr(doc, k, val)
-            changed[k] = val
+            changed[k] = 1 if cint(v) else 0
         elif k in DATA_FIELDS:
-            val = cstr(v)
-            if not shadow:
-                setattr(doc, k, val)
-            changed[k] = val
+            changed[k] = cstr(v)
 
     if not changed:
         try:
@@ -430,12 +631,28 @@ def _apply_ticket_updates(
             pass
         return {"ok": True, "ticket": ticket, "shadow": True, "preview": changed}
 
-    doc.save(ignore_permissions=True)
+    if fast:
+        _fast_write_ticket(ticket, changed)
+        # TR: doc_events çalışmadığı için outbox satırı da elle yazılır
+        record_ticket_field_changes(ticket, changed)
+        if "cluster_hash" in changed:
+            update_cluster_rollup(
+                old_hash=src.get("cluster_hash"),
+                new_hash=changed["cluster_hash"],
+                old_status=src.get("status"),
+                new_status=src.get("status"),
+                creation=src.get("creation"),
+            )
+    else:
+        for k, v in changed.items():
+            setattr(doc, k, v)
+        doc.save(ignore_permissions=True)
     frappe.db.commit()
 
     try:
         ai_log_write(ticket, "update_ticket", status="OK", source="ingest",
-                     preview=0, request=updates, result={"changed": changed})
+                     preview=0, request=updates, result={"changed": changed},
+                     meta={"fast_write": 1} if fast else None)
     except Exception:
         pass
 
@@ -474,10 +691,94 @@ PROBLEM_DATETIME_FIELDS = {"reported_on", "first_seen_on", "mitigated_on", "reso
 PROBLEM_INT_FIELDS = {"reopened_count"}
 
 
+PROBLEM_ALLOWED_FIELDS = (
+    PROBLEM_TEXT_FIELDS
+    | set(PROBLEM_SELECT_FIELDS)
+    | set(PROBLEM_LINK_FIELDS)
+    | PROBLEM_DATETIME_FIELDS
+    | PROBLEM_INT_FIELDS
+)
+PROBLEM_BULK_CHUNK = 100  # L: bulk upsert'te commit aralığı
+
+
 def _find_problem_by_subject(subject: str) -> str | None:
-    if not subject:
+    """Normalize subject hash'i üzerinden indeksli arama."""
+    h = get_subject_hash(subject)
+    if not h:
         return None
-    return frappe.db.get_value("Problem Ticket", {"subject": subject}, "name")
+    return frappe.db.get_value("Problem Ticket", {"subject_hash": h}, "name")
+
+
+def _check_problem_fields(data: Dict[str, Any], strict: bool) -> None:
+    if strict:
+        extras = set(data.keys()) - PROBLEM_ALLOWED_FIELDS
+        if extras:
+            frappe.throw(f"Unknown fields: {sorted(extras)}")
+
+
+def _problem_changes(current, data: Dict[str, Any], created: bool, normalize_html: bool) -> Dict[str, Any]:
+    """
+    `data` içinden yazılacak alanları doğrular ve değişenleri döndürür (yan etkisiz).
+    `current`: mevcut doküman veya satır (dict); yeni kayıtta None.
+    """
+    def cur(k):
+        return None if current is None else current.get(k)
+
+    changed: Dict[str, Any] = {}
+
+    for k in PROBLEM_TEXT_FIELDS:
+        if k in data:
+            val = cstr(data.get(k))
+            if k != "subject" and normalize_html:
+                val = _clean_html(val)
+            if created or _changed(cur(k), val):
+                changed[k] = val
+
+    for k, allowed in PROBLEM_SELECT_FIELDS.items():
+        if k in data:
+            v = cstr(data.get(k))
+            if v and v not in allowed:
+                frappe.throw(f"Invalid value for {k}. Allowed: {sorted(allowed)}")
+            if created or _changed(cur(k), v):
+                changed[k] = v
+
+    for k, dt in PROBLEM_LINK_FIELDS.items():
+        if k in data:
+            v = data.get(k)
+            if v:
+                if not frappe.db.exists(dt, v):
+                    frappe.throw(f"Linked doc not found: {dt} {v}")
+                if created or _changed(cur(k), v):
+                    changed[k] = v
+            else:
+                if created or _changed(cur(k), None):
+                    changed[k] = None
+
+    for k in PROBLEM_DATETIME_FIELDS:
+        if k in data:
+            val = data.get(k)
+            if created or _changed(cur(k), val):
+                changed[k] = val
+
+    for k in PROBLEM_INT_FIELDS:
+        if k in data:
+            val = cint(data.get(k) or 0)
+            if created or _changed(cur(k), val):
+                changed[k] = val
+
+    return changed
+
+
+def _save_problem(doc, changed: Dict[str, Any]):
+    """doc=None → yeni kayıt (insert); değişiklik varsa → save. Doküman döner."""
+    if doc is None:
+        doc = frappe.new_doc("Problem Ticket")
+        doc.update(changed)
+        doc.insert(ignore_permissions=True)
+    elif changed:
+        doc.update(changed)
+        doc.save(ignore_permissions=True)
+    return doc
 
 
 def _changed(old, new) -> bool:
@@ -519,6 +820,8 @@ def list_problem_tickets(
     q: str | None = None,
     limit: int = 50,
     start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
 ):
     filters: Dict[str, Any] = {}
     if status:          filters["status"] = status
@@ -533,15 +836,8 @@ def list_problem_tickets(
         "first_seen_on", "mitigated_on", "resolved_on",
         "reopened_count", "modified",
     ]
-    rows = frappe.get_all(
-        "Problem Ticket",
-        fields=fields,
-        filters=filters,
-        limit_start=start,
-        limit_page_length=limit,
-        order_by="modified desc",
-    )
-    return {"ok": True, "problems": rows}
+    rows, page = _list_page("Problem Ticket", fields, filters, limit, start, cursor, changes_since)
+    return {"ok": True, "problems": rows, **page}
 
 
 @frappe.whitelist(allow_guest=True, methods=["POST", "PUT"])
@@ -557,17 +853,7 @@ def upsert_problem_ticket(
     if not name and not data.get("subject"):
         frappe.throw("`subject` is required to create a Problem Ticket")
 
-    if cint(strict):
-        allowed = (
-            PROBLEM_TEXT_FIELDS
-            | set(PROBLEM_SELECT_FIELDS)
-            | set(PROBLEM_LINK_FIELDS)
-            | PROBLEM_DATETIME_FIELDS
-            | PROBLEM_INT_FIELDS
-        )
-        extras = set(data.keys()) - allowed
-        if extras:
-            frappe.throw(f"Unknown fields: {sorted(extras)}")
+    _check_problem_fields(data, bool(cint(strict)))
 
     created = False
 
@@ -579,59 +865,13 @@ def upsert_problem_ticket(
             frappe.throw(f"Problem Ticket not found: {name}")
         doc = frappe.get_doc("Problem Ticket", name)
     else:
-        doc = frappe.new_doc("Problem Ticket")
+        doc = None
         created = True
 
-    changed: Dict[str, Any] = {}
-
-    for k in PROBLEM_TEXT_FIELDS:
-        if k in data:
-            val = cstr(data.get(k))
-            if k != "subject" and cint(normalize_html):
-                val = _clean_html(val)
-            if created or _changed(getattr(doc, k, None), val):
-                setattr(doc, k, val)
-                changed[k] = val
-
-    for k, allowed in PROBLEM_SELECT_FIELDS.items():
-        if k in data:
-            v = cstr(data.get(k))
-            if v and v not in allowed:
-                frappe.throw(f"Invalid value for {k}. Allowed: {sorted(allowed)}")
-            if created or _changed(getattr(doc, k, None), v):
-                setattr(doc, k, v)
-                changed[k] = v
-
-    for k, dt in PROBLEM_LINK_FIELDS.items():
-        if k in data:
-            v = data.get(k)
-            if v:
-                if not frappe.db.exists(dt, v):
-                    frappe.throw(f"Linked doc not found: {dt} {v}")
-                if created or _changed(getattr(doc, k, None), v):
-                    setattr(doc, k, v)
-                    changed[k] = v
-            else:
-                if created or _changed(getattr(doc, k, None), None):
-                    setattr(doc, k, None)
-                    changed[k] = None
-
-    for k in PROBLEM_DATETIME_FIELDS:
-        if k in data:
-            val = data.get(k)
-            if created or _changed(getattr(doc, k, None), val):
-                setattr(doc, k, val)
-                changed[k] = val
-
-    for k in PROBLEM_INT_FIELDS:
-        if k in data:
-            val = cint(data.get(k) or 0)
-            if created or _changed(getattr(doc, k, None), val):
-                setattr(doc, k, val)
-                changed[k] = val
+    changed = _problem_changes(doc, data, created, bool(cint(normalize_html)))
 
     no_change = (not created) and (len(changed) == 0)
-    subject_for_log = cstr(data.get("subject") or getattr(doc, "subject", "")).strip()
+    subject_for_log = cstr(data.get("subject") or (doc.subject if doc else "")).strip()
 
     if cint(preview):
         try:
@@ -649,10 +889,8 @@ def upsert_problem_ticket(
             pass
         return {"ok": True, "preview": True, "created": created, "changed": changed, "no_change": no_change}
 
-    if created:
-        doc.insert(ignore_permissions=True)
-    elif changed:
-        doc.save(ignore_permissions=True)
+    if created or changed:
+        doc = _save_problem(doc, changed)
     frappe.db.commit()
 
     subject_for_log = cstr(getattr(doc, "subject", "") or data.get("subject") or "").strip()
@@ -673,6 +911,225 @@ def upsert_problem_ticket(
     return {"ok": True, "name": doc.name, "created": created, "changed": changed, "no_change": no_change}
 
 
+@frappe.whitelist(allow_guest=True, methods=["POST", "PUT"])
+def bulk_upsert_problem_tickets(
+    items: str | list | None = None,
+    lookup_by: str | None = "subject",
+    preview: int | bool = 0,
+    normalize_html: int | bool = 1,
+    strict: int | bool = 1,
+    chunk_size: int = PROBLEM_BULK_CHUNK,
+):
+    """
+    Toplu upsert. items: [{"name"?: ..., "fields": {...}}] veya düz alan sözlükleri.
+    - Tüm aramalar (name + subject_hash) ve mevcut değerler TEK sorguda okunur
+    - Değişmeyen kayıtlar hiç yüklenmez; yazımlar chunk_size öğede bir commit edilir
+    - Sonuç öğe başına: created / changed / no_change (veya error)
+    """
+    if isinstance(items, str):
+        try:
+            items = json.loads(items or "[]")
+        except Exception:
+            frappe.throw("`items` must be a JSON list")
+    if not isinstance(items, list):
+        frappe.throw("`items` must be a list")
+
+    is_preview = bool(cint(preview))
+    normalize = bool(cint(normalize_html))
+    is_strict = bool(cint(strict))
+    chunk = max(1, cint(chunk_size) or PROBLEM_BULK_CHUNK)
+
+    parsed: List[Tuple[str | None, Dict[str, Any]]] = []
+    for item in items:
+        item = item if isinstance(item, dict) else {}
+        if "fields" in item:
+            name, data = item.get("name"), _parse_fields_arg(item.get("fields"))
+        else:
+            data = dict(item)
+            name = data.pop("name", None)
+        parsed.append((cstr(name) or None, data))
+
+    # (1) Tek sorgu: açık isimler + normalize subject hash'leri
+    names = {n for n, _ in parsed if n}
+    hashes = {
+        get_subject_hash(d.get("subject"))
+        for n, d in parsed
+        if not n and lookup_by == "subject" and d.get("subject")
+    } - {None}
+    fields = ["name", "subject_hash", *sorted(PROBLEM_ALLOWED_FIELDS)]
+    rows: List[Dict[str, Any]] = []
+    if names or hashes:
+        Problem = DocType("Problem Ticket")
+        cond = None
+        if names:
+            cond = Problem.name.isin(list(names))
+        if hashes:
+            by_subject = Problem.subject_hash.isin(list(hashes))
+            cond = by_subject if cond is None else (cond | by_subject)
+        rows = frappe.qb.from_(Problem).select(*[Problem[f] for f in fields]).where(cond).run(as_dict=True)
+
+    by_name = {r["name"]: r for r in rows}
+    by_hash: Dict[str, str] = {}
+    for r in rows:
+        if r.get("subject_hash"):
+            by_hash.setdefault(r["subject_hash"], r["name"])
+
+    # (2) Öğe öğe değişiklik hesabı; sadece created/changed olanlar yazılır
+    results: List[Dict[str, Any]] = []
+    counts = {"created": 0, "changed": 0, "no_change": 0, "errors": 0}
+    pending = 0
+    for idx, (name, data) in enumerate(parsed):
+        try:
+            if not name and not data.get("subject"):
+                frappe.throw("`subject` is required to create a Problem Ticket")
+            _check_problem_fields(data, is_strict)
+            if not name and lookup_by == "subject":
+                name = by_hash.get(get_subject_hash(data.get("subject")))
+            if name and name not in by_name:
+                frappe.throw(f"Problem Ticket not found: {name}")
+
+            created = not name
+            changed = _problem_changes(by_name.get(name), data, created, normalize)
+            if not is_preview and (created or changed):
+                savepoint = f"problem_bulk_{idx}"
+                frappe.db.savepoint(savepoint)
+                try:
+                    doc = _save_problem(frappe.get_doc("Problem Ticket", name) if name else None, changed)
+                except frappe.ValidationError:
+                    frappe.db.rollback(save_point=savepoint)
+                    raise
+                name = doc.name
+                # TR: Aynı partideki sonraki öğeler bu kaydı görsün (aynı subject iki kez gelirse)
+                by_name[name] = {f: doc.get(f) for f in fields}
+                if doc.subject_hash:
+                    by_hash[doc.subject_hash] = name
+                pending += 1
+                if pending >= chunk:
+                    frappe.db.commit()
+                    pending = 0
+
+            state = "created" if created else ("changed" if changed else "no_change")
+            counts[state] += 1
+            results.append({
+                "index": idx, "ok": True, "name": name,
+                "created": created, "changed": changed, "no_change": state == "no_change",
+            })
+        except frappe.ValidationError as e:
+            counts["errors"] += 1
+            results.append({"index": idx, "ok": False, "name": name, "error": cstr(e)})
+
+    if not is_preview:
+        frappe.db.commit()
+
+    try:
+        ai_log_write(
+            ticket="",
+            action="upsert_problem_bulk",
+            status="WARN" if (is_preview or counts["errors"]) else "OK",
+            source="ingest",
+            preview=1 if is_preview else 0,
+            request={"count": len(parsed), "lookup_by": lookup_by},
+            result=counts,
+            subject=f"Problem Ticket bulk upsert ({len(parsed)})",
+        )
+    except Exception:
+        pass
+
+    return {"ok": True, "preview": is_preview, "count": len(parsed), **counts, "items": results}
+
+
+# --- Küme (cluster_hash) rollup uç noktaları ---------------------------------
+# TR: HD Ticket Cluster / HD Ticket Cluster Day tabloları artımlı tutulur;
+#     olay tespiti HD Ticket üzerinde GROUP BY taraması yapmaz.
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def get_top_clusters(
+    days: int = 7,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 20,
+    min_count: int = 2,
+    open_only: int | bool = 0,
+):
+    """Pencere içinde (varsayılan son `days` gün) en çok bilet açılan kümeler."""
+    until_d = getdate(until) if until else getdate()
+    since_d = getdate(since) if since else add_days(until_d, -(max(cint(days), 1) - 1))
+
+    Day = DocType("HD Ticket Cluster Day")
+    Cluster = DocType("HD Ticket Cluster")
+    window_count = Sum(Day.ticket_count).as_("window_count")
+    query = (
+        frappe.qb.from_(Day)
+        .join(Cluster)
+        .on(Cluster.name == Day.cluster_hash)
+        .select(
+            Day.cluster_hash,
+            window_count,
+            Cluster.ticket_count,
+            Cluster.open_count,
+            Cluster.first_seen,
+            Cluster.last_seen,
+            Cluster.problem_ticket,
+        )
+        .where(Day.day >= since_d)
+        .where(Day.day <= until_d)
+        .groupby(
+            Day.cluster_hash,
+            Cluster.ticket_count,
+            Cluster.open_count,
+            Cluster.first_seen,
+            Cluster.last_seen,
+            Cluster.problem_ticket,
+        )
+        .having(Sum(Day.ticket_count) >= max(cint(min_count), 1))
+        .orderby(Sum(Day.ticket_count), order=Order.desc)
+        .orderby(Cluster.last_seen, order=Order.desc)
+        .limit(max(cint(limit), 1))
+    )
+    if cint(open_only):
+        query = query.where(Cluster.open_count > 0)
+
+    rows = query.run(as_dict=True)
+    return {"ok": True, "since": str(since_d), "until": str(until_d), "clusters": rows}
+
+
+@frappe.whitelist(allow_guest=True, methods=["GET"])
+def get_cluster_tickets(
+    cluster_hash: str,
+    status: str | None = None,
+    limit: int = 50,
+    start: int = 0,
+    cursor: str | None = None,
+    changes_since: str | None = None,
+):
+    """Küme üyeleri; (cluster_hash, modified) indeksi üzerinden keyset sayfalama."""
+    filters: Dict[str, Any] = {"cluster_hash": cluster_hash}
+    if status:
+        filters["status"] = status
+    tickets, page = _list_page(
+        "HD Ticket", TICKET_LIST_FIELDS, filters, limit, start, cursor, changes_since
+    )
+    cluster = frappe.db.get_value(
+        "HD Ticket Cluster",
+        cluster_hash,
+        ["ticket_count", "open_count", "first_seen", "last_seen", "problem_ticket"],
+        as_dict=True,
+    )
+    return {"ok": True, "cluster_hash": cluster_hash, "cluster": cluster, "tickets": tickets, **page}
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST", "PUT"])
+def set_cluster_problem(cluster_hash: str, problem_ticket: str | None = None):
+    """Kümeyi bir Problem Ticket'a bağla (boş → bağlantıyı kaldır)."""
+    if not frappe.db.exists("HD Ticket Cluster", cluster_hash):
+        frappe.throw(f"HD Ticket Cluster not found: {cluster_hash}", frappe.DoesNotExistError)
+    if problem_ticket and not frappe.db.exists("Problem Ticket", problem_ticket):
+        frappe.throw(f"Linked doc not found: Problem Ticket {problem_ticket}")
+    frappe.db.set_value("HD Ticket Cluster", cluster_hash, "problem_ticket", problem_ticket or None)
+    frappe.db.commit()
+    return {"ok": True, "cluster_hash": cluster_hash, "problem_ticket": problem_ticket or None}
+
+
 @frappe.whitelist(allow_guest=True, methods=["POST", "PUT"])
 def set_reply_suggestion(ticket: str, text: str, append: int | bool = 0, clean_html: int | bool = 1):
     return _apply_ticket_updates(
@@ -739,13 +1196,39 @@ def _kb_meta():
         frappe.throw(f"Meta not found for {_KB_DT}")
 
 
-def _kb_select_options(fieldname: str) -> set[str]:
+# TR: Meta'dan türetilen kümeler (izinli alanlar, select seçenekleri, seri) sürüm
+#     başına bir kez hesaplanır. Sürüm = (DocType.modified, alan sayısı): DocType
+#     kaydı ve Custom Field ekleme/silme yeni sürüm üretir; Property Setter ile
+#     seçenek değişiklikleri en geç _KB_META_TTL saniyede yansır.
+_KB_META_TTL = 300
+_kb_meta_cache: Dict[str, Tuple[Tuple[Any, ...], float, Dict[str, Any]]] = {}
+
+
+def _kb_meta_info() -> Dict[str, Any]:
     meta = _kb_meta()
-    f = meta.get_field(fieldname)
-    if not f:
-        return set()
-    opts = cstr(getattr(f, "options", "")).strip()
-    return set([o.strip() for o in opts.split("\n") if o.strip()])  # HATA düzeltildi: doğru newline ayracı
+    version = (cstr(meta.modified), len(meta.fields))
+    site = getattr(frappe.local, "site", None) or ""
+    cached = _kb_meta_cache.get(site)
+    now = time.monotonic()
+    if cached and cached[0] == version and now - cached[1] < _KB_META_TTL:
+        return cached[2]
+
+    def options(df) -> frozenset:
+        opts = cstr(getattr(df, "options", "")).strip()
+        return frozenset(o.strip() for o in opts.split("\n") if o.strip())  # HATA düzeltildi: doğru newline ayracı
+
+    series = meta.get_field("naming_series")
+    info = {
+        "allowed_fields": frozenset(f for f in _KB_ALLOWED_FIELDS_BASE if meta.has_field(f)),
+        "select_options": {df.fieldname: options(df) for df in meta.fields if df.fieldtype == "Select"},
+        "default_series": (cstr(getattr(series, "default", "")).strip() if series else "") or "KBUR-.YYYY.-.#####",
+    }
+    _kb_meta_cache[site] = (version, now, info)
+    return info
+
+
+def _kb_select_options(fieldname: str) -> set[str]:
+    return set(_kb_meta_info()["select_options"].get(fieldname) or ())
 
 _KB_ALLOWED_FIELDS_BASE = {
     "subject", "priority", "target_doctype", "target_name", "target_path",
@@ -754,8 +1237,7 @@ _KB_ALLOWED_FIELDS_BASE = {
 
 
 def _kb_allowed_fields() -> set[str]:
-    meta = _kb_meta()
-    return {f for f in _KB_ALLOWED_FIELDS_BASE if meta.has_field(f)}
+    return set(_kb_meta_info()["allowed_fields"])
 
 
 def _kb_user() -> str:
@@ -786,10 +1268,7 @@ def _kb_resolve_attachment(val: str | None) -> str | None:
 
 def _kb_default_series() -> str:
     try:
-        meta = _kb_meta()
-        f = meta.get_field("naming_series")
-        default = cstr(getattr(f, "default", "")).strip() if f else ""
-        return default or "KBUR-.YYYY.-.#####"
+        return _kb_meta_info()["default_series"]
     except Exception:
         return "KBUR-.YYYY.-.#####"
 
@@ -872,12 +1351,8 @@ def _kb_clean_payload(data: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
-def _kb_create_request(
-    change_type: str,
-    fields: str | dict | None = None,
-) -> Dict[str, Any]:
-    # TR: Sade akış — preview/strict parametreleri KALDIRILDI.
-    payload_raw = _kb_collect_payload(fields)
+def _kb_build_doc(change_type: str, payload_raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Temizlenmiş, doğrulanmış insert sözlüğü (yan etkisiz)."""
     payload = _kb_clean_payload(payload_raw)
 
     subject = cstr(payload.get("subject") or "").strip()
@@ -886,7 +1361,7 @@ def _kb_create_request(
 
     _kb_validate_options(change_type, payload.get("priority"))
 
-    created_doc = {
+    return {
         "doctype": _KB_DT,
         "naming_series": _kb_default_series(),
         "subject": subject,
@@ -905,6 +1380,14 @@ def _kb_create_request(
         "breaking_change": payload.get("breaking_change", 0),
     }
 
+
+def _kb_create_request(
+    change_type: str,
+    fields: str | dict | None = None,
+) -> Dict[str, Any]:
+    # TR: Sade akış — preview/strict parametreleri KALDIRILDI.
+    created_doc = _kb_build_doc(change_type, _kb_collect_payload(fields))
+
     doc = frappe.get_doc(created_doc)
     doc.insert(ignore_permissions=True)
     frappe.db.commit()
@@ -916,9 +1399,9 @@ def _kb_create_request(
             status="OK",
             source="ingest",
             preview=0,
-            request={"change_type": change_type, "fields": payload},
+            request={"change_type": change_type, "fields": {k: v for k, v in created_doc.items() if k != "doctype"}},
             result={"name": doc.name},
-            subject=subject,
+            subject=created_doc["subject"],
         )
     except Exception:
         pass
@@ -946,6 +1429,78 @@ def report_kb_wrong_document(fields: str | dict | None = None):
     return _kb_create_request("Deprecate", fields=fields)
 
 
+# TR: Toplu gönderimde `type` takma adları → change_type
+_KB_CHANGE_TYPES = {
+    "new_article": "New Article",
+    "fix": "Fix",
+    "update": "Update",
+    "wrong_document": "Deprecate",
+}
+_KB_BATCH_MAX = 1000
+
+
+@frappe.whitelist(allow_guest=True, methods=["POST"])
+def request_kb_batch(items: str | list | None = None):
+    """
+    Çok sayıda KB Update Request'i TEK transaction'da oluşturur.
+    items: [{"type": "fix" | "new_article" | "update" | "wrong_document"
+             (veya "change_type": "Fix" ...), "fields": {...}}, ...]
+    Önce tümü doğrulanır; hata varsa hiçbiri yazılmaz ve öğe bazlı hatalar döner.
+    """
+    if isinstance(items, str):
+        try:
+            items = json.loads(items or "[]")
+        except Exception:
+            frappe.throw("`items` must be a JSON list")
+    if not isinstance(items, list) or not items:
+        frappe.throw("`items` must be a non-empty list")
+    if len(items) > _KB_BATCH_MAX:
+        frappe.throw(f"Too many items (max {_KB_BATCH_MAX})")
+
+    allowed_types = set(_KB_CHANGE_TYPES.values())
+    docs: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for idx, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        change_type = item.get("change_type") or _KB_CHANGE_TYPES.get(cstr(item.get("type")).strip().lower())
+        try:
+            if change_type not in allowed_types:
+                frappe.throw(f"Invalid `type`. Allowed: {sorted(_KB_CHANGE_TYPES)}")
+            fields = item.get("fields")
+            if fields is None:
+                fields = {k: v for k, v in item.items() if k not in ("type", "change_type")}
+            docs.append(_kb_build_doc(change_type, _parse_fields_arg(fields)))
+        except frappe.ValidationError as e:
+            errors.append({"index": idx, "error": cstr(e)})
+
+    if errors:
+        frappe.clear_messages()
+        return {"ok": False, "created": 0, "errors": errors}
+
+    names = []
+    for d in docs:
+        doc = frappe.get_doc(d)
+        doc.insert(ignore_permissions=True)
+        names.append(doc.name)
+    frappe.db.commit()
+
+    try:
+        ai_log_write(
+            ticket="",
+            action="kb_update_request_batch",
+            status="OK",
+            source="ingest",
+            preview=0,
+            request={"count": len(docs), "change_types": sorted({d["change_type"] for d in docs})},
+            result={"names": names},
+            subject=f"KB Update Requests ({len(names)})",
+        )
+    except Exception:
+        pass
+
+    return {"ok": True, "created": len(names), "names": names}
+
+
 # ---- Genel/Esnek uç nokta --------------------------------------------------
 
 @frappe.whitelist(allow_guest=True, methods=["POST", "PUT"])
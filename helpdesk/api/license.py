@@ -1,14 +1,15 @@
 # -*- coding: utf-8 -*-
 # TR: HelpdeskAI lisans akışları – LMFWC v2 REST API uyarlaması
 from __future__ import annotations
-import json, uuid, time, os, hashlib, socket, platform
+import json, uuid, time, os, hashlib, socket, platform, base64
+from datetime import datetime
 from typing import Dict, Any, Tuple, Optional
 from urllib.parse import urlparse
 import requests
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import RequestException, Timeout
 import frappe
-from frappe.utils import now_datetime, get_datetime, add_days
+from frappe.utils import now_datetime, get_datetime, add_days, cint
 
 # ---------------------------------------------------------------------------
 # TR: Uç noktalar (LMFWC v2)
@@ -31,7 +32,21 @@ BILLING_GRACE_DAYS = 30  # L: Sunucu ulaşılamazsa son başarılı validate'ten
 # TR: Settings dokümanı
 
 def _settings():
-    return frappe.get_single("HelpdeskAI Settings")  # L: Single doctype
+    return frappe.get_single("HelpdeskAI Settings")  # L: Single doctype (yazma yolları)
+
+
+def _settings_ro():
+    # L: helpdesk.helpdesk paketi import edilirken license_guard bu modülü yüklüyor → döngüyü önlemek için geç import
+    from helpdesk.helpdesk.utils.settings_snapshot import get_ai_settings
+
+    return get_ai_settings()  # L: Salt-okunur snapshot (okuma yolları; kayıtta geçersiz kılınır)
+
+
+def _reset_guard_state():
+    # L: Aktivasyon durumu değişti → license_guard'ın süreç içi (negatif) önbelleğini at
+    from helpdesk.api.license_guard import reset_license_state
+
+    reset_license_state(getattr(frappe.local, "site", None) or "")
 
 # ---------------------------------------------------------------------------
 # TR: Domain doğrulama – sadece beklenen mağaza domainine izin
@@ -94,17 +109,17 @@ def _stable_fingerprint() -> str:
     except Exception:
         raw = f"fallback::{host}::{uuid.uuid4()}"
 
-    st = _settings()
+    st = _settings_ro()
     salt = getattr(st, "site_salt", "") or ""
     return _sha256_hex((salt + "::" + raw).encode("utf-8"))
 
 
 def _ensure_device_fingerprint() -> str:
     """TR: Settings'te yoksa üretip yazar, varsa aynen döner."""
-    st = _settings()
-    fp = (getattr(st, "device_fingerprint", "") or "").strip()
+    fp = (getattr(_settings_ro(), "device_fingerprint", "") or "").strip()
     if not fp:
         fp = _stable_fingerprint()
+        st = _settings()
         st.device_fingerprint = fp
         st.save(ignore_permissions=True)
         frappe.db.commit()
@@ -146,7 +161,7 @@ def _lm_auth() -> HTTPBasicAuth | None:
         cs = cs or (conf.get("lmfwc_consumer_secret") or "").strip()
     # 3) HelpdeskAI Settings
     if not (ck and cs):
-        st = _settings()
+        st = _settings_ro()
         ck = ck or (getattr(st, "lmfwc_consumer_key", "") or "").strip()
         cs = cs or (getattr(st, "lmfwc_consumer_secret", "") or "").strip()
     return HTTPBasicAuth(ck, cs) if (ck and cs) else None
@@ -182,7 +197,7 @@ def _write_audit(action: str, status: str, source: str, license_key: str | None
     doc.user = frappe.session.user if frappe.session else None
     doc.ip_address = getattr(frappe.local, "request_ip", None)
     doc.license_key_mask = masked
-    st = _settings()
+    st = _settings_ro()
     doc.instance_id = getattr(st, "instance_id", "")
     doc.app_version = _app_version()
     if extra:
@@ -285,6 +300,174 @@ def _derive_expiry(payload: Dict[str, Any]) -> Optional[str]:
     return None
 
 
+# ---------------------------------------------------------------------------
+# TR: İmzalı lisans belgesi (offline doğrulama)
+#   Sunucu activate/validate yanıtında `data.license_token` döner:
+#     base64url(JSON claims) + "." + base64url(Ed25519 imza)
+#   Claims: sub (sha256(license_key)), exp (epoch), nbf?, fp? (device fingerprint), features[]
+#   İmza yalnız uygulama paketiyle gelen satıcı açık anahtar(lar)ıyla (license_keys/*.pem)
+#   doğrulanır; site_config'e güvenilmez (site yöneticisi kendi anahtarını koyup belge
+#   imzalayabilirdi). Paket anahtar içermiyorsa yerel doğrulama kapalıdır, karar uzakta verilir.
+
+LICENSE_KEYS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "license_keys")
+TOKEN_REFRESH_SECONDS = 24 * 3600  # L: Yerel belge geçerliyken uzak doğrulama en fazla günde bir
+TOKEN_RENEW_BEFORE_DAYS = 3        # L: Bitişe bu kadar gün kala uzak yenileme zorunlu
+
+_bundled_pems: Tuple[str, ...] | None = None
+_pubkey_cache: Dict[Tuple[str, ...], list] = {}
+_claims_cache: Dict[str, Dict[str, Any]] = {}  # L: token → imzası doğrulanmış claims
+
+
+def _b64url_decode(s: str) -> bytes:
+    return base64.urlsafe_b64decode(s + "=" * (-len(s) % 4))
+
+
+def _public_key_pems() -> Tuple[str, ...]:
+    global _bundled_pems
+    if _bundled_pems is None:
+        pems = []
+        try:
+            for fname in sorted(os.listdir(LICENSE_KEYS_DIR)):
+                if fname.endswith(".pem"):
+                    with open(os.path.join(LICENSE_KEYS_DIR, fname)) as f:
+                        pems.append(f.read())
+        except OSError:
+            pass
+        _bundled_pems = tuple(pems)
+    return _bundled_pems
+
+
+def _public_keys() -> list:
+    pems = _public_key_pems()
+    keys = _pubkey_cache.get(pems)
+    if keys is None:
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+        from cryptography.hazmat.primitives.serialization import load_pem_public_key
+
+        keys = []
+        for pem in pems:
+            try:
+                key = load_pem_public_key(pem.encode("utf-8"))
+            except Exception:
+                continue
+            if isinstance(key, Ed25519PublicKey):
+                keys.append(key)
+        _pubkey_cache[pems] = keys
+    return keys
+
+
+def _token_claims(token: str) -> Optional[Dict[str, Any]]:
+    """TR: İmzası doğrulanmış claims (süre/cihaz kontrolü yapılmaz); geçersizse None."""
+    if token in _claims_cache:
+        return _claims_cache[token]
+    try:
+        payload_b64, sig_b64 = token.strip().split(".")
+        sig = _b64url_decode(sig_b64)
+    except Exception:
+        return None
+
+    from cryptography.exceptions import InvalidSignature
+
+    for key in _public_keys():
+        try:
+            key.verify(sig, payload_b64.encode("ascii"))
+        except InvalidSignature:
+            continue
+        try:
+            claims = json.loads(_b64url_decode(payload_b64))
+        except Exception:
+            return None
+        if len(_claims_cache) > 32:
+            _claims_cache.clear()
+        _claims_cache[token] = claims
+        return claims
+    return None
+
+
+def check_license_token(
+    token: str | None = None,
+    license_key: str | None = None,
+    fingerprint: str | None = None,
+) -> Dict[str, Any]:
+    """TR: İmzalı lisans belgesini ağ çağrısı olmadan doğrular.
+    Dönüş: {"ok", "status": valid|expired|invalid|missing, "reason"?, "expires_at"?, "features"?}
+    """
+    st = _settings_ro()
+    token = (token or getattr(st, "license_token", "") or "").strip()
+    if not token:
+        return {"ok": False, "status": "missing"}
+    if not _public_keys():
+        # TR: Pakette satıcı anahtarı yok → yerel doğrulama devre dışı
+        return {"ok": False, "status": "missing", "reason": "no_public_key"}
+
+    claims = _token_claims(token)
+    if not claims:
+        return {"ok": False, "status": "invalid", "reason": "bad_signature"}
+
+    key = (license_key or getattr(st, "license_key", "") or "").strip()
+    if claims.get("sub") and claims["sub"] != _sha256_hex(key.encode("utf-8")):
+        return {"ok": False, "status": "invalid", "reason": "license_mismatch"}
+
+    fp = (fingerprint or getattr(st, "device_fingerprint", "") or "").strip()
+    if claims.get("fp") and claims["fp"] != fp:
+        return {"ok": False, "status": "invalid", "reason": "device_mismatch"}
+
+    now = time.time()
+    if claims.get("nbf") and now < float(claims["nbf"]):
+        return {"ok": False, "status": "invalid", "reason": "not_yet_valid"}
+    exp = float(claims.get("exp") or 0)
+    res = {
+        "expires_at": datetime.fromtimestamp(exp) if exp else None,
+        "features": list(claims.get("features") or []),
+    }
+    if not exp or now >= exp:
+        return {"ok": False, "status": "expired", **res}
+    return {"ok": True, "status": "valid", **res}
+
+
+def _store_license_token(st, payload: Dict[str, Any], fingerprint: str | None = None) -> bool:
+    """TR: Sunucu yanıtındaki imzalı belgeyi doğrulayıp Settings'e yazar (save çağıran tarafta)."""
+    token = (payload or {}).get("license_token") or (payload or {}).get("licenseToken")
+    if not token:
+        return False
+    res = check_license_token(token, getattr(st, "license_key", None), fingerprint or getattr(st, "device_fingerprint", None))
+    if not res["ok"]:
+        return False
+    st.license_token = token
+    st.license_token_expires = res["expires_at"]
+    st.license_features = ", ".join(res["features"])
+    return True
+
+
+def _clear_license_token(st):
+    st.license_token = None
+    st.license_token_expires = None
+    st.license_features = None
+
+
+def _remote_refresh_due(st, local: Dict[str, Any]) -> bool:
+    """TR: Yerel belge geçerliyken uzak kontrol yalnız bitiş yaklaşınca veya günde bir yapılır."""
+    exp = local.get("expires_at")
+    if exp and get_datetime(exp) <= add_days(now_datetime(), TOKEN_RENEW_BEFORE_DAYS):
+        return True
+    last = getattr(st, "last_check_on", None)
+    if not last:
+        return True
+    return (now_datetime() - get_datetime(last)).total_seconds() > TOKEN_REFRESH_SECONDS
+
+
+def _local_result(local: Dict[str, Any], **extra) -> Dict[str, Any]:
+    frappe.cache().set_value(CACHE_STATUS_KEY, "valid"); frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
+    return {
+        "ok": True,
+        "status": "valid",
+        "source": "local",
+        "expires_at": _iso(local.get("expires_at")),
+        "features": local.get("features") or [],
+        **extra,
+    }
+
+
 # ---------------------------------------------------------------------------
 # TR: Public API – Activate / Reactivate / Deactivate / Validate
 
@@ -324,10 +507,12 @@ def activate(license_key: str | None = None) -> Dict[str, Any]:
             st.last_ok_on = now_datetime()
             st.last_check_on = now_datetime(); st.last_check_status = "VALID"
             st.device_fingerprint = fp
+            _store_license_token(st, payload, fp)
             st.save(ignore_permissions=True); frappe.db.commit()
 
             frappe.cache().set_value(CACHE_STATUS_KEY, "valid")
             frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
+            _reset_guard_state()
 
             _write_audit("Activate", "OK", "Server", key, {"http": resp.status_code, "raw": data})
             return {"ok": True, "status": "activated", "data": data}
@@ -373,12 +558,14 @@ def reactivate(license_key: str | None = None) -> Dict[str, Any]:
             st.activation_token = tok2
             if exp:
                 st.expires_at = get_datetime(exp)
+            _store_license_token(st, payload)
 
             st.last_ok_on = now_datetime()
             st.last_check_on = now_datetime(); st.last_check_status = "VALID"
             st.save(ignore_permissions=True); frappe.db.commit()
             frappe.cache().set_value(CACHE_STATUS_KEY, "valid")
             frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
+            _reset_guard_state()
             _write_audit("Reactivate", "OK", "Server", key, {"http": resp.status_code, "raw": data})
             return {"ok": True, "status": "reactivated", "data": data}
 
@@ -411,10 +598,12 @@ def deactivate(license_key: str | None = None) -> Dict[str, Any]:
 
         if resp.ok and _lm_ok(data):
             st.activation_token = None
+            _clear_license_token(st)
             st.last_check_on = now_datetime(); st.last_check_status = "INVALID"
             st.save(ignore_permissions=True); frappe.db.commit()
             frappe.cache().set_value(CACHE_STATUS_KEY, "invalid")
             frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
+            _reset_guard_state()
             _write_audit("Deactivate", "OK", "Server", key, {"http": resp.status_code, "raw": data})
             return {"ok": True, "status": "deactivated", "data": data}
 
@@ -431,8 +620,14 @@ def deactivate(license_key: str | None = None) -> Dict[str, Any]:
 
 
 @frappe.whitelist(methods=["GET", "POST"])
-def validate(license_key: str | None = None, update_settings: int | bool = 1) -> Dict[str, Any]:
-    """TR: Lisans doğrulama (LMFWC v2 /validate). Sunucuya ulaşılamazsa GRACE: last_ok_on + 30g."""
+def validate(
+    license_key: str | None = None,
+    update_settings: int | bool = 1,
+    remote: int | bool | None = None,
+) -> Dict[str, Any]:
+    """TR: Lisans doğrulama (LMFWC v2 /validate). Sunucuya ulaşılamazsa GRACE: last_ok_on + 30g.
+    İmzalı lisans belgesi geçerliyse karar yerelde verilir; uzak kontrol yalnız yenileme
+    zamanı geldiğinde (veya remote=1 ile) yapılır."""
     st = _settings()
     key = (license_key or getattr(st, "license_key", "") or "").strip()
     if not key:
@@ -442,6 +637,10 @@ def validate(license_key: str | None = None, update_settings: int | bool = 1) ->
     st.reload()
     upd = bool(int(update_settings)) if isinstance(update_settings, (int, str)) else bool(update_settings)
 
+    local = check_license_token(getattr(st, "license_token", None), key, fp)
+    if local["ok"] and not cint(remote) and not _remote_refresh_due(st, local):
+        return _local_result(local)
+
     url = LMFWC_VALIDATE_URL.format(license_key=key)
     try:
         resp = _get(url)
@@ -468,6 +667,7 @@ def validate(license_key: str | None = None, update_settings: int | bool = 1) ->
                         st.activation_token = active_rec.get("token")
                 except Exception:
                     pass
+                _store_license_token(st, payload, fp)
                 st.save(ignore_permissions=True); frappe.db.commit()
             frappe.cache().set_value(CACHE_STATUS_KEY, "valid"); frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
             _write_audit("Validate", "OK", "Server", key, {"http": resp.status_code, "raw": data})
@@ -476,6 +676,7 @@ def validate(license_key: str | None = None, update_settings: int | bool = 1) ->
         # TR: Sunucu success:false → invalid
         if resp.ok and not _lm_ok(data):
             if upd:
+                _clear_license_token(st)  # L: İptal edilen lisansın yerel belgesi de geçersiz
                 st.last_check_on = now_datetime(); st.last_check_status = "INVALID"; st.save(ignore_permissions=True); frappe.db.commit()
             frappe.cache().set_value(CACHE_STATUS_KEY, "invalid"); frappe.cache().set_value(CACHE_LAST_CHECK, int(time.time()))
             _write_audit("Validate", "FAIL", "Server", key, {"http": resp.status_code, "raw": data})
@@ -489,7 +690,10 @@ def validate(license_key: str | None = None, update_settings: int | bool = 1) ->
         return {"ok": False, "status": "invalid", "data": data}
 
     except (RequestException, Timeout) as e:
-        # TR: Ağ hatasında GRACE: last_ok_on + 30 gün
+        # TR: Ağ hatasında önce imzalı belge; yoksa GRACE: last_ok_on + 30 gün
+        if local["ok"]:
+            _write_audit("Validate", "OK", "Server", key, {"network_error": str(e), "offline": True})
+            return _local_result(local, error=str(e))
         last_ok = getattr(st, "last_ok_on", None)
         in_grace, grace_until = _grace_by_last_ok(last_ok)
         if in_grace:
@@ -506,6 +710,9 @@ def validate(license_key: str | None = None, update_settings: int | bool = 1) ->
     except Exception as e:
         if isinstance(e, frappe.PermissionError):
             raise
+        if local["ok"]:
+            _write_audit("Validate", "OK", "Server", key, {"exception": str(e), "offline": True})
+            return _local_result(local, error=str(e))
         last_ok = getattr(st, "last_ok_on", None)
         in_grace, grace_until = _grace_by_last_ok(last_ok)
         if in_grace:
@@ -546,6 +753,11 @@ def gatekeeper() -> Dict[str, Any]:
         stale = (NOW - last) > 3600 or (not status or status == "unknown")
 
     if stale:
+        # TR: İmzalı belge geçerliyse ağa çıkmadan karar ver
+        local = check_license_token()
+        if local["ok"]:
+            _local_result(local)
+            return {"ok": True, "status": "valid"}
         try:
             res = validate(update_settings=0)
             status = (res or {}).get("status", status).lower()
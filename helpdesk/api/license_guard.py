@@ -2,6 +2,7 @@
 from __future__ import annotations
 from urllib.parse import urlparse
 import threading
+import time
 
 import requests
 import frappe
@@ -16,9 +17,37 @@ _guard_lock = threading.Lock()
 _installed = False
 _orig_request = None
 
+# TR: Süreç içi lisans durumu önbelleği (site başına).
+#   - Taze (STATE_TTL) iken guard ne Redis'e ne ağa gider.
+#   - Geçerli durum bayatladığında STALE_TTL boyunca eski sonuç dönülür;
+#     yenilemeyi kilidi alan TEK istek arka plan iş parçacığında başlatır
+#     (single-flight); hiçbir istek yenilemeyi beklemez.
+#   - Geçersiz sonuç negatif önbelleğe alınır; her başarısız yenilemede bekleme
+#     süresi NEGATIVE_TTL_MIN'den NEGATIVE_TTL_MAX'a kadar ikiye katlanır.
+STATE_TTL = 60
+STALE_TTL = 600
+NEGATIVE_TTL_MIN = 5
+NEGATIVE_TTL_MAX = 300
 
-def _license_ok() -> bool:
-    """Cache'den hızlı kontrol; yoksa hafif verify (ayar yazmaz)."""
+_states: dict[str, dict] = {}
+_refresh_locks: dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _site() -> str:
+    return getattr(frappe.local, "site", None) or ""
+
+
+def _refresh_lock(site: str) -> threading.Lock:
+    lock = _refresh_locks.get(site)
+    if lock is None:
+        with _locks_guard:
+            lock = _refresh_locks.setdefault(site, threading.Lock())
+    return lock
+
+
+def _check_license() -> bool:
+    """Redis durumu; yoksa hafif verify (ayar yazmaz). Ağ/Redis maliyeti burada."""
     try:
         status = (frappe.cache().get_value(license_api.CACHE_STATUS_KEY) or "unknown").lower()
     except Exception:
@@ -34,6 +63,73 @@ def _license_ok() -> bool:
         return False
 
 
+def _refresh(site: str, previous: dict | None) -> bool:
+    ok = _check_license()
+    now = time.monotonic()
+    if ok:
+        _states[site] = {"ok": True, "fresh_until": now + STATE_TTL, "stale_until": now + STATE_TTL + STALE_TTL}
+    else:
+        backoff = NEGATIVE_TTL_MIN
+        if previous and not previous["ok"]:
+            backoff = min(previous.get("backoff", NEGATIVE_TTL_MIN) * 2, NEGATIVE_TTL_MAX)
+        _states[site] = {"ok": False, "fresh_until": now + backoff, "stale_until": now + backoff, "backoff": backoff}
+    return ok
+
+
+def _refresh_in_background(site: str, previous: dict, lock: threading.Lock) -> None:
+    """Yenilemeyi istek dışında yap; `lock` çağıran tarafından alınmış olmalı, burada bırakılır."""
+    sites_path = getattr(frappe.local, "sites_path", None)
+
+    def run():
+        try:
+            frappe.init(site=site, sites_path=sites_path)
+            frappe.connect()
+            _refresh(site, previous)
+        except Exception:
+            # TR: Bayat sonuç stale_until'e kadar dönülmeye devam eder; sonraki istek yeniden dener
+            pass
+        finally:
+            try:
+                frappe.destroy()
+            finally:
+                lock.release()
+
+    try:
+        threading.Thread(target=run, name=f"license-refresh:{site}", daemon=True).start()
+    except Exception:
+        lock.release()
+
+
+def _license_ok() -> bool:
+    site = _site()
+    state = _states.get(site)
+    now = time.monotonic()
+    if state and now < state["fresh_until"]:
+        return state["ok"]
+
+    lock = _refresh_lock(site)
+    # TR: Bayat-ama-geçerli durumda eski sonucu hemen dön; yenileme istek yolunda yapılmaz
+    if state and state["ok"] and now < state["stale_until"]:
+        if lock.acquire(blocking=False):
+            _refresh_in_background(site, state, lock)
+        return True
+
+    with lock:
+        # TR: Kilidi beklerken başka bir istek yenilemiş olabilir
+        state = _states.get(site)
+        if state and time.monotonic() < state["fresh_until"]:
+            return state["ok"]
+        return _refresh(site, state)
+
+
+def reset_license_state(site: str | None = None) -> None:
+    """Süreç içi durumu at (lisans aktivasyonu/testler)."""
+    if site is None:
+        _states.clear()
+    else:
+        _states.pop(site, None)
+
+
 def install_global_http_guard() -> None:
     """
     requests.sessions.Session.request seviyesinde global HTTP koruması.
@@ -0,0 +1,109 @@
+import frappe
+from frappe.desk.form.assign_to import add as add_assignment
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, nowdate
+
+from helpdesk.api.dashboard import get_dashboard_data, get_prewarmed, prewarm_cache
+from helpdesk.test_utils import make_ticket
+
+
+class TestDashboard(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.team = f"Dashboard {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Team", "team_name": self.team}).insert(
+            ignore_permissions=True
+        )
+        self.filters = {
+            "from_date": add_days(nowdate(), -1),
+            "to_date": nowdate(),
+            "team": self.team,
+        }
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def cards(self):
+        return {c["title"]: c for c in get_dashboard_data("number_card", self.filters)}
+
+    def test_number_cards_are_cached_until_a_ticket_changes(self):
+        make_ticket(agent_group=self.team)
+        resolved = make_ticket(agent_group=self.team)
+        resolved.db_set(
+            {
+                "status": "Resolved",
+                "agreement_status": "Fulfilled",
+                "feedback_rating": 0.8,
+            },
+            update_modified=False,
+        )
+
+        cards = self.cards()
+        self.assertEqual(cards["Tickets"]["value"], 2)
+        self.assertEqual(cards["% SLA Fulfilled"]["value"], 100)
+        self.assertAlmostEqual(cards["Avg. Feedback Rating"]["value"], 4.0)
+
+        # A raw update bypasses doc_events: the cached cards are served as-is
+        frappe.db.set_value(
+            "HD Ticket", resolved.name, "agent_group", None, update_modified=False
+        )
+        self.assertEqual(self.cards()["% SLA Fulfilled"]["value"], 100)
+
+        # A new ticket invalidates the cache and the cards are recomputed
+        make_ticket(agent_group=self.team)
+        cards = self.cards()
+        self.assertEqual(cards["Tickets"]["value"], 2)
+        self.assertEqual(cards["% SLA Fulfilled"]["value"], 0)
+
+    def test_trend_and_master_charts_read_the_daily_rollup(self):
+        make_ticket(agent_group=self.team)
+        make_ticket(agent_group=self.team, via_customer_portal=1)
+
+        ticket_trend, _ = get_dashboard_data("trend", self.filters)
+        today = [r for r in ticket_trend["data"] if str(r.date) == nowdate()]
+        self.assertEqual(today[0].open, 2)
+
+        team_chart, _, _, channel_chart = get_dashboard_data("master", self.filters)
+        self.assertEqual(team_chart["data"][0].count, 2)
+        self.assertEqual(
+            {r.channel: r.count for r in channel_chart["data"]},
+            {"Portal": 1, "Email": 1},
+        )
+
+    def test_master_breakdowns_for_an_agent(self):
+        assigned = make_ticket(agent_group=self.team, via_customer_portal=1)
+        make_ticket(agent_group=self.team)
+        add_assignment(
+            {
+                "doctype": "HD Ticket",
+                "name": assigned.name,
+                "assign_to": ["Administrator"],
+            }
+        )
+
+        filters = {**self.filters, "agent": "Administrator"}
+        team_chart, type_chart, priority_chart, channel_chart = get_dashboard_data(
+            "master", filters
+        )
+        self.assertEqual(
+            [(r.team, r.count) for r in team_chart["data"]], [(self.team, 1)]
+        )
+        self.assertEqual(sum(r.count for r in type_chart["data"]), 1)
+        self.assertEqual(sum(r.count for r in priority_chart["data"]), 1)
+        self.assertEqual(
+            {r.channel: r.count for r in channel_chart["data"]}, {"Portal": 1}
+        )
+
+    def test_standard_ranges_are_served_prewarmed(self):
+        make_ticket(agent_group=self.team)
+        self.filters["from_date"] = add_days(nowdate(), -30)
+
+        prewarm_cache()
+        prewarmed = get_prewarmed("number_card", 30, self.team)
+        self.assertEqual(prewarmed[0]["value"], 1)
+        self.assertEqual(self.cards()["Tickets"]["value"], 1)
+
+        # A ticket of the team in the window moves its stamp
+        make_ticket(agent_group=self.team)
+        self.assertIsNone(get_prewarmed("number_card", 30, self.team))
+        self.assertEqual(self.cards()["Tickets"]["value"], 2)
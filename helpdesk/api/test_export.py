@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime
+
+from helpdesk.api.export import export_list, export_report
+from helpdesk.test_utils import make_ticket
+
+
+class TestExport(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.team = f"Export {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Team", "team_name": self.team}).insert(
+            ignore_permissions=True
+        )
+        self.tickets = [
+            str(make_ticket(subject=f"Export {i}", agent_group=self.team).name)
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def export(self, file_format):
+        return export_list(
+            "HD Ticket",
+            fields=["name", "subject"],
+            filters={"agent_group": self.team},
+            file_format=file_format,
+            chunk_size=2,
+        )
+
+    def test_list_is_streamed_in_keyset_chunks(self):
+        body = b"".join(self.export("CSV").response).decode()
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual([r["name"] for r in rows], self.tickets[::-1])
+
+        lines = b"".join(self.export("NDJSON").response).decode().splitlines()
+        self.assertEqual(
+            [str(json.loads(line)["name"]) for line in lines], self.tickets[::-1]
+        )
+
+    def test_body_is_read_after_the_request_context_is_gone(self):
+        response = self.export("NDJSON")
+        # The body is only read after the request, so the rows must be committed
+        frappe.db.commit()
+        self.addCleanup(self.delete_committed)
+        site, sites_path = frappe.local.site, frappe.local.sites_path
+
+        # As in `frappe.app.application`: the context is released before werkzeug
+        # iterates the response body
+        frappe.destroy()
+        try:
+            body = b"".join(response.response).decode()
+        finally:
+            frappe.init(site=site, sites_path=sites_path)
+            frappe.connect()
+            frappe.set_user("Administrator")
+
+        names = [str(json.loads(line)["name"]) for line in body.splitlines()]
+        self.assertEqual(names, self.tickets[::-1])
+
+    def delete_committed(self):
+        for ticket in self.tickets:
+            frappe.delete_doc("HD Ticket", ticket, ignore_permissions=True, force=True)
+        frappe.delete_doc("HD Team", self.team, ignore_permissions=True, force=True)
+        frappe.db.commit()
+
+    def test_report_rows_are_exported(self):
+        ticket = make_ticket(subject="Export report")
+        ticket.db_set(
+            "creation", get_datetime("2001-01-01 10:30:00"), update_modified=False
+        )
+
+        response = export_report(
+            "Support Hour Distribution",
+            filters={"from_date": "2001-01-01", "to_date": "2001-01-02"},
+        )
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.response).decode())))
+        self.assertEqual([r["date"] for r in rows], ["2001-01-01", "2001-01-02"])
+        self.assertEqual(rows[0]["9AM - 12PM"], "1")
+        self.assertIn(
+            "support_hour_distribution.csv", response.headers["Content-Disposition"]
+        )
+
+    def test_unknown_format_is_rejected(self):
+        with self.assertRaises(frappe.ValidationError):
+            export_list("HD Ticket", file_format="XLSX")
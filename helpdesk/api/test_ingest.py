@@ -7,7 +7,8 @@ FrappeTestCase tabanlı kapsamlı birim testleri.
   get_articles, get_ticket (partial), get_routing_context, get_shadow_status
 - POST/PUT uç noktaları: ingest_summary, set_reply_suggestion, set_sentiment,
   set_metrics, set_flags, update_ticket (whitelist/append/clean_html/shadow override)
-- KB Update Requests: request_kb_new_article, request_kb_fix, request_kb_update, report_kb_wrong_document
+- KB Update Requests: request_kb_new_article, request_kb_fix, request_kb_update, report_kb_wrong_document,
+  request_kb_batch
 - Problem Ticket: upsert(create/update/preview/strict), list_problem_tickets, get_problem_ticket
 
 Çalıştırma:
@@ -75,6 +76,20 @@ class TestGetEndpoints(FrappeTestCase):
         self.assertIn("members", found)
         self.assertIn(user, found.get("members", []))
 
+    def test_catalog_etag_changes_with_team_edits(self):
+        _ensure_team_and_member()
+        first = frappe.call("helpdesk.api.ingest.get_teams", include_members=1)
+        again = frappe.call("helpdesk.api.ingest.get_teams", include_members=1)
+        self.assertTrue(first.get("etag"))
+        self.assertEqual(first.get("etag"), again.get("etag"))
+        # Yeni takım → sürüm yenilenir, yeni takım listede görünür
+        t = frappe.new_doc("HD Team")
+        t.team_name = f"Catalog {uuid.uuid4().hex[:6]}"
+        t.insert(ignore_permissions=True)
+        after = frappe.call("helpdesk.api.ingest.get_teams", include_members=1)
+        self.assertNotEqual(first.get("etag"), after.get("etag"))
+        self.assertIn(t.name, [r.get("name") for r in after.get("teams") or []])
+
     def test_get_ticket_partial_fields_and_shadow_flag(self):
         t = _new_ticket("Partial Fields")
         want = ["name", "subject", "ai_summary"]
@@ -117,6 +132,32 @@ class TestGetEndpoints(FrappeTestCase):
         names_by_user = {cstr(r.get("name")) for r in (by_user.get("tickets") or [])}
         self.assertIn(cstr(t), names_by_user)
 
+    def test_ticket_list_cursor_and_changes_since(self):
+        team, _ = _ensure_team_and_member()
+        made = [_new_ticket("Cursor Page") for _ in range(3)]
+        # Cursor ile sayfa sayfa gez: tekrar yok, sıra (modified, name) desc
+        seen, cursor = [], None
+        for _ in range(100):
+            page = frappe.call(
+                "helpdesk.api.ingest.get_tickets_by_team", team=team, limit=2, cursor=cursor
+            )
+            seen.extend(cstr(r.get("name")) for r in page.get("tickets") or [])
+            cursor = page.get("next_cursor")
+            if not cursor:
+                break
+        self.assertEqual(len(seen), len(set(seen)))
+        for t in made:
+            self.assertIn(cstr(t), seen)
+
+        # changes_since: watermark sonrası sadece güncellenen bilet döner
+        feed = frappe.call("helpdesk.api.ingest.get_tickets_by_team", team=team, changes_since="2000-01-01", limit=1000)
+        watermark = feed.get("watermark")
+        self.assertTrue(watermark)
+        frappe.db.set_value("HD Ticket", made[0], "ai_summary", "touch")  # modified güncellenir
+        frappe.db.commit()
+        delta = frappe.call("helpdesk.api.ingest.get_tickets_by_team", team=team, changes_since=watermark)
+        self.assertEqual([cstr(r.get("name")) for r in delta.get("tickets") or []], [cstr(made[0])])
+
     def test_get_articles_and_routing_context(self):
         # get_articles çalışmalı (boş sistemde de boş/ok döner)
         arts = frappe.call("helpdesk.api.ingest.get_articles", q="", limit=5)
@@ -189,6 +230,52 @@ class TestSetterAndUpdateEndpoints(FrappeTestCase):
         m = frappe.call("helpdesk.api.ingest.set_metrics", ticket=t, effort_score=0.55, cluster_hash="abc123")
         self.assertTrue(m.get("ok"))
 
+    def test_fast_write_bumps_modified_and_link_uses_full_save(self):
+        from helpdesk.api.ingest import _apply_ticket_updates
+
+        t = _new_ticket("Fast Write")
+        before = frappe.db.get_value("HD Ticket", t, "modified")
+        fast = _apply_ticket_updates(
+            t, {"ai_summary": "fast path", "effort_score": 0.4}, respect_shadow=False, fast_write=True
+        )
+        self.assertTrue(fast.get("ok"))
+        row = frappe.db.get_value("HD Ticket", t, ["ai_summary", "effort_score", "modified"], as_dict=True)
+        self.assertEqual(row.ai_summary, "fast path")
+        self.assertAlmostEqual(row.effort_score, 0.4)
+        # Varsayılan: hızlı yol da `modified` günceller (changes_since akışları görsün)
+        self.assertNotEqual(row.modified, before)
+        # LINK alanı hızlı yola zorlansa da tam kaydetmeden geçer
+        team, _ = _ensure_team_and_member()
+        full = _apply_ticket_updates(t, {"agent_group": team}, respect_shadow=False, fast_write=True)
+        self.assertTrue(full.get("ok"))
+        self.assertNotEqual(frappe.db.get_value("HD Ticket", t, "modified"), row.modified)
+
+    def test_cluster_rollup_tracks_hash_and_status(self):
+        cluster = f"clu-{uuid.uuid4().hex[:10]}"
+        t1, t2 = _new_ticket("Cluster A"), _new_ticket("Cluster B")
+        for t in (t1, t2):
+            frappe.call("helpdesk.api.ingest.set_metrics", ticket=t, cluster_hash=cluster)
+        row = frappe.db.get_value("HD Ticket Cluster", cluster, ["ticket_count", "open_count"], as_dict=True)
+        self.assertEqual((row.ticket_count, row.open_count), (2, 2))
+
+        # Durum değişimi open_count'u günceller (tam kaydetme → doc_events)
+        doc = frappe.get_doc("HD Ticket", t1)
+        doc.status = "Closed"
+        doc.save(ignore_permissions=True)
+        self.assertEqual(frappe.db.get_value("HD Ticket Cluster", cluster, "open_count"), 1)
+
+        top = frappe.call("helpdesk.api.ingest.get_top_clusters", days=1, min_count=2, limit=100)
+        hit = next(c for c in top.get("clusters") if c.get("cluster_hash") == cluster)
+        self.assertEqual(hit.get("window_count"), 2)
+
+        members = frappe.call("helpdesk.api.ingest.get_cluster_tickets", cluster_hash=cluster, limit=1)
+        self.assertEqual(len(members.get("tickets")), 1)
+        self.assertTrue(members.get("next_cursor"))
+
+        # Başka kümeye taşınan bilet eski kümeden düşer
+        frappe.call("helpdesk.api.ingest.set_metrics", ticket=t2, cluster_hash=cluster + "-b")
+        self.assertEqual(frappe.db.get_value("HD Ticket Cluster", cluster, "ticket_count"), 1)
+
     def test_update_ticket_whitelist_link_and_reject(self):
         t = _new_ticket("Update Ticket")
         team, _ = _ensure_team_and_member()
@@ -270,6 +357,33 @@ class TestKBRequests(FrappeTestCase):
             frappe.call("helpdesk.api.ingest.request_kb_new_article", fields={"priority": "Low"})
 
 
+    def test_kb_batch_is_all_or_nothing(self):
+        dt = "Knowledge Base Update Request"
+        before = frappe.db.count(dt)
+        bad = frappe.call(
+            "helpdesk.api.ingest.request_kb_batch",
+            items=json.dumps([
+                {"type": "fix", "fields": {"subject": "Batch typo"}},
+                {"type": "fix", "fields": {"priority": "Low"}},  # subject yok
+                {"type": "rewrite", "fields": {"subject": "x"}},  # geçersiz tür
+            ]),
+        )
+        self.assertFalse(bad.get("ok"))
+        self.assertEqual([e["index"] for e in bad.get("errors")], [1, 2])
+        self.assertEqual(frappe.db.count(dt), before)
+
+        ok = frappe.call(
+            "helpdesk.api.ingest.request_kb_batch",
+            items=[
+                {"type": "new_article", "fields": {"subject": "Batch article", "priority": "Low"}},
+                {"change_type": "Deprecate", "subject": "Batch obsolete"},
+            ],
+        )
+        self.assertTrue(ok.get("ok"))
+        self.assertEqual(ok.get("created"), 2)
+        self.assertEqual(frappe.db.get_value(dt, ok["names"][1], "change_type"), "Deprecate")
+        self.assertEqual(frappe.db.count(dt), before + 2)
+
 class TestProblemTickets(FrappeTestCase):
     def test_problem_ticket_create_update_preview_and_list(self):
         # Create (strict=1 default)
@@ -319,3 +433,28 @@ class TestProblemTickets(FrappeTestCase):
         got = frappe.call("helpdesk.api.ingest.get_problem_ticket", name=prob_name)
         self.assertTrue(got.get("ok"))
         self.assertEqual(got.get("problem", {}).get("name"), prob_name)
+
+    def test_bulk_upsert_resolves_by_normalized_subject(self):
+        subject = f"Bulk Prob {uuid.uuid4().hex[:6]}"
+        first = frappe.call(
+            "helpdesk.api.ingest.bulk_upsert_problem_tickets",
+            items=json.dumps([
+                {"subject": subject, "severity": "High"},
+                {"subject": "  " + subject.upper() + " ", "severity": "High"},  # aynı problem
+                {"fields": {"subject": "x", "status": "WontDo"}},  # geçersiz select
+            ]),
+        )
+        self.assertTrue(first.get("ok"))
+        items = first.get("items")
+        self.assertTrue(items[0]["created"])
+        self.assertTrue(items[1]["no_change"])
+        self.assertEqual(items[0]["name"], items[1]["name"])
+        self.assertFalse(items[2]["ok"])
+        self.assertEqual(first.get("errors"), 1)
+
+        again = frappe.call(
+            "helpdesk.api.ingest.bulk_upsert_problem_tickets",
+            items=[{"subject": subject, "severity": "Critical"}],
+        )
+        self.assertEqual(again["items"][0]["name"], items[0]["name"])
+        self.assertEqual(again["items"][0]["changed"], {"severity": "Critical"})
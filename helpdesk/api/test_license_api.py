@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # TR: HelpdeskAI Yeni Lisans Mekanizması Ünite Testleri (activate / validate / deactivate + grace)
 import json
+import threading
+import time
 from datetime import timedelta
 from unittest.mock import patch
 
@@ -201,3 +203,190 @@ class TestLicenseAPI(FrappeTestCase):
             license_api.activate()  # TR: domain kontrolü post öncesi patlamalı
 
         post.assert_not_called()  # TR: HTTP çağrısı olmamalı
+
+
+class TestLicenseGuardCache(FrappeTestCase):
+    def setUp(self):
+        from helpdesk.api import license_guard
+
+        self.guard = license_guard
+        license_guard.reset_license_state()
+        self.addCleanup(license_guard.reset_license_state)
+
+    def test_warm_guard_skips_redis_and_network(self):
+        with patch("helpdesk.api.license_guard._check_license", return_value=True) as check:
+            for _ in range(50):
+                self.assertTrue(self.guard._license_ok())
+        check.assert_called_once()  # TR: ısındıktan sonra sıfır dış çağrı
+
+    def test_invalid_result_is_cached_with_growing_backoff(self):
+        site = self.guard._site()
+        with patch("helpdesk.api.license_guard._check_license", return_value=False) as check:
+            self.assertFalse(self.guard._license_ok())
+            self.assertFalse(self.guard._license_ok())
+            self.assertEqual(check.call_count, 1)  # TR: negatif önbellek
+            first = self.guard._states[site]["backoff"]
+
+            self.guard._states[site]["fresh_until"] = 0  # TR: bekleme süresi doldu
+            self.assertFalse(self.guard._license_ok())
+            self.assertEqual(check.call_count, 2)
+            self.assertEqual(self.guard._states[site]["backoff"], first * 2)
+
+    def test_activation_drops_the_cached_state(self):
+        site = self.guard._site()
+        with patch("helpdesk.api.license_guard._check_license", return_value=False):
+            self.assertFalse(self.guard._license_ok())  # TR: negatif sonuç önbellekte
+
+        resp = TestLicenseAPI.DummyResp("https://brvsoftware.com/activate", {"success": True, "data": {}})
+        with patch("helpdesk.api.license._get", return_value=resp):
+            self.assertTrue(license_api.activate("TEST-KEY-XXXX-1234").get("ok"))
+        self.assertNotIn(site, self.guard._states)  # TR: bir sonraki istek yeniden kontrol eder
+
+    def test_stale_valid_state_is_served_while_refreshing(self):
+        site = self.guard._site()
+        with patch("helpdesk.api.license_guard._check_license", return_value=True):
+            self.guard._license_ok()
+        self.guard._states[site]["fresh_until"] = 0  # TR: bayat ama stale penceresinde
+
+        lock = self.guard._refresh_lock(site)
+        lock.acquire()  # TR: başka bir istek yenileme yapıyor
+        try:
+            with patch("helpdesk.api.license_guard._check_license") as check:
+                self.assertTrue(self.guard._license_ok())
+            check.assert_not_called()
+        finally:
+            lock.release()
+
+    def test_stale_valid_state_is_refreshed_off_the_request_path(self):
+        site = self.guard._site()
+        with patch("helpdesk.api.license_guard._check_license", return_value=True):
+            self.guard._license_ok()
+        self.guard._states[site]["fresh_until"] = 0
+
+        release = threading.Event()
+
+        def slow_check():
+            release.wait(5)  # TR: yavaş verify() gidiş-dönüşü
+            return True
+
+        lock = self.guard._refresh_lock(site)
+        with patch("helpdesk.api.license_guard._check_license", side_effect=slow_check) as check:
+            self.assertTrue(self.guard._license_ok())  # TR: beklemeden döner
+            self.assertTrue(lock.locked())
+            self.assertTrue(self.guard._license_ok())  # TR: ikinci yenileme başlamaz
+            release.set()
+            self.assertTrue(lock.acquire(timeout=5))
+            lock.release()
+        check.assert_called_once()
+        self.assertGreater(self.guard._states[site]["fresh_until"], time.monotonic())
+
+
+class StandInLicenseServer:
+    """TR: Yerel sahte lisans sunucusu — LMFWC yanıtı + Ed25519 imzalı lisans belgesi üretir."""
+
+    def __init__(self):
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+        self.private_key = Ed25519PrivateKey.generate()
+        self.calls = 0
+
+    def sign(self, claims):
+        import base64
+
+        def b64(raw):
+            return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+        payload = b64(json.dumps(claims).encode("utf-8"))
+        return payload + "." + b64(self.private_key.sign(payload.encode("ascii")))
+
+    def token_for(self, license_key, fingerprint, days=30, **extra):
+        import hashlib
+        import time
+
+        claims = {
+            "sub": hashlib.sha256(license_key.encode("utf-8")).hexdigest(),
+            "fp": fingerprint,
+            "exp": int(time.time()) + days * 86400,
+            "features": ["ai_ingest", "webhooks"],
+            **extra,
+        }
+        return self.sign(claims)
+
+    def get(self, url, params=None, **kwargs):
+        self.calls += 1
+        st = frappe.get_single("HelpdeskAI Settings")
+        data = {
+            "success": True,
+            "data": {"license_token": self.token_for(st.license_key, st.device_fingerprint)},
+        }
+        return TestLicenseAPI.DummyResp(url, data)
+
+
+class TestSignedLicense(FrappeTestCase):
+    def setUp(self):
+        self.server = StandInLicenseServer()
+        self.keys_patcher = patch(
+            "helpdesk.api.license._public_keys", return_value=[self.server.private_key.public_key()]
+        )
+        self.keys_patcher.start()
+        self.addCleanup(self.keys_patcher.stop)
+        st = frappe.get_single("HelpdeskAI Settings")
+        st.license_key = "TEST-KEY-XXXX-1234"
+        st.license_token = None
+        st.last_check_on = None
+        st.save(ignore_permissions=True)
+        frappe.cache().delete_value(license_api.CACHE_LAST_CHECK)
+
+    def test_validate_decides_locally_after_remote_refresh(self):
+        with patch("helpdesk.api.license.requests.get", side_effect=self.server.get):
+            first = license_api.validate()
+            self.assertTrue(first.get("ok"))
+            self.assertEqual(self.server.calls, 1)  # TR: ilk doğrulama uzak
+            self.assertTrue(frappe.get_single("HelpdeskAI Settings").license_token)
+
+            second = license_api.validate()
+            self.assertEqual(second.get("source"), "local")  # TR: yenileme zamanı gelmedi
+            self.assertEqual(self.server.calls, 1)
+            self.assertIn("webhooks", second.get("features"))
+
+        # TR: Sunucu kapalı + yenileme zorlanmış → imzalı belge ile yine valid (grace değil)
+        with patch("helpdesk.api.license.requests.get", side_effect=Exception("network down")):
+            res = license_api.validate(remote=1)
+        self.assertEqual(res.get("status"), "valid")
+        self.assertEqual(res.get("source"), "local")
+
+    def test_rejects_tampered_foreign_and_expired_tokens(self):
+        st = frappe.get_single("HelpdeskAI Settings")
+        fp = license_api._ensure_device_fingerprint()
+        good = self.server.token_for(st.license_key, fp)
+        self.assertTrue(license_api.check_license_token(good, st.license_key, fp)["ok"])
+
+        payload, sig = good.split(".")
+        tampered = payload[:-2] + ("AA" if payload[-2:] != "AA" else "BB") + "." + sig
+        self.assertEqual(license_api.check_license_token(tampered, st.license_key, fp)["status"], "invalid")
+
+        other_device = self.server.token_for(st.license_key, "0" * 64)
+        res = license_api.check_license_token(other_device, st.license_key, fp)
+        self.assertEqual(res["reason"], "device_mismatch")
+
+        expired = self.server.token_for(st.license_key, fp, days=-1)
+        self.assertEqual(license_api.check_license_token(expired, st.license_key, fp)["status"], "expired")
+
+    def test_site_config_key_is_not_trusted(self):
+        from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
+
+        st = frappe.get_single("HelpdeskAI Settings")
+        fp = license_api._ensure_device_fingerprint()
+        token = self.server.token_for(st.license_key, fp)
+        pem = self.server.private_key.public_key().public_bytes(
+            Encoding.PEM, PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+
+        # TR: Paket anahtarı yokken site_config'e konan anahtar belgeyi geçerli kılmamalı
+        self.keys_patcher.stop()
+        with patch.object(license_api, "_bundled_pems", ()), patch.dict(
+            frappe.conf, {"helpdesk_license_public_key": pem}
+        ):
+            res = license_api.check_license_token(token, st.license_key, fp)
+        self.assertFalse(res["ok"])
+        self.assertEqual(res.get("reason"), "no_public_key")
@@ -0,0 +1,50 @@
+"""
+Small timing helpers shared by the benchmark scripts in this package.
+
+Benchmarks are run against a real site, e.g.:
+
+  bench --site helpdesk.localhost execute helpdesk.benchmarks.ingest_write.run
+
+`helpdesk.benchmarks.dataset` loads a large synthetic dataset to run them on.
+"""
+
+import time
+from contextlib import contextmanager
+
+
+def summarize(samples: list[float]) -> dict:
+    """Mean / p50 / p95 / max of `samples` (seconds), reported in milliseconds."""
+    if not samples:
+        return {"n": 0}
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, round(p * (len(ordered) - 1))))
+        return ordered[idx]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": round(pct(0.50) * 1000, 3),
+        "p95_ms": round(pct(0.95) * 1000, 3),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+@contextmanager
+def timer(samples: list[float]):
+    """Append the wall-clock duration of the block to `samples`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        samples.append(time.perf_counter() - start)
+
+
+def report(title: str, results: dict[str, dict]) -> dict:
+    """Print a compact comparison table and return `results` unchanged."""
+    print(title)
+    for label, stats in results.items():
+        cols = "  ".join(f"{k}={v}" for k, v in stats.items())
+        print(f"  {label:<16} {cols}")
+    return results
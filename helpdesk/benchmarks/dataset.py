@@ -0,0 +1,981 @@
+"""
+Synthetic high-volume helpdesk dataset for load and benchmark runs.
+
+  bench --site helpdesk.localhost execute helpdesk.benchmarks.dataset.generate \
+    --kwargs "{'tickets': 1000000}"
+  bench --site helpdesk.localhost execute helpdesk.benchmarks.dataset.clear
+
+Rows are written with `frappe.db.bulk_insert` in batches, bypassing document
+hooks, validation and naming. The tables maintained from those hooks (HD Ticket
+Assignee, the daily rollup, time sketches and cluster rollups) are rebuilt once
+at the end. Everything generated is tagged with `DOMAIN` / `PREFIX` so `clear`
+removes it again, and a fixed `seed` gives the same dataset on every run, so
+benchmarks of search, dashboards, reports and list views compare like with like.
+
+Shapes follow what a real desk sees: more tickets on weekdays and in business
+hours, growing volume over the period, a few teams / customers / contacts
+raising most tickets (Zipf), log-normal response and resolution times per
+priority, a backlog of open tickets, and feedback on about a third of the
+resolved ones.
+"""
+
+import hashlib
+import json
+import math
+import random
+import time
+from datetime import datetime, timedelta
+from itertools import accumulate
+
+import frappe
+from frappe.database.sequence import get_next_val, set_next_val
+from frappe.utils import add_days, getdate, now_datetime
+
+DOMAIN = "bench.example.com"
+PREFIX = "Bench"
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+TEAM_NAMES = [
+    "Billing",
+    "Technical Support",
+    "Onboarding",
+    "Accounts",
+    "Integrations",
+    "Returns",
+    "Enterprise",
+    "Mobile",
+    "Security",
+    "Shipping",
+]
+FIRST_NAMES = [
+    "Ada",
+    "Ali",
+    "Ayse",
+    "Ben",
+    "Can",
+    "Chen",
+    "Deniz",
+    "Elif",
+    "Emma",
+    "Eva",
+    "Hana",
+    "Ivan",
+    "Jonas",
+    "Kemal",
+    "Lara",
+    "Leo",
+    "Maya",
+    "Mehmet",
+    "Nina",
+    "Omar",
+    "Priya",
+    "Ravi",
+    "Sara",
+    "Selin",
+    "Tom",
+    "Yusuf",
+    "Zeynep",
+    "Zoe",
+]
+LAST_NAMES = [
+    "Aksoy",
+    "Brown",
+    "Celik",
+    "Demir",
+    "Garcia",
+    "Kaya",
+    "Kim",
+    "Lopez",
+    "Miller",
+    "Nguyen",
+    "Ozturk",
+    "Patel",
+    "Rossi",
+    "Sahin",
+    "Schmidt",
+    "Smith",
+    "Tanaka",
+    "Yilmaz",
+]
+COMPANY_WORDS = [
+    "Apex",
+    "Blue",
+    "Cedar",
+    "Delta",
+    "Echo",
+    "Nova",
+    "Orbit",
+    "Pine",
+    "Quartz",
+    "River",
+    "Summit",
+    "Vertex",
+]
+COMPANY_KINDS = [
+    "Labs",
+    "Logistics",
+    "Retail",
+    "Systems",
+    "Foods",
+    "Health",
+    "Media",
+    "Energy",
+]
+PRODUCTS = [
+    "the mobile app",
+    "the dashboard",
+    "the API",
+    "checkout",
+    "the invoice portal",
+    "SSO",
+]
+THINGS = [
+    "billing address",
+    "password",
+    "plan",
+    "payment method",
+    "email address",
+    "report",
+]
+SUBJECTS = [
+    "Cannot log in to {product}",
+    "Invoice {number} shows the wrong amount",
+    "Refund request for order {number}",
+    "{product} is very slow today",
+    "Error when exporting my {thing}",
+    "How do I change my {thing}?",
+    "Password reset email not received",
+    "Charged twice for order {number}",
+    "Feature request: bulk edit in {product}",
+    "Webhook deliveries failing since yesterday",
+    "Unable to upload attachments",
+    "Order {number} has not arrived",
+]
+SENTENCES = [
+    "I have tried clearing the cache and logging in again but nothing changed.",
+    "This started happening after the last update.",
+    "Could you please look into this as soon as possible?",
+    "We are blocked on this and our customers are waiting.",
+    "The error message says the request timed out.",
+    "I attached a screenshot of what I see on my screen.",
+    "It works on my phone but not on the desktop browser.",
+    "Our finance team needs the corrected invoice by the end of the month.",
+    "Thanks for the quick reply, that solved part of the problem.",
+    "Can you confirm when the fix will be deployed?",
+    "We checked the settings you mentioned and they look correct.",
+    "Please escalate this to the engineering team.",
+]
+REPLIES = [
+    "Thanks for reaching out, we are looking into this now.",
+    "Could you share the exact error message and the time it happened?",
+    "We have reproduced the issue and a fix is on the way.",
+    "The refund has been issued and should appear in 5-7 business days.",
+    "Please try again now, the service has been restored.",
+    "I have updated your account, let us know if anything else is needed.",
+]
+
+# (first response hours, resolution hours) per priority
+SLA_HOURS = {"Urgent": (1, 8), "High": (4, 24), "Medium": (8, 48), "Low": (24, 96)}
+PRIORITY_WEIGHTS = {"Urgent": 5, "High": 15, "Medium": 50, "Low": 30}
+# Share of tickets per hour of day (local business hours peak)
+HOUR_WEIGHTS = [
+    1,
+    1,
+    1,
+    1,
+    1,
+    2,
+    4,
+    7,
+    10,
+    12,
+    12,
+    11,
+    9,
+    10,
+    11,
+    10,
+    9,
+    7,
+    5,
+    4,
+    3,
+    2,
+    2,
+    1,
+]
+WEEKEND_SHARE = 0.35
+RATINGS = [0.2, 0.4, 0.6, 0.8, 1.0]
+RATING_WEIGHTS = [6, 6, 12, 30, 46]
+SENTIMENTS = ["Positive", "Neutral", "Negative"]
+SENTIMENT_WEIGHTS = [30, 50, 20]
+
+
+def zipf_weights(n: int, s: float = 1.0) -> list[float]:
+    """Cumulative Zipf weights for `random.choices(..., cum_weights=...)`."""
+    return list(accumulate(1 / (rank**s) for rank in range(1, n + 1)))
+
+
+def fmt(value: datetime) -> str:
+    return value.strftime(DATETIME_FORMAT)
+
+
+class DatasetGenerator:
+    def __init__(self, seed: int = 42, batch_size: int = 5000):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = now_datetime().replace(microsecond=0)
+        self.counts = {}
+
+    # Helpers
+
+    def name(self) -> str:
+        # 64 random bits: no collisions at tens of millions of rows
+        return f"{self.rng.getrandbits(64):016x}"
+
+    def insert(self, doctype: str, fields: list[str], values: list[tuple]):
+        if not values:
+            return
+        frappe.db.bulk_insert(doctype, fields, values, chunk_size=self.batch_size)
+        self.counts[doctype] = self.counts.get(doctype, 0) + len(values)
+
+    def standard(self, name, creation, owner="Administrator", modified=None) -> tuple:
+        return (name, fmt(creation), fmt(modified or creation), owner, owner)
+
+    def reserve(self, doctype: str, count: int) -> range:
+        """Names for `count` rows of an autoincrement doctype, taken off its sequence."""
+        start = get_next_val(doctype)
+        set_next_val(doctype, start + count - 1, is_val_used=True)
+        return range(start, start + count)
+
+    def person(self, index: int) -> tuple[str, str]:
+        return (
+            FIRST_NAMES[index % len(FIRST_NAMES)],
+            LAST_NAMES[(index // len(FIRST_NAMES)) % len(LAST_NAMES)],
+        )
+
+    def text(self, sentences: list[str], mean_sentences: float = 3) -> str:
+        count = max(1, min(12, round(self.rng.expovariate(1 / mean_sentences))))
+        return " ".join(self.rng.choice(sentences) for _ in range(count))
+
+    def duration(self, median_hours: float, sigma: float = 1.0) -> float:
+        """Log-normal duration in seconds around `median_hours`."""
+        return self.rng.lognormvariate(math.log(median_hours * 3600), sigma)
+
+    def created_at(self, days: int) -> datetime:
+        while True:
+            # Volume grows over the period: recent days are picked more often
+            offset = int(days * (1 - self.rng.random() ** 0.7))
+            day = getdate(add_days(self.now, -offset))
+            if day.weekday() < 5 or self.rng.random() < WEEKEND_SHARE:
+                break
+        hour = self.rng.choices(range(24), weights=HOUR_WEIGHTS)[0]
+        value = datetime(day.year, day.month, day.day, hour) + timedelta(
+            seconds=self.rng.randrange(3600)
+        )
+        return min(value, self.now)
+
+    # Reference data
+
+    def make_agents(self, teams: int, agents: int):
+        team_names = [
+            f"{PREFIX} {TEAM_NAMES[i % len(TEAM_NAMES)]} {i // len(TEAM_NAMES) + 1}"
+            for i in range(teams)
+        ]
+        created = self.now - timedelta(days=1)
+        users, roles, hd_agents = [], [], []
+        self.agents = []
+        for i in range(agents):
+            first, last = self.person(i)
+            email = f"agent{i}@{DOMAIN}"
+            self.agents.append(email)
+            users.append(
+                (
+                    *self.standard(email, created),
+                    email,
+                    first,
+                    last,
+                    f"{first} {last}",
+                    1,
+                    "System User",
+                )
+            )
+            roles.append(
+                (*self.standard(self.name(), created), email, "User", "roles", "Agent")
+            )
+            hd_agents.append(
+                (*self.standard(email, created), email, f"{first} {last}", 1)
+            )
+        self.insert(
+            "User",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "email",
+                "first_name",
+                "last_name",
+                "full_name",
+                "enabled",
+                "user_type",
+            ],
+            users,
+        )
+        self.insert(
+            "Has Role",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "parent",
+                "parenttype",
+                "parentfield",
+                "role",
+            ],
+            roles,
+        )
+        self.insert(
+            "HD Agent",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "user",
+                "agent_name",
+                "is_active",
+            ],
+            hd_agents,
+        )
+
+        # Every agent is in one team, round robin
+        self.team_agents = {team: [] for team in team_names}
+        for i, agent in enumerate(self.agents):
+            self.team_agents[team_names[i % teams]].append(agent)
+        members = []
+        member_names = iter(self.reserve("HD Team Member", agents))
+        for team, team_agents in self.team_agents.items():
+            for idx, agent in enumerate(team_agents, 1):
+                members.append(
+                    (
+                        *self.standard(next(member_names), created),
+                        team,
+                        "HD Team",
+                        "users",
+                        idx,
+                        agent,
+                    )
+                )
+        self.insert(
+            "HD Team",
+            ["name", "creation", "modified", "owner", "modified_by", "team_name"],
+            [(*self.standard(team, created), team) for team in team_names],
+        )
+        self.insert(
+            "HD Team Member",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "parent",
+                "parenttype",
+                "parentfield",
+                "idx",
+                "user",
+            ],
+            members,
+        )
+        self.teams = team_names
+        self.team_weights = zipf_weights(teams, 0.8)
+
+    def make_customers(self, customers: int, contacts: int, days: int):
+        created = self.now - timedelta(days=days + 1)
+        self.customers = [
+            f"{PREFIX} {COMPANY_WORDS[i % len(COMPANY_WORDS)]} "
+            f"{COMPANY_KINDS[(i // len(COMPANY_WORDS)) % len(COMPANY_KINDS)]} {i}"
+            for i in range(customers)
+        ]
+        self.insert(
+            "HD Customer",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "customer_name",
+                "domain",
+            ],
+            [
+                (*self.standard(c, created), c, f"c{i}.{DOMAIN}")
+                for i, c in enumerate(self.customers)
+            ],
+        )
+
+        customer_weights = zipf_weights(customers, 0.9)
+        rows, emails, links = [], [], []
+        self.contacts = []
+        for i in range(contacts):
+            first, last = self.person(i * 7 + 3)
+            email = f"{first.lower()}.{last.lower()}.{i}@{DOMAIN}"
+            # A few contacts have no customer, like walk-in email senders
+            customer = None
+            if self.rng.random() < 0.9:
+                customer = self.rng.choices(
+                    self.customers, cum_weights=customer_weights
+                )[0]
+            self.contacts.append((email, f"{first} {last}", customer))
+            rows.append(
+                (
+                    *self.standard(email, created),
+                    first,
+                    last,
+                    f"{first} {last}",
+                    email,
+                    "Passive",
+                )
+            )
+            emails.append(
+                (
+                    *self.standard(self.name(), created),
+                    email,
+                    "Contact",
+                    "email_ids",
+                    email,
+                    1,
+                )
+            )
+            if customer:
+                links.append(
+                    (
+                        *self.standard(self.name(), created),
+                        email,
+                        "Contact",
+                        "links",
+                        "HD Customer",
+                        customer,
+                    )
+                )
+        self.insert(
+            "Contact",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "first_name",
+                "last_name",
+                "full_name",
+                "email_id",
+                "status",
+            ],
+            rows,
+        )
+        self.insert(
+            "Contact Email",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "parent",
+                "parenttype",
+                "parentfield",
+                "email_id",
+                "is_primary",
+            ],
+            emails,
+        )
+        self.insert(
+            "Dynamic Link",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "parent",
+                "parenttype",
+                "parentfield",
+                "link_doctype",
+                "link_name",
+            ],
+            links,
+        )
+        self.contact_weights = zipf_weights(contacts, 0.7)
+
+    def make_articles(self, articles: int, days: int):
+        category = f"{PREFIX} Articles"
+        created = self.now - timedelta(days=days + 1)
+        self.insert(
+            "HD Article Category",
+            ["name", "creation", "modified", "owner", "modified_by", "category_name"],
+            [(*self.standard(category, created), category)],
+        )
+        rows = []
+        for i in range(articles):
+            title = self.rng.choice(SUBJECTS).format(
+                product=self.rng.choice(PRODUCTS),
+                thing=self.rng.choice(THINGS),
+                number=i,
+            )
+            published = created + timedelta(
+                seconds=self.rng.randrange(days * 86400 or 1)
+            )
+            status = self.rng.choices(["Published", "Draft", "Archived"], [80, 15, 5])[
+                0
+            ]
+            rows.append(
+                (
+                    *self.standard(self.name(), published),
+                    title,
+                    category,
+                    f"<p>{self.text(SENTENCES + REPLIES, 8)}</p>",
+                    self.rng.choice(self.agents),
+                    fmt(published),
+                    status,
+                    frappe.scrub(title).replace("_", "-")[:100],
+                    int(self.rng.lognormvariate(3, 1.5)),
+                )
+            )
+        self.insert(
+            "HD Article",
+            [
+                "name",
+                "creation",
+                "modified",
+                "owner",
+                "modified_by",
+                "title",
+                "category",
+                "content",
+                "author",
+                "published_on",
+                "status",
+                "title_slug",
+                "views",
+            ],
+            rows,
+        )
+
+    def load_catalog(self):
+        priorities = frappe.get_all("HD Ticket Priority", pluck="name") or list(
+            SLA_HOURS
+        )
+        self.priorities = priorities
+        self.priority_weights = [PRIORITY_WEIGHTS.get(p, 10) for p in priorities]
+        self.ticket_types = frappe.get_all("HD Ticket Type", pluck="name") or [None]
+        self.sla = frappe.db.exists("HD Service Level Agreement", "Default")
+        self.feedback_options = {}
+        for option in frappe.get_all(
+            "HD Ticket Feedback Option", fields=["name", "rating"]
+        ):
+            self.feedback_options.setdefault(round(option.rating or 0, 1), []).append(
+                option.name
+            )
+
+    # Tickets
+
+    def make_tickets(self, tickets: int, days: int):
+        clusters = [
+            hashlib.md5(f"{PREFIX}-cluster-{i}".encode()).hexdigest()
+            for i in range(max(20, tickets // 500))
+        ]
+        cluster_weights = zipf_weights(len(clusters))
+        names = self.reserve("HD Ticket", tickets)
+
+        for start in range(0, tickets, self.batch_size):
+            batch = self.new_batch()
+            for name in names[start : start + self.batch_size]:
+                cluster = None
+                if self.rng.random() < 0.3:
+                    cluster = self.rng.choices(clusters, cum_weights=cluster_weights)[0]
+                self.make_ticket(batch, name, days, cluster)
+            self.flush(batch)
+            frappe.db.commit()
+            print(f"  {min(start + self.batch_size, tickets)}/{tickets} tickets")
+
+    def new_batch(self) -> dict:
+        return {doctype: [] for doctype in BATCH_FIELDS}
+
+    def flush(self, batch: dict):
+        for doctype, rows in batch.items():
+            self.insert(doctype, BATCH_FIELDS[doctype], rows)
+
+    def make_ticket(self, batch: dict, name: int, days: int, cluster: str | None):
+        rng = self.rng
+        creation = self.created_at(days)
+        contact = rng.choices(self.contacts, cum_weights=self.contact_weights)[0]
+        email, full_name, customer = contact
+        priority = rng.choices(self.priorities, weights=self.priority_weights)[0]
+        response_hours, resolution_hours = SLA_HOURS.get(priority, SLA_HOURS["Medium"])
+        team = rng.choices(self.teams, cum_weights=self.team_weights)[0]
+        agent = rng.choice(self.team_agents[team] or self.agents)
+        subject = rng.choice(SUBJECTS).format(
+            product=rng.choice(PRODUCTS),
+            thing=rng.choice(THINGS),
+            number=rng.randrange(10**6),
+        )
+
+        first_response = resolution = None
+        response_seconds = self.duration(response_hours * 0.5)
+        if creation + timedelta(seconds=response_seconds) < self.now:
+            first_response = creation + timedelta(seconds=response_seconds)
+            resolution_seconds = response_seconds + self.duration(
+                resolution_hours * 0.4, 1.1
+            )
+            # About one in ten tickets stays in the backlog however old it is
+            if (
+                creation + timedelta(seconds=resolution_seconds) < self.now
+                and rng.random() < 0.9
+            ):
+                resolution = creation + timedelta(seconds=resolution_seconds)
+
+        response_by = creation + timedelta(hours=response_hours)
+        resolution_by = creation + timedelta(hours=resolution_hours)
+        if resolution:
+            status = rng.choices(["Resolved", "Closed"], [40, 60])[0]
+            met = first_response <= response_by and resolution <= resolution_by
+            agreement_status = "Fulfilled" if met else "Failed"
+        else:
+            status = "Replied" if first_response and rng.random() < 0.6 else "Open"
+            due = resolution_by if first_response else response_by
+            missed = first_response and first_response > response_by
+            if missed or due < self.now:
+                agreement_status = "Failed"
+            else:
+                agreement_status = (
+                    "Resolution Due" if first_response else "First Response Due"
+                )
+
+        rating = feedback = None
+        if resolution and rng.random() < 0.35:
+            rating = rng.choices(RATINGS, RATING_WEIGHTS)[0]
+            options = self.feedback_options.get(rating)
+            feedback = rng.choice(options) if options else None
+
+        modified = resolution or first_response or creation
+        assigned = status != "Open" or rng.random() < 0.5
+        batch["HD Ticket"].append(
+            (
+                name,
+                fmt(creation),
+                fmt(modified),
+                email,
+                agent if first_response else email,
+                subject,
+                email,
+                status,
+                priority,
+                rng.choice(self.ticket_types),
+                team,
+                f"<p>{self.text(SENTENCES)}</p>",
+                self.sla,
+                fmt(response_by),
+                fmt(resolution_by),
+                fmt(creation),
+                agreement_status,
+                fmt(first_response) if first_response else None,
+                (first_response - creation).total_seconds() if first_response else None,
+                fmt(resolution) if resolution else None,
+                (resolution - creation).total_seconds() if resolution else None,
+                creation.date().isoformat(),
+                creation.time().isoformat(),
+                email,
+                customer,
+                int(rng.random() < 0.3),
+                rating,
+                feedback,
+                rng.choices(SENTIMENTS, SENTIMENT_WEIGHTS)[0],
+                round(rng.random(), 2),
+                cluster,
+                json.dumps([agent]) if assigned and not resolution else None,
+            )
+        )
+
+        self.make_thread(
+            batch,
+            name,
+            subject,
+            creation,
+            modified,
+            email,
+            full_name,
+            agent,
+            first_response,
+        )
+        activities = [(creation, email, "created this ticket")]
+        if assigned:
+            self.make_assignment(
+                batch, name, subject, creation, first_response, resolution, agent, team
+            )
+            activities.append((creation, "Administrator", f"assigned to {agent}"))
+        if rng.random() < 0.3:
+            for _ in range(rng.randint(1, 3)):
+                at = creation + (modified - creation) * rng.random()
+                batch["HD Ticket Comment"].append(
+                    (
+                        *self.standard(self.name(), at, agent),
+                        f"<p>{rng.choice(REPLIES)}</p>",
+                        name,
+                        agent,
+                        int(rng.random() < 0.05),
+                    )
+                )
+                activities.append((at, agent, "added a comment"))
+        if resolution:
+            activities.append((resolution, agent, f"changed status to {status}"))
+        for at, user, action in activities:
+            batch["HD Ticket Activity"].append(
+                (*self.standard(self.name(), at, user), name, action)
+            )
+
+    def make_thread(
+        self,
+        batch,
+        ticket,
+        subject,
+        creation,
+        last,
+        email,
+        full_name,
+        agent,
+        first_response,
+    ):
+        """Customer email, first reply and a geometric number of follow-ups."""
+        rng = self.rng
+        messages = [(creation, "Received")]
+        if first_response:
+            messages.append((first_response, "Sent"))
+            while rng.random() < 0.55:
+                at = first_response + (last - first_response) * rng.random()
+                messages.append((at, rng.choice(["Received", "Sent"])))
+        for at, direction in sorted(messages):
+            received = direction == "Received"
+            sender, recipient = (email, agent) if received else (agent, email)
+            batch["Communication"].append(
+                (
+                    *self.standard(self.name(), at, sender),
+                    "Communication",
+                    "Email",
+                    direction,
+                    subject if received and at == creation else f"Re: {subject}",
+                    f"<p>{self.text(SENTENCES if received else REPLIES)}</p>",
+                    sender,
+                    full_name if received else None,
+                    recipient,
+                    fmt(at),
+                    "HD Ticket",
+                    ticket,
+                    "Linked",
+                    1,
+                )
+            )
+
+    def make_assignment(
+        self, batch, ticket, subject, creation, first_response, resolution, agent, team
+    ):
+        rng = self.rng
+        assignments = [agent]
+        # Some tickets were handed over within the team before the final agent
+        if rng.random() < 0.1 and len(self.team_agents[team]) > 1:
+            assignments.insert(
+                0, rng.choice([a for a in self.team_agents[team] if a != agent])
+            )
+        for idx, user in enumerate(assignments):
+            is_current = idx == len(assignments) - 1
+            closed = not is_current or resolution
+            # A closed ToDo's `modified` is when the assignment ended
+            ended = (resolution if is_current else first_response) or creation
+            batch["ToDo"].append(
+                (
+                    *self.standard(self.name(), creation, modified=ended),
+                    "Closed" if closed else "Open",
+                    "Medium",
+                    creation.date().isoformat(),
+                    user,
+                    f"<p>{subject}</p>",
+                    "HD Ticket",
+                    ticket,
+                    "Administrator",
+                )
+            )
+
+
+STANDARD_FIELDS = ["name", "creation", "modified", "owner", "modified_by"]
+BATCH_FIELDS = {
+    "HD Ticket": [
+        *STANDARD_FIELDS,
+        "subject",
+        "raised_by",
+        "status",
+        "priority",
+        "ticket_type",
+        "agent_group",
+        "description",
+        "sla",
+        "response_by",
+        "resolution_by",
+        "service_level_agreement_creation",
+        "agreement_status",
+        "first_responded_on",
+        "first_response_time",
+        "resolution_date",
+        "resolution_time",
+        "opening_date",
+        "opening_time",
+        "contact",
+        "customer",
+        "via_customer_portal",
+        "feedback_rating",
+        "feedback",
+        "last_sentiment",
+        "effort_score",
+        "cluster_hash",
+        "_assign",
+    ],
+    "Communication": [
+        *STANDARD_FIELDS,
+        "communication_type",
+        "communication_medium",
+        "sent_or_received",
+        "subject",
+        "content",
+        "sender",
+        "sender_full_name",
+        "recipients",
+        "communication_date",
+        "reference_doctype",
+        "reference_name",
+        "status",
+        "seen",
+    ],
+    "HD Ticket Comment": [
+        *STANDARD_FIELDS,
+        "content",
+        "reference_ticket",
+        "commented_by",
+        "is_pinned",
+    ],
+    "HD Ticket Activity": [*STANDARD_FIELDS, "ticket", "action"],
+    "ToDo": [
+        *STANDARD_FIELDS,
+        "status",
+        "priority",
+        "date",
+        "allocated_to",
+        "description",
+        "reference_type",
+        "reference_name",
+        "assigned_by",
+    ],
+}
+
+
+def rebuild_derived(from_date, to_date):
+    """Recompute the tables that the skipped doc events keep up to date."""
+    from helpdesk.api.dashboard import invalidate_cache
+    from helpdesk.helpdesk.doctype.hd_ticket_assignee import hd_ticket_assignee
+    from helpdesk.helpdesk.doctype.hd_ticket_cluster import hd_ticket_cluster
+    from helpdesk.helpdesk.doctype.hd_ticket_daily_rollup import hd_ticket_daily_rollup
+    from helpdesk.helpdesk.doctype.hd_ticket_time_sketch import hd_ticket_time_sketch
+
+    hd_ticket_assignee.rebuild()
+    hd_ticket_cluster.rebuild_all()
+    hd_ticket_daily_rollup.rebuild(from_date, to_date)
+    hd_ticket_time_sketch.rebuild(from_date, to_date)
+    invalidate_cache()
+    frappe.db.commit()
+
+
+def generate(
+    tickets: int = 10000,
+    days: int = 365,
+    teams: int = 8,
+    agents: int = 40,
+    customers: int | None = None,
+    contacts: int | None = None,
+    articles: int = 500,
+    seed: int = 42,
+    batch_size: int = 5000,
+) -> dict:
+    """Bulk-load `tickets` tickets created over the last `days` days, with their
+    threads, comments, activities and assignments, and the reference data they use.
+
+    Run `clear` first to replace an earlier dataset.
+    """
+    if frappe.db.exists("HD Agent", f"agent0@{DOMAIN}"):
+        frappe.throw(f"A synthetic dataset already exists, run {__name__}.clear first")
+
+    started = time.perf_counter()
+    gen = DatasetGenerator(seed=seed, batch_size=batch_size)
+    gen.load_catalog()
+    gen.make_agents(teams, agents)
+    gen.make_customers(
+        customers or max(10, tickets // 200), contacts or max(50, tickets // 20), days
+    )
+    gen.make_articles(articles, days)
+    frappe.db.commit()
+    gen.make_tickets(tickets, days)
+    rebuild_derived(add_days(gen.now, -days), gen.now)
+
+    gen.counts["seconds"] = round(time.perf_counter() - started, 1)
+    print(f"Generated synthetic dataset: {gen.counts}")
+    return gen.counts
+
+
+def clear():
+    """Delete everything `generate` created and rebuild the derived tables."""
+    params = {"like": f"%@{DOMAIN}", "prefix": f"{PREFIX} %"}
+    tickets = "SELECT name FROM `tabHD Ticket` WHERE raised_by LIKE %(like)s"
+    first = frappe.db.sql(
+        "SELECT MIN(creation) FROM `tabHD Ticket` WHERE raised_by LIKE %(like)s", params
+    )[0][0]
+
+    communications = (
+        "SELECT name FROM `tabCommunication` WHERE reference_doctype = 'HD Ticket'"
+        f" AND reference_name IN ({tickets})"
+    )
+    for table, condition in (
+        ("Communication Link", f"parent IN ({communications})"),
+        (
+            "Communication",
+            f"reference_doctype = 'HD Ticket' AND reference_name IN ({tickets})",
+        ),
+        ("HD Ticket Comment", f"reference_ticket IN ({tickets})"),
+        ("HD Ticket Activity", f"ticket IN ({tickets})"),
+        ("ToDo", f"reference_type = 'HD Ticket' AND reference_name IN ({tickets})"),
+        ("HD Ticket Assignee", f"ticket IN ({tickets})"),
+    ):
+        frappe.db.sql(f"DELETE FROM `tab{table}` WHERE {condition}", params)
+    frappe.db.sql("DELETE FROM `tabHD Ticket` WHERE raised_by LIKE %(like)s", params)
+
+    for table, column, pattern in (
+        ("Contact Email", "parent", "like"),
+        ("Dynamic Link", "parent", "like"),
+        ("Contact", "name", "like"),
+        ("HD Customer", "name", "prefix"),
+        ("HD Article", "category", "prefix"),
+        ("HD Article Category", "name", "prefix"),
+        ("HD Team Member", "parent", "prefix"),
+        ("HD Team", "name", "prefix"),
+        ("HD Agent", "name", "like"),
+        ("Has Role", "parent", "like"),
+        ("User", "name", "like"),
+    ):
+        frappe.db.sql(
+            f"DELETE FROM `tab{table}` WHERE {column} LIKE %({pattern})s", params
+        )
+    frappe.db.commit()
+
+    if first:
+        rebuild_derived(getdate(first), getdate(now_datetime()))
@@ -0,0 +1,55 @@
+"""
+Compare the hook-light fast write path of `helpdesk.api.ingest` against the
+full `doc.save()` path for AI-only ticket fields.
+
+  bench --site helpdesk.localhost execute helpdesk.benchmarks.ingest_write.run \
+    --kwargs "{'iterations': 200}"
+"""
+
+import frappe
+
+from helpdesk.api.ingest import _apply_ticket_updates
+from helpdesk.benchmarks import report, summarize, timer
+
+
+def _scratch_ticket() -> str:
+    doc = frappe.new_doc("HD Ticket")
+    doc.subject = "Benchmark: ingest write path"
+    doc.description = "Created by helpdesk.benchmarks.ingest_write"
+    doc.insert(ignore_permissions=True)
+    frappe.db.commit()
+    return doc.name
+
+
+def _measure(ticket: str, iterations: int, fast_write: bool) -> list[float]:
+    samples: list[float] = []
+    for i in range(iterations):
+        updates = {
+            "ai_summary": f"benchmark summary {i}",
+            "effort_score": (i % 100) / 100,
+            "last_sentiment": "Neutral",
+        }
+        with timer(samples):
+            _apply_ticket_updates(
+                ticket, updates, respect_shadow=False, fast_write=fast_write
+            )
+    return samples
+
+
+def run(iterations: int = 100, keep: bool = False) -> dict:
+    """Time `iterations` AI-field updates on a scratch ticket through both paths."""
+    frappe.flags.mute_emails = True
+    ticket = _scratch_ticket()
+    try:
+        # Warm-up so that meta / cache loading is not billed to either path
+        _measure(ticket, 3, fast_write=False)
+        _measure(ticket, 3, fast_write=True)
+        results = {
+            "full_save": summarize(_measure(ticket, iterations, fast_write=False)),
+            "fast_write": summarize(_measure(ticket, iterations, fast_write=True)),
+        }
+    finally:
+        if not keep:
+            frappe.delete_doc("HD Ticket", ticket, ignore_permissions=True, force=True)
+            frappe.db.commit()
+    return report(f"AI field updates on HD Ticket ({iterations} iterations)", results)
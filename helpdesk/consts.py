@@ -2,3 +2,4 @@ DEFAULT_TICKET_TYPE = "Unspecified"
 DEFAULT_TICKET_PRIORITY = "Medium"
 DEFAULT_TICKET_TEMPLATE = "Default"
 DEFAULT_ARTICLE_CATEGORY = "General"
+CLOSED_STATUSES = ("Resolved", "Closed")
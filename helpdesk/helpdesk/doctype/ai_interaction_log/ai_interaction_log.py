@@ -1,9 +1,237 @@
 # Copyright (c) 2025, Frappe Technologies and contributors
 # For license information, please see license.txt
 
-# import frappe
+"""
+Retention for AI Interaction Log.
+
+Rows older than `ai_log_retention_days` (0, i.e. disabled, by default) are
+moved to gzip-compressed JSONL files under the archive directory, one file per
+day of `creation`:
+
+    <archive>/2026/10/2026-10-19.jsonl.gz
+
+Each run appends a new gzip member to the day file and then deletes the
+archived rows in small, throttled chunks, so the daily job never holds long
+locks on the table. Archived rows stay queryable through `iter_archived` /
+`search_archive`, which stream the day files line by line. Files attached to
+archived rows are deleted with them.
+"""
+
+import gzip
+import json
+import os
+import time
+from collections.abc import Iterator
+
+import frappe
 from frappe.model.document import Document
+from frappe.utils import add_days, cint, get_datetime, getdate, now_datetime
+
+from helpdesk.helpdesk.utils.settings_snapshot import get_ai_settings
+
+ARCHIVE_FIELDS = [
+    "name",
+    "creation",
+    "modified",
+    "owner",
+    "subject",
+    "ticket",
+    "action",
+    "source",
+    "direction",
+    "status",
+    "preview",
+    "provider",
+    "model",
+    "tokens",
+    "cost_usd",
+    "request_id",
+    "session_id",
+    "event_ts",
+    "request_json",
+    "request_payload",
+    "headers",
+    "result_json",
+    "response_payload",
+    "error_message",
+    "meta_json",
+    "user",
+    "ip_address",
+    "attachment",
+]
+
+CHUNK_SIZE = 500
+MAX_CHUNKS = 200
+THROTTLE_SECONDS = 0.2
 
 
 class AIInteractionLog(Document):
-	pass
+    pass
+
+
+def get_archive_dir() -> str:
+    path = (getattr(get_ai_settings(), "ai_log_archive_path", None) or "").strip()
+    if not path:
+        path = frappe.get_site_path("private", "ai_log_archive")
+    return os.path.abspath(path)
+
+
+def day_file(day, archive_dir: str | None = None) -> str:
+    day = getdate(day)
+    return os.path.join(
+        archive_dir or get_archive_dir(),
+        f"{day.year:04d}",
+        f"{day.month:02d}",
+        f"{day.isoformat()}.jsonl.gz",
+    )
+
+
+def _append(path: str, rows: list[dict]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Every run adds a gzip member; readers see the concatenation as one stream
+    with gzip.open(path, "at", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, default=str, separators=(",", ":")))
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def archive_old_logs(
+    retention_days: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    max_chunks: int = MAX_CHUNKS,
+    throttle: float = THROTTLE_SECONDS,
+) -> int:
+    """Archive and delete logs older than the retention window. Returns the row count.
+
+    A row is deleted only after its day file has been written and synced. If
+    the job dies in between, the next run archives the row again;
+    `iter_archived` skips such duplicates.
+    """
+    if retention_days is None:
+        retention_days = cint(getattr(get_ai_settings(), "ai_log_retention_days", 0))
+    if retention_days <= 0:
+        return 0
+
+    cutoff = get_datetime(add_days(getdate(now_datetime()), -retention_days))
+    archive_dir = get_archive_dir()
+    archived = 0
+
+    for i in range(max_chunks):
+        rows = frappe.get_all(
+            "AI Interaction Log",
+            filters={"creation": ["<", cutoff]},
+            fields=ARCHIVE_FIELDS,
+            order_by="creation asc, name asc",
+            limit=chunk_size,
+        )
+        if not rows:
+            break
+
+        by_day: dict[str, list[dict]] = {}
+        for row in rows:
+            by_day.setdefault(getdate(row.creation).isoformat(), []).append(row)
+        for day, day_rows in by_day.items():
+            _append(day_file(day, archive_dir), day_rows)
+
+        names = [row.name for row in rows]
+        _remove_attachments(names)
+        frappe.db.delete("AI Interaction Log", {"name": ("in", names)})
+        frappe.db.commit()
+        archived += len(rows)
+
+        if len(rows) < chunk_size:
+            break
+        if throttle:
+            time.sleep(throttle)
+
+    return archived
+
+
+def _remove_attachments(names: list[str]):
+    """Delete the files attached to archived rows, as `delete_doc` would."""
+    from frappe.utils.file_manager import remove_all
+
+    attached = frappe.get_all(
+        "File",
+        filters={
+            "attached_to_doctype": "AI Interaction Log",
+            "attached_to_name": ("in", names),
+        },
+        pluck="attached_to_name",
+        distinct=True,
+    )
+    for name in attached:
+        remove_all("AI Interaction Log", name, from_delete=True)
+
+
+def _archive_days(archive_dir: str, since=None, until=None) -> Iterator[str]:
+    """Day files in ascending order, limited to [since, until] by file name."""
+    since = getdate(since).isoformat() if since else None
+    until = getdate(until).isoformat() if until else None
+    if not os.path.isdir(archive_dir):
+        return
+    for year in sorted(os.listdir(archive_dir)):
+        year_dir = os.path.join(archive_dir, year)
+        if not os.path.isdir(year_dir):
+            continue
+        for month in sorted(os.listdir(year_dir)):
+            month_dir = os.path.join(year_dir, month)
+            if not os.path.isdir(month_dir):
+                continue
+            for fname in sorted(os.listdir(month_dir)):
+                if not fname.endswith(".jsonl.gz"):
+                    continue
+                day = fname[: -len(".jsonl.gz")]
+                if (since and day < since) or (until and day > until):
+                    continue
+                yield os.path.join(month_dir, fname)
+
+
+def iter_archived(
+    ticket: str | None = None,
+    action: str | None = None,
+    since=None,
+    until=None,
+    archive_dir: str | None = None,
+) -> Iterator[dict]:
+    """Stream archived rows, oldest day first, filtered by ticket and/or action."""
+    # Cheap substring checks let most lines skip json.loads entirely
+    needles = [json.dumps(v) for v in (ticket, action) if v]
+    for path in _archive_days(archive_dir or get_archive_dir(), since, until):
+        seen = set()
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if any(n not in line for n in needles):
+                    continue
+                row = json.loads(line)
+                if (ticket and row.get("ticket") != ticket) or (
+                    action and row.get("action") != action
+                ):
+                    continue
+                if row["name"] in seen:
+                    continue
+                seen.add(row["name"])
+                yield row
+
+
+@frappe.whitelist()
+def search_archive(
+    ticket: str | None = None,
+    action: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 100,
+):
+    frappe.only_for("System Manager")
+    if not (ticket or action or since):
+        frappe.throw(frappe._("Filter by ticket, action or a start date"))
+
+    limit = max(min(cint(limit) or 100, 1000), 1)
+    out = []
+    for row in iter_archived(ticket=ticket, action=action, since=since, until=until):
+        out.append(row)
+        if len(out) >= limit:
+            break
+    return out
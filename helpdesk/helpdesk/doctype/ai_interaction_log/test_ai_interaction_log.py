@@ -1,9 +1,112 @@
 # Copyright (c) 2025, Frappe Technologies and Contributors
 # See license.txt
 
-# import frappe
+import shutil
+import tempfile
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_days, now_datetime
+
+from helpdesk.api import ai_log
+from helpdesk.helpdesk.doctype.ai_interaction_log.ai_interaction_log import (
+	archive_old_logs,
+	iter_archived,
+)
+from helpdesk.test_utils import make_ticket
 
 
 class TestAIInteractionLog(FrappeTestCase):
-	pass
+	def setUp(self):
+		frappe.db.set_single_value("HelpdeskAI Settings", "ai_log_buffered", 1)
+		ai_log.flush()
+
+	def tearDown(self):
+		frappe.db.set_single_value("HelpdeskAI Settings", "ai_log_buffered", 0)
+
+	def test_buffered_write_is_flushed_in_bulk(self):
+		ticket = make_ticket(subject="Printer on fire")
+		before = frappe.db.count("AI Interaction Log")
+
+		for i in range(3):
+			ai_log.write(ticket.name, "set_sentiment", request={"sentiment": i}, result={"ok": True})
+		ai_log.write("", "kb_update_request", subject="Explicit subject")
+		self.assertEqual(frappe.db.count("AI Interaction Log"), before)
+
+		self.assertEqual(ai_log.flush(), 4)
+		self.assertEqual(frappe.db.count("AI Interaction Log"), before + 4)
+
+		logs = frappe.get_all(
+			"AI Interaction Log",
+			filters={"ticket": ticket.name},
+			fields=["name", "subject", "direction", "naming_series"],
+		)
+		self.assertEqual(len(logs), 3)
+		self.assertEqual(len({log.name for log in logs}), 3)
+		for log in logs:
+			self.assertIn("Printer on fire", log.subject)
+			self.assertIn("fields: ok, sentiment", log.subject)
+			self.assertEqual(log.direction, "Response")
+		self.assertTrue(frappe.db.exists("AI Interaction Log", {"subject": "Explicit subject"}))
+
+	def test_bad_entry_does_not_block_the_buffer(self):
+		insert_batch = ai_log._insert_batch
+
+		def fail_on_bad(entries):
+			if any(e.get("action") == "bad_entry" for e in entries):
+				raise frappe.ValidationError("bad entry")
+			insert_batch(entries)
+
+		ticket = make_ticket(subject="Poison pill")
+		ai_log.write(ticket.name, "set_sentiment", request={"x": 1})
+		ai_log.write(ticket.name, "bad_entry", request={"x": 2})
+		ai_log.write(ticket.name, "set_metrics", request={"x": 3})
+		cache = frappe.cache()
+		# RedisWrapper.llen prefixes the key itself
+		dead_before = cache.llen(ai_log.DEAD_LETTER_KEY)
+
+		with patch.object(ai_log, "_insert_batch", side_effect=fail_on_bad):
+			self.assertEqual(ai_log.flush(), 2)
+		self.assertEqual(
+			sorted(frappe.get_all("AI Interaction Log", {"ticket": ticket.name}, pluck="action")),
+			["set_metrics", "set_sentiment"],
+		)
+		self.assertEqual(cache.llen(ai_log.DEAD_LETTER_KEY), dead_before + 1)
+		self.assertEqual(ai_log.flush(), 0)
+
+	def test_old_logs_are_archived_and_searchable(self):
+		archive_dir = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, archive_dir, ignore_errors=True)
+		frappe.db.set_single_value("HelpdeskAI Settings", "ai_log_archive_path", archive_dir)
+		self.addCleanup(frappe.db.set_single_value, "HelpdeskAI Settings", "ai_log_archive_path", "")
+
+		ticket = make_ticket(subject="Archive me")
+		for action in ("set_sentiment", "set_metrics", "set_sentiment"):
+			ai_log.write(ticket.name, action, request={"x": 1})
+		ai_log.flush()
+		names = frappe.get_all("AI Interaction Log", filters={"ticket": ticket.name}, pluck="name")
+		old = add_days(now_datetime(), -40)
+		frappe.db.set_value(
+			"AI Interaction Log", {"name": ("in", names)}, "creation", old, update_modified=False
+		)
+
+		attachment = frappe.get_doc(
+			{
+				"doctype": "File",
+				"file_name": "ai-request.txt",
+				"content": "request body",
+				"is_private": 1,
+				"attached_to_doctype": "AI Interaction Log",
+				"attached_to_name": names[0],
+			}
+		).insert(ignore_permissions=True)
+
+		self.assertGreaterEqual(archive_old_logs(retention_days=30, chunk_size=2, throttle=0), 3)
+		self.assertFalse(frappe.db.exists("AI Interaction Log", {"ticket": ticket.name}))
+		self.assertFalse(frappe.db.exists("File", attachment.name))
+
+		rows = list(iter_archived(ticket=ticket.name))
+		self.assertEqual(sorted(r["name"] for r in rows), sorted(names))
+		self.assertEqual(len(list(iter_archived(ticket=ticket.name, action="set_metrics"))), 1)
+		self.assertEqual(list(iter_archived(ticket=ticket.name, since=now_datetime())), [])
@@ -0,0 +1,164 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Hourly counters of AI Interaction Log writes.
+
+One row per hour x action x status x source x preview, incremented in the same
+transaction that inserts the log rows (`helpdesk.api.ai_log`). Analytics read
+these rows only, so their cost does not grow with the size of the log table
+and keeps working after old logs are archived.
+"""
+
+import hashlib
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt, get_datetime, now_datetime
+
+FAILED_STATUSES = ("FAIL", "Error", "Timeout")
+GROUP_FIELDS = ("action", "status", "source", "preview")
+
+
+class AIInteractionRollup(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("AI Interaction Rollup", ["bucket", "action"])
+
+
+def bucket_of(ts) -> str:
+    return get_datetime(ts or now_datetime()).strftime("%Y-%m-%d %H:00:00")
+
+
+def rollup_key(bucket: str, action: str, status: str, source: str, preview: int) -> str:
+    return hashlib.md5(
+        f"{bucket}|{action}|{status}|{source}|{preview}".encode()
+    ).hexdigest()
+
+
+def record(entries: list[dict]):
+    """Add log entries (dicts with event_ts, action, status, source, preview,
+    optional tokens / cost_usd) to their hourly counters with one statement."""
+    totals = defaultdict(lambda: [0, 0, 0.0])
+    for e in entries:
+        key = (
+            bucket_of(e.get("event_ts")),
+            e.get("action") or "",
+            e.get("status") or "OK",
+            e.get("source") or "",
+            1 if cint(e.get("preview")) else 0,
+        )
+        t = totals[key]
+        t[0] += 1
+        t[1] += cint(e.get("tokens"))
+        t[2] += flt(e.get("cost_usd"))
+    if not totals:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    values = []
+    for (bucket, action, status, source, preview), (
+        count,
+        tokens,
+        cost,
+    ) in totals.items():
+        values.append(
+            (
+                rollup_key(bucket, action, status, source, preview),
+                bucket,
+                action,
+                status,
+                source,
+                preview,
+                count,
+                tokens,
+                cost,
+                now,
+                now,
+                user,
+                user,
+            )
+        )
+    placeholders = ", ".join(
+        ["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(values)
+    )
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabAI Interaction Rollup`
+            (name, bucket, action, status, source, preview, interaction_count, tokens, cost_usd,
+             creation, modified, owner, modified_by)
+        VALUES {placeholders}
+        ON DUPLICATE KEY UPDATE
+            interaction_count = interaction_count + VALUES(interaction_count),
+            tokens = tokens + VALUES(tokens),
+            cost_usd = cost_usd + VALUES(cost_usd),
+            modified = VALUES(modified)
+        """,
+        [v for row in values for v in row],
+    )
+
+
+def get_stats(
+    from_datetime, to_datetime, group_by: list[str] | None = None, hourly: bool = False
+):
+    """Totals, preview rate and failure rate per group between two datetimes."""
+    group_by = [f for f in (group_by or []) if f in GROUP_FIELDS]
+    columns = (["bucket"] if hourly else []) + group_by
+    quoted = ", ".join(f"`{c}`" for c in columns)
+    select = f"{quoted}," if columns else ""
+    group = f"GROUP BY {quoted} ORDER BY {quoted}" if columns else ""
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT {select}
+            SUM(interaction_count) AS total,
+            SUM(CASE WHEN preview = 1 THEN interaction_count ELSE 0 END) AS previews,
+            SUM(CASE WHEN status IN %(failed)s THEN interaction_count ELSE 0 END) AS failures,
+            SUM(tokens) AS tokens,
+            SUM(cost_usd) AS cost_usd
+        FROM `tabAI Interaction Rollup`
+        WHERE bucket >= %(from)s AND bucket < %(to)s
+        {group}
+        """,
+        {
+            "failed": FAILED_STATUSES,
+            "from": bucket_of(from_datetime),
+            "to": get_datetime(to_datetime),
+        },
+        as_dict=True,
+    )
+    for row in rows:
+        total = cint(row.total)
+        row.total = total
+        row.previews = cint(row.previews)
+        row.failures = cint(row.failures)
+        row.tokens = cint(row.tokens)
+        row.cost_usd = flt(row.cost_usd)
+        row.preview_rate = flt(row.previews * 100.0 / total, 2) if total else 0.0
+        row.failure_rate = flt(row.failures * 100.0 / total, 2) if total else 0.0
+    return rows
+
+
+@frappe.whitelist()
+def get_ai_interaction_stats(
+    from_datetime: str,
+    to_datetime: str | None = None,
+    group_by: str | list | None = None,
+    hourly: int = 0,
+):
+    frappe.only_for(["System Manager", "AI Admin", "Product Analyst"])
+    if isinstance(group_by, str):
+        group_by = (
+            frappe.parse_json(group_by) if group_by.startswith("[") else [group_by]
+        )
+    invalid = set(group_by or []) - set(GROUP_FIELDS)
+    if invalid:
+        frappe.throw(_("Cannot group by {0}").format(", ".join(sorted(invalid))))
+    return get_stats(
+        from_datetime, to_datetime or now_datetime(), group_by, bool(cint(hourly))
+    )
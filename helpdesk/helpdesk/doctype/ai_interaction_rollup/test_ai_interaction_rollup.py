@@ -0,0 +1,38 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, now_datetime
+
+from helpdesk.api import ai_log
+from helpdesk.helpdesk.doctype.ai_interaction_rollup.ai_interaction_rollup import (
+    get_stats,
+)
+
+
+class TestAIInteractionRollup(FrappeTestCase):
+    def test_writes_are_counted_per_hour_bucket(self):
+        action = f"rollup_{frappe.generate_hash(length=6)}"
+        for buffered in (0, 1):
+            frappe.db.set_single_value(
+                "HelpdeskAI Settings", "ai_log_buffered", buffered
+            )
+            ai_log.write("", action, status="OK", preview=1, subject="x")
+            ai_log.write("", action, status="FAIL", subject="x")
+            ai_log.flush()
+        frappe.db.set_single_value("HelpdeskAI Settings", "ai_log_buffered", 0)
+
+        rows = get_stats(
+            add_to_date(now_datetime(), hours=-1),
+            add_to_date(now_datetime(), hours=1),
+            ["action"],
+        )
+        row = next(r for r in rows if r.action == action)
+        self.assertEqual(row.total, 4)
+        self.assertEqual(row.previews, 2)
+        self.assertEqual(row.failures, 2)
+        self.assertEqual(row.failure_rate, 50.0)
+        self.assertEqual(
+            frappe.db.count("AI Interaction Rollup", {"action": action}), 2
+        )
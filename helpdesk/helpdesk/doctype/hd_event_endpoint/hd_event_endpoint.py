@@ -0,0 +1,20 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class HDEventEndpoint(Document):
+    def on_update(self):
+        self.clear_endpoint_cache()
+
+    def on_trash(self):
+        self.clear_endpoint_cache()
+
+    def clear_endpoint_cache(self):
+        from helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox import (
+            ENDPOINTS_CACHE_KEY,
+        )
+
+        frappe.cache().delete_value(ENDPOINTS_CACHE_KEY)
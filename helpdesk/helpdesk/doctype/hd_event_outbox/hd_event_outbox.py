@@ -0,0 +1,298 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Transactional outbox for ticket change events.
+
+`record_ticket_event` runs from the HD Ticket doc_events, so each outbox row
+is written in the same transaction as the ticket save and is rolled back with
+it. `dispatch` runs from the scheduler: it coalesces pending rows per ticket,
+posts them to every enabled HD Event Endpoint in batches and retries failed
+batches with exponential backoff.
+"""
+
+import hashlib
+import hmac
+import json
+
+import frappe
+import requests
+from frappe.model.document import Document
+from frappe.query_builder import DocType
+from frappe.utils import add_to_date, cint, now_datetime
+
+TICKET_FIELDS = [
+    "name",
+    "subject",
+    "status",
+    "priority",
+    "ticket_type",
+    "agent_group",
+    "customer",
+    "contact",
+    "raised_by",
+    "opening_date",
+    "resolution_by",
+    "ai_summary",
+    "cluster_hash",
+    "modified",
+]
+ENDPOINTS_CACHE_KEY = "helpdesk:event_endpoints"
+# Pending rows read per batch slot, so that repeated saves of one ticket
+# within the scan window collapse into a single delivered event
+SCAN_FACTOR = 10
+MAX_BACKOFF_SECONDS = 3600
+SENT_RETENTION_DAYS = 7
+
+
+class HDEventOutbox(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("HD Event Outbox", ["endpoint", "status", "next_attempt_at"])
+
+
+def get_enabled_endpoints() -> list[str]:
+    return frappe.cache().get_value(
+        ENDPOINTS_CACHE_KEY,
+        generator=lambda: frappe.get_all(
+            "HD Event Endpoint", filters={"enabled": 1}, pluck="name", order_by="name"
+        ),
+    )
+
+
+def record_ticket_event(doc, method=None):
+    """HD Ticket `on_update` / `on_trash`: write one outbox row per endpoint."""
+    endpoints = get_enabled_endpoints()
+    if not endpoints:
+        return
+
+    changed = []
+    if method == "on_trash":
+        event = "ticket.deleted"
+    elif doc.get_doc_before_save() is None:
+        event = "ticket.created"
+    else:
+        changed = [
+            f for f in TICKET_FIELDS if f != "modified" and doc.has_value_changed(f)
+        ]
+        if not changed:
+            return
+        event = "ticket.updated"
+
+    data = {f: doc.get(f) for f in TICKET_FIELDS}
+    _insert_events(endpoints, event, doc.doctype, doc.name, changed, data)
+
+
+def record_field_changes(ticket: str, fields) -> None:
+    """`ticket.updated` for column writes that skip doc_events (ingest fast path).
+
+    Call after the write, in the same transaction.
+    """
+    changed = [f for f in TICKET_FIELDS if f != "modified" and f in fields]
+    if not changed:
+        return
+    endpoints = get_enabled_endpoints()
+    if not endpoints:
+        return
+    data = frappe.db.get_value("HD Ticket", ticket, TICKET_FIELDS, as_dict=True)
+    if data:
+        _insert_events(endpoints, "ticket.updated", "HD Ticket", ticket, changed, data)
+
+
+def _insert_events(endpoints, event, doctype, name, changed, data):
+    payload = json.dumps(data, default=str)
+    now = now_datetime()
+    for endpoint in endpoints:
+        frappe.get_doc(
+            {
+                "doctype": "HD Event Outbox",
+                "event": event,
+                "reference_doctype": doctype,
+                "reference_name": name,
+                "endpoint": endpoint,
+                "status": "Pending",
+                "next_attempt_at": now,
+                "changed_fields": json.dumps(changed),
+                "payload": payload,
+            }
+        ).db_insert()
+
+
+def coalesce(rows: list[dict]) -> list[dict]:
+    """Collapse outbox rows into one event per document, oldest document first.
+
+    The latest payload wins, changed fields are merged, and the event type is
+    `ticket.deleted` if the last row deleted the ticket, `ticket.created` if the
+    receiver has not seen it yet, otherwise `ticket.updated`.
+    """
+    groups: dict[tuple, dict] = {}
+    for row in rows:
+        key = (row.reference_doctype, row.reference_name)
+        group = groups.setdefault(
+            key, {"ids": [], "events": [], "changed": [], "attempts": 0}
+        )
+        group["ids"].append(row.name)
+        group["events"].append(row.event)
+        group["attempts"] = max(group["attempts"], cint(row.attempts))
+        for field in json.loads(row.changed_fields or "[]"):
+            if field not in group["changed"]:
+                group["changed"].append(field)
+        group.setdefault("first_event_at", row.creation)
+        group["last_event_at"] = row.creation
+        group["payload"] = row.payload
+
+    out = []
+    for (doctype, name), group in groups.items():
+        events = group["events"]
+        if events[-1] == "ticket.deleted":
+            event = "ticket.deleted"
+        elif events[0] == "ticket.created":
+            event = "ticket.created"
+        else:
+            event = "ticket.updated"
+        out.append(
+            {
+                "ids": group["ids"],
+                "attempts": group["attempts"],
+                "event": {
+                    "event": event,
+                    "doctype": doctype,
+                    "name": name,
+                    "changed_fields": group["changed"],
+                    "coalesced": len(events),
+                    "first_event_at": str(group["first_event_at"]),
+                    "last_event_at": str(group["last_event_at"]),
+                    "data": json.loads(group["payload"] or "{}"),
+                },
+            }
+        )
+    return out
+
+
+def dispatch():
+    """Scheduler entry point: deliver due events to every enabled endpoint."""
+    for endpoint in get_enabled_endpoints():
+        try:
+            deliver(endpoint)
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(title=f"HD Event Outbox: dispatch to {endpoint} failed")
+
+
+def deliver(endpoint: str, max_batches: int = 20) -> dict:
+    """Send due events for one endpoint, stopping at the first failed batch."""
+    ep = frappe.get_doc("HD Event Endpoint", endpoint)
+    batch_size = cint(ep.batch_size) or 50
+    stats = {"batches": 0, "sent": 0, "failed": 0}
+
+    for _ in range(max_batches):
+        rows = _get_due_rows(endpoint, batch_size * SCAN_FACTOR)
+        if not rows:
+            break
+        batch = coalesce(rows)[:batch_size]
+        ids = [i for item in batch for i in item["ids"]]
+        error = _post(ep, [item["event"] for item in batch])
+        if error:
+            _mark_failed(ep, ids, max(item["attempts"] for item in batch) + 1, error)
+            frappe.db.commit()
+            stats["failed"] += len(batch)
+            break
+
+        _mark_sent(ids)
+        frappe.db.commit()
+        stats["batches"] += 1
+        stats["sent"] += len(batch)
+
+    return stats
+
+
+def _get_due_rows(endpoint: str, limit: int) -> list[dict]:
+    """Due pending rows, oldest first.
+
+    A row is held back while an older row for the same document is waiting
+    out its backoff, so a retried payload is never overtaken by a newer one;
+    once the older row is due they are coalesced together.
+    """
+    return frappe.db.sql(
+        """
+        select
+            outbox.name, outbox.event, outbox.reference_doctype,
+            outbox.reference_name, outbox.changed_fields, outbox.payload,
+            outbox.attempts, outbox.creation
+        from `tabHD Event Outbox` outbox
+        where outbox.endpoint = %(endpoint)s
+            and outbox.status = 'Pending'
+            and outbox.next_attempt_at <= %(now)s
+            and not exists (
+                select 1 from `tabHD Event Outbox` earlier
+                where earlier.reference_name = outbox.reference_name
+                    and earlier.reference_doctype = outbox.reference_doctype
+                    and earlier.endpoint = outbox.endpoint
+                    and earlier.status = 'Pending'
+                    and earlier.next_attempt_at > %(now)s
+                    and earlier.name < outbox.name
+            )
+        order by outbox.name asc
+        limit %(limit)s
+        """,
+        {"endpoint": endpoint, "now": now_datetime(), "limit": limit},
+        as_dict=True,
+    )
+
+
+def _post(ep, events: list[dict]) -> str | None:
+    """POST one batch; returns an error message, or None on a 2xx response."""
+    body = json.dumps(
+        {"site": frappe.local.site, "count": len(events), "events": events}, default=str
+    )
+    headers = {"Content-Type": "application/json"}
+    secret = ep.get_password("secret", raise_exception=False)
+    if secret:
+        headers["X-Helpdesk-Signature"] = hmac.new(
+            secret.encode(), body.encode(), hashlib.sha256
+        ).hexdigest()
+
+    try:
+        response = requests.post(
+            ep.url, data=body, headers=headers, timeout=cint(ep.timeout) or 10
+        )
+    except Exception as e:
+        return str(e) or e.__class__.__name__
+    if 200 <= response.status_code < 300:
+        return None
+    return f"HTTP {response.status_code}: {response.text[:500]}"
+
+
+def _mark_sent(ids: list):
+    Outbox = DocType("HD Event Outbox")
+    (
+        frappe.qb.update(Outbox)
+        .set(Outbox.status, "Sent")
+        .set(Outbox.sent_on, now_datetime())
+        .set(Outbox.last_error, None)
+        .where(Outbox.name.isin(ids))
+        .run()
+    )
+
+
+def _mark_failed(ep, ids: list, attempts: int, error: str):
+    delay = min(MAX_BACKOFF_SECONDS, cint(ep.backoff_seconds) * 2 ** (attempts - 1))
+    max_attempts = cint(ep.max_attempts) or 8
+    Outbox = DocType("HD Event Outbox")
+    (
+        frappe.qb.update(Outbox)
+        .set(Outbox.attempts, attempts)
+        .set(Outbox.status, "Dead" if attempts >= max_attempts else "Pending")
+        .set(Outbox.next_attempt_at, add_to_date(now_datetime(), seconds=delay))
+        .set(Outbox.last_error, error[:1000])
+        .where(Outbox.name.isin(ids))
+        .run()
+    )
+
+
+def clear_sent_events():
+    """Daily: drop delivered events after the retention window."""
+    cutoff = add_to_date(now_datetime(), days=-SENT_RETENTION_DAYS)
+    frappe.db.delete("HD Event Outbox", {"status": "Sent", "sent_on": ["<", cutoff]})
@@ -0,0 +1,161 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from helpdesk.api.ingest import _apply_ticket_updates
+from helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox import deliver
+from helpdesk.test_utils import make_ticket
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Local webhook receiver: fails the first `fail` requests, records the rest."""
+
+    received = []
+    fail = 0
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if StubHandler.fail:
+            StubHandler.fail -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        StubHandler.received.append(json.loads(body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@patch("helpdesk.api.license_guard._license_ok", return_value=True)
+class TestHDEventOutbox(FrappeTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = HTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        super().tearDownClass()
+
+    def setUp(self):
+        StubHandler.received = []
+        StubHandler.fail = 0
+        frappe.db.delete("HD Event Outbox")
+        self.endpoint = frappe.get_doc(
+            {
+                "doctype": "HD Event Endpoint",
+                "endpoint_name": "Test Stub",
+                "url": f"http://127.0.0.1:{self.server.server_port}/hook",
+                "batch_size": 10,
+                "backoff_seconds": 0,
+                "max_attempts": 3,
+            }
+        ).insert(ignore_permissions=True)
+
+    def tearDown(self):
+        frappe.delete_doc("HD Event Endpoint", self.endpoint.name, force=True)
+        frappe.db.delete("HD Event Outbox")
+        frappe.db.commit()
+
+    def test_saves_are_coalesced_and_retried(self, _license_ok):
+        ticket = make_ticket(subject="Outbox 1")
+        ticket.subject = "Outbox 2"
+        ticket.save()
+        ticket.subject = "Outbox 3"
+        ticket.save()
+        rows = frappe.get_all(
+            "HD Event Outbox", {"reference_name": ticket.name}, pluck="name"
+        )
+        self.assertEqual(len(rows), 3)
+
+        StubHandler.fail = 1
+        self.assertEqual(deliver(self.endpoint.name)["failed"], 1)
+        self.assertEqual(
+            frappe.db.get_value("HD Event Outbox", rows[0], ["status", "attempts"]),
+            ("Pending", 1),
+        )
+
+        self.assertEqual(deliver(self.endpoint.name)["sent"], 1)
+        self.assertEqual(len(StubHandler.received), 1)
+        events = StubHandler.received[0]["events"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], "ticket.created")
+        self.assertEqual(events[0]["coalesced"], 3)
+        self.assertEqual(events[0]["data"]["subject"], "Outbox 3")
+        self.assertEqual(
+            set(
+                frappe.get_all(
+                    "HD Event Outbox", {"name": ["in", rows]}, pluck="status"
+                )
+            ),
+            {"Sent"},
+        )
+
+    def test_retried_payload_is_not_overtaken(self, _license_ok):
+        self.endpoint.db_set("backoff_seconds", 60)
+        ticket = make_ticket(subject="Outbox order 1")
+        StubHandler.fail = 1
+        self.assertEqual(deliver(self.endpoint.name)["failed"], 1)
+
+        # The newer row is due at once, the failed one only after its backoff
+        ticket.subject = "Outbox order 2"
+        ticket.save()
+        self.assertEqual(deliver(self.endpoint.name)["sent"], 0)
+        self.assertEqual(StubHandler.received, [])
+
+        frappe.db.set_value(
+            "HD Event Outbox",
+            {"reference_name": ticket.name},
+            "next_attempt_at",
+            frappe.utils.now_datetime(),
+        )
+        self.assertEqual(deliver(self.endpoint.name)["sent"], 1)
+        event = StubHandler.received[0]["events"][0]
+        self.assertEqual(event["coalesced"], 2)
+        self.assertEqual(event["data"]["subject"], "Outbox order 2")
+
+    def test_events_go_dead_after_max_attempts(self, _license_ok):
+        make_ticket(subject="Outbox dead")
+        StubHandler.fail = 10
+        for _ in range(3):
+            deliver(self.endpoint.name)
+        self.assertEqual(
+            set(frappe.get_all("HD Event Outbox", pluck="status")), {"Dead"}
+        )
+
+    def test_deleting_a_ticket_records_an_event(self, _license_ok):
+        ticket = make_ticket(subject="Outbox delete")
+        # No `force`: the outbox rows must not block the link checks
+        frappe.delete_doc("HD Ticket", ticket.name, ignore_permissions=True)
+        self.assertFalse(frappe.db.exists("HD Ticket", ticket.name))
+        events = frappe.get_all(
+            "HD Event Outbox", {"reference_name": ticket.name}, pluck="event"
+        )
+        self.assertEqual(sorted(events), ["ticket.created", "ticket.deleted"])
+
+    def test_fast_write_records_an_update(self, _license_ok):
+        ticket = make_ticket(subject="Outbox fast write")
+        _apply_ticket_updates(
+            ticket.name,
+            {"ai_summary": "Short summary", "effort_score": 0.5},
+            respect_shadow=False,
+            fast_write=True,
+        )
+        row = frappe.get_all(
+            "HD Event Outbox",
+            {"reference_name": ticket.name, "event": "ticket.updated"},
+            ["changed_fields", "payload"],
+        )[0]
+        self.assertEqual(json.loads(row.changed_fields), ["ai_summary"])
+        self.assertEqual(json.loads(row.payload)["ai_summary"], "Short summary")
@@ -26,6 +26,7 @@ from helpdesk.helpdesk.utils.email import (
     default_outgoing_email_account,
     default_ticket_outgoing_email_account,
 )
+from helpdesk.helpdesk.utils.settings_snapshot import get_hd_settings
 from helpdesk.search import HelpdeskSearch
 from helpdesk.utils import (
     capture_event,
@@ -86,13 +87,11 @@ class HDTicket(Document):
         ):
             return
 
-        [is_email_feedback_enabled, email_feedback_status] = frappe.get_cached_value(
-            "HD Settings",
-            "HD Settings",
-            ["enable_email_ticket_feedback", "send_email_feedback_on_status"],
-        )
+        settings = get_hd_settings()
+        is_email_feedback_enabled = settings.enable_email_ticket_feedback
+        email_feedback_status = settings.send_email_feedback_on_status
 
-        if not int(is_email_feedback_enabled) or email_feedback_status != self.status:
+        if not is_email_feedback_enabled or email_feedback_status != self.status:
             return
 
         last_communication = self.get_last_communication()
@@ -138,9 +137,7 @@ class HDTicket(Document):
             self.create_communication_via_contact(self.description, new_ticket=True)
             self.handle_inline_media_new_ticket()
 
-        send_ack_email = frappe.db.get_single_value(
-            "HD Settings", "send_acknowledgement_email"
-        )
+        send_ack_email = get_hd_settings().send_acknowledgement_email
         if (
             not self.via_customer_portal
             and not frappe.flags.initial_sync
@@ -183,7 +180,7 @@ class HDTicket(Document):
     def set_ticket_type(self):
         if self.ticket_type:
             return
-        settings = frappe.get_doc("HD Settings")
+        settings = get_hd_settings()
         ticket_type = settings.default_ticket_type or DEFAULT_TICKET_TYPE
         self.ticket_type = ticket_type
 
@@ -220,7 +217,7 @@ class HDTicket(Document):
             return
         self.priority = (
             frappe.get_cached_value("HD Ticket Type", self.ticket_type, "priority")
-            or frappe.get_cached_value("HD Settings", "HD Settings", "default_priority")
+            or get_hd_settings().default_priority
             or DEFAULT_TICKET_PRIORITY
         )
 
@@ -245,7 +242,7 @@ class HDTicket(Document):
         self.feedback_rating = feedback_option.rating
 
     def validate_ticket_type(self):
-        settings = frappe.get_doc("HD Settings")
+        settings = get_hd_settings()
         if settings.is_ticket_type_mandatory and not self.ticket_type:
             frappe.throw(_("Ticket type is mandatory"))
 
@@ -404,16 +401,10 @@ class HDTicket(Document):
             frappe.db.delete("HD Ticket Comment", comment)
 
     def skip_email_workflow(self):
-        skip: str = frappe.get_value("HD Settings", None, "skip_email_workflow") or "0"
-
-        return bool(int(skip))
+        return bool(get_hd_settings().skip_email_workflow)
 
     def instantly_send_email(self):
-        check: str = (
-            frappe.get_value("HD Settings", None, "instantly_send_email") or "0"
-        )
-
-        return bool(int(check))
+        return bool(get_hd_settings().instantly_send_email)
 
     @frappe.whitelist()
     def get_last_communication(self):
@@ -817,7 +808,7 @@ class HDTicket(Document):
                 self.first_responded_on or frappe.utils.now_datetime()
             )
 
-            if frappe.db.get_single_value("HD Settings", "auto_update_status"):
+            if get_hd_settings().auto_update_status:
                 self.status = "Replied"
 
         # Fetch description from communication if not set already. This might not be needed
@@ -1050,14 +1041,11 @@ def has_permission(doc, user=None):
     if not is_agent(user):
         return False
 
-    enable_restrictions = frappe.db.get_single_value(
-        "HD Settings", "restrict_tickets_by_agent_group"
-    )
+    settings = get_hd_settings()
+    enable_restrictions = settings.restrict_tickets_by_agent_group
     if not enable_restrictions:
         return True
-    show_tickets_without_team = frappe.db.get_single_value(
-        "HD Settings", "do_not_restrict_tickets_without_an_agent_group"
-    )
+    show_tickets_without_team = settings.do_not_restrict_tickets_without_an_agent_group
     if show_tickets_without_team and not doc.get("agent_group"):
         return True
 
@@ -1097,15 +1085,12 @@ def permission_query(user):
     if not is_agent(user):
         return query
 
-    enable_restrictions = frappe.db.get_single_value(
-        "HD Settings", "restrict_tickets_by_agent_group"
-    )
+    settings = get_hd_settings()
+    enable_restrictions = settings.restrict_tickets_by_agent_group
     if not enable_restrictions:
         return  # If not enabled, return all tickets
 
-    show_tickets_without_team = frappe.db.get_single_value(
-        "HD Settings", "do_not_restrict_tickets_without_an_agent_group"
-    )
+    show_tickets_without_team = settings.do_not_restrict_tickets_without_an_agent_group
 
     teams = get_agents_team()
 
@@ -1164,10 +1149,11 @@ customer_not_allowed_fields = ["customer"]
 
 
 def close_tickets_after_n_days():
-    if frappe.db.get_single_value("HD Settings", "auto_close_tickets") == 0:
+    settings = get_hd_settings()
+    if not settings.auto_close_tickets:
         return
 
-    days_threshold = frappe.db.get_single_value("HD Settings", "auto_close_after_days")
+    days_threshold = settings.auto_close_after_days
 
     tickets_to_close = (
         frappe.db.sql(
@@ -1197,3 +1183,13 @@ def close_tickets_after_n_days():
         doc.flags.ignore_validate = True
         doc.save(ignore_permissions=True)
         frappe.db.commit()  # nosemgrep
+
+
+def on_doctype_update():
+    # Keyset paging of team queues (ingest API): agent_group filter + (modified, name) order
+    frappe.db.add_index("HD Ticket", ["agent_group", "modified"])
+    # Cluster membership paging and per-cluster recounts (HD Ticket Cluster)
+    frappe.db.add_index("HD Ticket", ["cluster_hash", "modified"])
+    # Dashboard number cards scan a creation range, optionally for one team
+    frappe.db.add_index("HD Ticket", ["creation"])
+    frappe.db.add_index("HD Ticket", ["agent_group", "creation"])
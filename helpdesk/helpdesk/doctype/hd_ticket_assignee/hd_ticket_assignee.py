@@ -0,0 +1,150 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Normalised index of ticket assignments.
+
+Frappe keeps assignments as ToDo rows and mirrors the open ones into the
+`_assign` JSON column of the ticket. Filtering tickets by agent on `_assign`
+(`LIKE '%user%'`, `JSON_SEARCH`) and parsing it per row cannot use an index.
+
+One row per HD Ticket ToDo (same name) records the ticket, the agent, when
+the assignment was made and when it stopped being open. Rows are written from
+the ToDo doc events; `rebuild` resyncs the whole table from ToDo.
+
+An assignment is active while its ToDo is "Open", the same rule Frappe uses
+to build `_assign`.
+"""
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now_datetime
+
+# Keep the first close time when an already closed ToDo is saved again
+UPSERT_ON_DUPLICATE = """
+    ON DUPLICATE KEY UPDATE
+        ticket = VALUES(ticket),
+        agent = VALUES(agent),
+        assigned_on = VALUES(assigned_on),
+        unassigned_on = IF(VALUES(unassigned_on) IS NULL, NULL,
+            IFNULL(unassigned_on, VALUES(unassigned_on))),
+        modified = VALUES(modified)
+"""
+
+
+class HDTicketAssignee(Document):
+    pass
+
+
+def on_doctype_update():
+    # Covers "tickets of agent X" as a semi-join without touching the rows
+    frappe.db.add_index("HD Ticket Assignee", ["agent", "unassigned_on", "ticket"])
+
+
+def sync_from_todo(doc, method=None):
+    """ToDo after_insert / on_update."""
+    if (
+        doc.reference_type != "HD Ticket"
+        or not doc.reference_name
+        or not doc.allocated_to
+    ):
+        # The ToDo may have been moved off a ticket
+        if method == "on_update":
+            _delete({"name": doc.name})
+        return
+
+    now = now_datetime()
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Assignee`
+            (name, ticket, agent, assigned_on, unassigned_on,
+             creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(ticket)s, %(agent)s, %(assigned_on)s, %(unassigned_on)s,
+            %(now)s, %(now)s, %(user)s, %(user)s)
+        {UPSERT_ON_DUPLICATE}
+        """,
+        {
+            "name": doc.name,
+            "ticket": doc.reference_name,
+            "agent": doc.allocated_to,
+            "assigned_on": doc.creation or now,
+            "unassigned_on": None if doc.status == "Open" else (doc.modified or now),
+            "now": now,
+            "user": frappe.session.user,
+        },
+    )
+    _invalidate_dashboard()
+
+
+def on_todo_trash(doc, method=None):
+    if doc.reference_type == "HD Ticket":
+        _delete({"name": doc.name})
+
+
+def on_ticket_delete(doc, method=None):
+    """HD Ticket on_trash: the rows link to the ticket and would block the delete
+    link check; ToDos left behind must not match agent filters either."""
+    _delete({"ticket": doc.name})
+
+
+def _delete(filters):
+    frappe.db.delete("HD Ticket Assignee", filters)
+    _invalidate_dashboard()
+
+
+def _invalidate_dashboard():
+    # `_assign` is written with `db_set`, so ticket hooks never see assignment changes
+    from helpdesk.api.dashboard import invalidate_cache
+
+    invalidate_cache()
+
+
+def rebuild(commit=True):
+    """Resync every row from ToDo (backfill, repair after bulk SQL on ToDo)."""
+    params = {"now": now_datetime(), "user": "Administrator"}
+    frappe.db.sql(
+        """
+        DELETE a FROM `tabHD Ticket Assignee` a
+        LEFT JOIN `tabToDo` t
+            ON t.name = a.name AND t.reference_type = 'HD Ticket'
+        WHERE t.name IS NULL
+        """
+    )
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Assignee`
+            (name, ticket, agent, assigned_on, unassigned_on,
+             creation, modified, owner, modified_by)
+        SELECT
+            name, reference_name, allocated_to, creation,
+            CASE WHEN status = 'Open' THEN NULL ELSE modified END,
+            %(now)s, %(now)s, %(user)s, %(user)s
+        FROM `tabToDo`
+        WHERE reference_type = 'HD Ticket'
+            AND IFNULL(reference_name, '') != ''
+            AND IFNULL(allocated_to, '') != ''
+        {UPSERT_ON_DUPLICATE}
+        """,
+        params,
+    )
+    if commit:
+        frappe.db.commit()
+
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_index():
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        rebuild,
+        queue="long",
+        job_id="helpdesk:rebuild_ticket_assignee",
+        deduplicate=True,
+    )
+
+
+def assigned_tickets_condition(agent: str, column: str = "name") -> str:
+    """SQL condition matching tickets currently assigned to `agent`."""
+    return (
+        f"{column} IN (SELECT ticket FROM `tabHD Ticket Assignee`"
+        f" WHERE agent = {frappe.db.escape(agent)} AND unassigned_on IS NULL)"
+    )
@@ -0,0 +1,59 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.desk.form.assign_to import add as add_assignment
+from frappe.desk.form.assign_to import remove as remove_assignment
+from frappe.tests.utils import FrappeTestCase
+
+from helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee import (
+    assigned_tickets_condition,
+    rebuild,
+)
+from helpdesk.test_utils import make_ticket
+
+
+class TestHDTicketAssignee(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.agent = "Administrator"
+        self.ticket = make_ticket().name
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def rows(self):
+        return frappe.get_all(
+            "HD Ticket Assignee",
+            filters={"ticket": self.ticket},
+            fields=["name", "ticket", "assigned_on", "unassigned_on"],
+            order_by="name",
+        )
+
+    def is_assigned(self):
+        return bool(
+            frappe.db.sql(
+                f"""SELECT name FROM `tabHD Ticket`
+                WHERE name = %s AND {assigned_tickets_condition(self.agent)}""",
+                self.ticket,
+            )
+        )
+
+    def test_index_follows_assignments_and_rebuild(self):
+        ticket = self.ticket
+        add_assignment(
+            {"doctype": "HD Ticket", "name": ticket, "assign_to": [self.agent]}
+        )
+        self.assertTrue(self.is_assigned())
+
+        remove_assignment("HD Ticket", ticket, self.agent)
+        self.assertFalse(self.is_assigned())
+        (row,) = self.rows()
+        self.assertIsNotNone(row.unassigned_on)
+
+        frappe.db.delete("HD Ticket Assignee", {"ticket": ticket})
+        rebuild(commit=False)
+        self.assertEqual(self.rows(), [row])
+
+        frappe.delete_doc("HD Ticket", ticket, ignore_permissions=True)
+        self.assertEqual(self.rows(), [])
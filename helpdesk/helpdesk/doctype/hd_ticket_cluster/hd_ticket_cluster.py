@@ -0,0 +1,300 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Materialised rollup of tickets per `cluster_hash`.
+
+HD Ticket Cluster keeps totals per cluster (ticket count, open count, first and
+last seen, linked Problem Ticket); HD Ticket Cluster Day keeps ticket counts
+per cluster and creation day, so that "top clusters in a window" only reads
+rollup rows for that window.
+
+Both tables are updated incrementally from the HD Ticket doc_events and from
+the ingest fast write path. `rebuild` recomputes a date range and runs daily
+over the last week to repair drift from writes that bypass hooks;
+`rebuild_all` recomputes everything on demand.
+"""
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, getdate, now_datetime, nowdate
+
+from helpdesk.consts import CLOSED_STATUSES
+
+REPAIR_DAYS = 7
+
+
+class HDTicketCluster(Document):
+    pass
+
+
+def is_open(status: str | None) -> int:
+    return 0 if status in CLOSED_STATUSES else 1
+
+
+def day_key(cluster_hash: str, day) -> str:
+    return hashlib.md5(
+        f"{cluster_hash}|{getdate(day).isoformat()}".encode()
+    ).hexdigest()
+
+
+def on_ticket_update(doc, method=None):
+    before = doc.get_doc_before_save()
+    update_for_ticket(
+        old_hash=before.cluster_hash if before else None,
+        new_hash=doc.cluster_hash,
+        old_status=before.status if before else None,
+        new_status=doc.status,
+        creation=doc.creation,
+        is_new=before is None,
+    )
+
+
+def on_ticket_delete(doc, method=None):
+    # `after_delete`: the ticket row is gone, so a refresh no longer counts it
+    update_for_ticket(doc.cluster_hash, None, doc.status, None, doc.creation)
+
+
+def update_for_ticket(
+    old_hash: str | None,
+    new_hash: str | None,
+    old_status: str | None,
+    new_status: str | None,
+    creation,
+    is_new: bool = False,
+):
+    """Apply the delta of one ticket moving from (old_hash, old_status) to (new_hash, new_status)."""
+    old_hash = old_hash or None
+    new_hash = new_hash or None
+    if is_new:
+        old_hash = None
+
+    if old_hash == new_hash:
+        if new_hash and not is_new and is_open(old_status) != is_open(new_status):
+            _adjust_open(new_hash, is_open(new_status) - is_open(old_status))
+        return
+
+    if old_hash:
+        _remove(old_hash, creation)
+    if new_hash:
+        _add(new_hash, is_open(new_status), creation)
+
+
+def _add(cluster_hash: str, open_: int, creation):
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.sql(
+        """
+        INSERT INTO `tabHD Ticket Cluster`
+            (name, cluster_hash, ticket_count, open_count, first_seen, last_seen,
+             creation, modified, owner, modified_by)
+        VALUES (%(cluster)s, %(cluster)s, 1, %(open)s, %(ts)s, %(ts)s, %(now)s, %(now)s, %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE
+            ticket_count = ticket_count + 1,
+            open_count = open_count + %(open)s,
+            first_seen = LEAST(COALESCE(first_seen, %(ts)s), %(ts)s),
+            last_seen = GREATEST(COALESCE(last_seen, %(ts)s), %(ts)s),
+            modified = %(now)s
+        """,
+        {
+            "cluster": cluster_hash,
+            "open": open_,
+            "ts": creation,
+            "now": now,
+            "user": user,
+        },
+    )
+    frappe.db.sql(
+        """
+        INSERT INTO `tabHD Ticket Cluster Day`
+            (name, cluster_hash, day, ticket_count, creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(cluster)s, %(day)s, 1, %(now)s, %(now)s, %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE ticket_count = ticket_count + 1, modified = %(now)s
+        """,
+        {
+            "name": day_key(cluster_hash, creation),
+            "cluster": cluster_hash,
+            "day": getdate(creation),
+            "now": now,
+            "user": user,
+        },
+    )
+
+
+def _remove(cluster_hash: str, creation):
+    frappe.db.sql(
+        """
+        UPDATE `tabHD Ticket Cluster Day`
+        SET ticket_count = GREATEST(ticket_count - 1, 0), modified = %(now)s
+        WHERE name = %(name)s
+        """,
+        {"name": day_key(cluster_hash, creation), "now": now_datetime()},
+    )
+    # first/last seen cannot be decremented; recount the cluster (indexed on cluster_hash)
+    refresh_cluster(cluster_hash)
+
+
+def _adjust_open(cluster_hash: str, delta: int):
+    frappe.db.sql(
+        """
+        UPDATE `tabHD Ticket Cluster`
+        SET open_count = GREATEST(open_count + %(delta)s, 0), modified = %(now)s
+        WHERE name = %(cluster)s
+        """,
+        {"cluster": cluster_hash, "delta": delta, "now": now_datetime()},
+    )
+
+
+def refresh_cluster(cluster_hash: str):
+    """Recompute the totals of one cluster from HD Ticket."""
+    row = frappe.db.sql(
+        """
+        SELECT COUNT(*) AS total,
+            COALESCE(SUM(status NOT IN %(closed)s), 0) AS open,
+            MIN(creation) AS first_seen,
+            MAX(creation) AS last_seen
+        FROM `tabHD Ticket`
+        WHERE cluster_hash = %(cluster)s
+        """,
+        {"cluster": cluster_hash, "closed": CLOSED_STATUSES},
+        as_dict=True,
+    )[0]
+    frappe.db.sql(
+        """
+        UPDATE `tabHD Ticket Cluster`
+        SET ticket_count = %(total)s, open_count = %(open)s,
+            first_seen = %(first_seen)s, last_seen = %(last_seen)s, modified = %(now)s
+        WHERE name = %(cluster)s
+        """,
+        {**row, "cluster": cluster_hash, "now": now_datetime()},
+    )
+
+
+def rebuild(from_date=None, to_date=None, commit=True):
+    """Recompute the day rows in [from_date, to_date] and the totals of every
+    cluster with a ticket created or modified in that range.
+
+    Without arguments the last `REPAIR_DAYS` days are rebuilt (scheduled daily).
+    """
+    to_date = getdate(to_date or nowdate())
+    from_date = getdate(from_date or add_days(to_date, -REPAIR_DAYS))
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "closed": CLOSED_STATUSES,
+        "now": now_datetime(),
+        "user": "Administrator",
+    }
+    # Clusters whose day rows are about to be replaced or whose tickets changed
+    clusters = frappe.db.sql_list(
+        """
+        SELECT cluster_hash FROM `tabHD Ticket Cluster Day`
+        WHERE day BETWEEN %(from_date)s AND %(to_date)s
+        UNION
+        SELECT cluster_hash FROM `tabHD Ticket`
+        WHERE IFNULL(cluster_hash, '') != ''
+            AND creation >= %(from_date)s
+            AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+        UNION
+        SELECT cluster_hash FROM `tabHD Ticket`
+        WHERE IFNULL(cluster_hash, '') != ''
+            AND modified >= %(from_date)s
+            AND modified < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+        """,
+        params,
+    )
+    frappe.db.sql(
+        """
+        DELETE FROM `tabHD Ticket Cluster Day`
+        WHERE day BETWEEN %(from_date)s AND %(to_date)s
+        """,
+        params,
+    )
+    _insert_days(
+        """creation >= %(from_date)s
+        AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)""",
+        params,
+    )
+    if clusters:
+        params["clusters"] = clusters
+        # Clusters left without tickets get no row from the upsert
+        frappe.db.sql(
+            """
+            UPDATE `tabHD Ticket Cluster`
+            SET ticket_count = 0, open_count = 0, modified = %(now)s
+            WHERE name IN %(clusters)s
+            """,
+            params,
+        )
+        _upsert_totals("cluster_hash IN %(clusters)s", params)
+    if commit:
+        frappe.db.commit()
+
+
+def rebuild_all():
+    """Recompute both rollup tables from HD Ticket, keeping linked Problem Tickets."""
+    params = {"closed": CLOSED_STATUSES, "now": now_datetime(), "user": "Administrator"}
+    frappe.db.sql("DELETE FROM `tabHD Ticket Cluster Day`")
+    _insert_days("1 = 1", params)
+    frappe.db.sql(
+        "UPDATE `tabHD Ticket Cluster` SET ticket_count = 0, open_count = 0, modified = %(now)s",
+        params,
+    )
+    _upsert_totals("1 = 1", params)
+    frappe.db.commit()
+
+
+def _insert_days(condition: str, params: dict):
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Cluster Day`
+            (name, cluster_hash, day, ticket_count, creation, modified, owner, modified_by)
+        SELECT MD5(CONCAT(cluster_hash, '|', DATE(creation))), cluster_hash, DATE(creation),
+            COUNT(*), %(now)s, %(now)s, %(user)s, %(user)s
+        FROM `tabHD Ticket`
+        WHERE IFNULL(cluster_hash, '') != '' AND {condition}
+        GROUP BY cluster_hash, DATE(creation)
+        """,
+        params,
+    )
+
+
+def _upsert_totals(condition: str, params: dict):
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Cluster`
+            (name, cluster_hash, ticket_count, open_count, first_seen, last_seen,
+             creation, modified, owner, modified_by)
+        SELECT cluster_hash, cluster_hash, COUNT(*), SUM(status NOT IN %(closed)s),
+            MIN(creation), MAX(creation), %(now)s, %(now)s, %(user)s, %(user)s
+        FROM `tabHD Ticket`
+        WHERE IFNULL(cluster_hash, '') != '' AND {condition}
+        GROUP BY cluster_hash
+        ON DUPLICATE KEY UPDATE
+            ticket_count = VALUES(ticket_count),
+            open_count = VALUES(open_count),
+            first_seen = VALUES(first_seen),
+            last_seen = VALUES(last_seen),
+            modified = VALUES(modified)
+        """,
+        params,
+    )
+
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_range(from_date: str, to_date: str):
+    frappe.only_for("System Manager")
+    rebuild(from_date, to_date)
+
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_clusters():
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        rebuild_all,
+        queue="long",
+        job_id="helpdesk:rebuild_ticket_clusters",
+        deduplicate=True,
+    )
@@ -0,0 +1,67 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster import rebuild
+from helpdesk.test_utils import make_ticket
+
+
+class TestHDTicketCluster(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.cluster = frappe.generate_hash(length=32)
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def test_counts_follow_tickets_and_problem_ticket_can_be_deleted(self):
+        ticket = make_ticket(cluster_hash=self.cluster)
+        make_ticket(cluster_hash=self.cluster)
+        cluster = frappe.get_doc("HD Ticket Cluster", self.cluster)
+        self.assertEqual((cluster.ticket_count, cluster.open_count), (2, 2))
+        self.assertEqual(
+            frappe.db.get_value(
+                "HD Ticket Cluster Day", {"cluster_hash": self.cluster}, "ticket_count"
+            ),
+            2,
+        )
+
+        ticket.status = "Closed"
+        ticket.save(ignore_permissions=True)
+        self.assertEqual(
+            frappe.db.get_value("HD Ticket Cluster", self.cluster, "open_count"), 1
+        )
+
+        problem = frappe.get_doc(
+            {"doctype": "Problem Ticket", "subject": "Cluster problem"}
+        ).insert(ignore_permissions=True)
+        frappe.db.set_value(
+            "HD Ticket Cluster", self.cluster, "problem_ticket", problem.name
+        )
+        frappe.delete_doc("Problem Ticket", problem.name, ignore_permissions=True)
+        self.assertIsNone(
+            frappe.db.get_value("HD Ticket Cluster", self.cluster, "problem_ticket")
+        )
+
+    def test_rebuild_repairs_recent_clusters(self):
+        make_ticket(cluster_hash=self.cluster)
+        make_ticket(cluster_hash=self.cluster)
+        frappe.db.set_value(
+            "HD Ticket Cluster",
+            self.cluster,
+            {"ticket_count": 7, "open_count": 0},
+            update_modified=False,
+        )
+        frappe.db.delete("HD Ticket Cluster Day", {"cluster_hash": self.cluster})
+
+        rebuild(commit=False)
+        cluster = frappe.get_doc("HD Ticket Cluster", self.cluster)
+        self.assertEqual((cluster.ticket_count, cluster.open_count), (2, 2))
+        self.assertEqual(
+            frappe.db.get_value(
+                "HD Ticket Cluster Day", {"cluster_hash": self.cluster}, "ticket_count"
+            ),
+            2,
+        )
@@ -0,0 +1,14 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+
+
+class HDTicketClusterDay(Document):
+    pass
+
+
+def on_doctype_update():
+    # Window scans for ingest.get_top_clusters
+    frappe.db.add_index("HD Ticket Cluster Day", ["day", "cluster_hash"])
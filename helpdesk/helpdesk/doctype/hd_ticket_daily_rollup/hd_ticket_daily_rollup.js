@@ -0,0 +1,8 @@
+// Copyright (c) 2026, Frappe Technologies and contributors
+// For license information, please see license.txt
+
+// frappe.ui.form.on("HD Ticket Daily Rollup", {
+// 	refresh(frm) {
+
+// 	},
+// });
@@ -0,0 +1,218 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Daily ticket counters for dashboards and trends.
+
+One row per (creation day, team, priority, ticket type, channel) holds the
+contribution of every ticket created that day: created / open / resolved
+counts, SLA outcome, summed first response and resolution times and feedback
+totals. A ticket save subtracts its previous contribution and adds the new
+one, so the rows always reflect the current state of the tickets, which is
+what the raw dashboard queries used to compute.
+
+`rebuild` recomputes any date range from HD Ticket and runs daily over the
+last week to repair drift from writes that bypass document hooks.
+"""
+
+import hashlib
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import (
+    add_days,
+    cint,
+    flt,
+    get_datetime,
+    getdate,
+    now_datetime,
+    nowdate,
+)
+
+from helpdesk.consts import CLOSED_STATUSES
+
+COUNTERS = (
+    "created",
+    "open_count",
+    "resolved",
+    "sla_fulfilled",
+    "sla_failed",
+    "first_response_count",
+    "first_response_seconds",
+    "resolution_count",
+    "resolution_days",
+    "feedback_count",
+    "feedback_sum",
+)
+REPAIR_DAYS = 7
+
+
+class HDTicketDailyRollup(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("HD Ticket Daily Rollup", ["day", "agent_group"])
+
+
+def channel_of(ticket) -> str:
+    return "Portal" if cint(ticket.get("via_customer_portal")) else "Email"
+
+
+def rollup_key(day, agent_group, priority, ticket_type, channel) -> str:
+    parts = (
+        getdate(day).isoformat(),
+        agent_group or "",
+        priority or "",
+        ticket_type or "",
+        channel,
+    )
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+def contribution(ticket) -> tuple[tuple, dict] | None:
+    """(dimensions, counters) a ticket adds to its day row."""
+    if not ticket or not ticket.get("creation"):
+        return None
+    creation = get_datetime(ticket.creation)
+    counters = {
+        "created": 1,
+        "open_count": int(ticket.status == "Open"),
+        "resolved": int(ticket.status in CLOSED_STATUSES),
+        "sla_fulfilled": int(ticket.agreement_status == "Fulfilled"),
+        "sla_failed": int(ticket.agreement_status == "Failed"),
+    }
+    if ticket.get("first_responded_on"):
+        counters["first_response_count"] = 1
+        counters["first_response_seconds"] = int(
+            (get_datetime(ticket.first_responded_on) - creation).total_seconds()
+        )
+    if ticket.status in CLOSED_STATUSES and ticket.get("resolution_date"):
+        # Same truncation as TIMESTAMPDIFF(DAY, creation, resolution_date)
+        seconds = (get_datetime(ticket.resolution_date) - creation).total_seconds()
+        counters["resolution_count"] = 1
+        counters["resolution_days"] = int(seconds / 86400)
+    if flt(ticket.get("feedback_rating")) > 0:
+        counters["feedback_count"] = 1
+        counters["feedback_sum"] = flt(ticket.feedback_rating)
+
+    dims = (
+        getdate(creation),
+        ticket.get("agent_group") or None,
+        ticket.get("priority") or None,
+        ticket.get("ticket_type") or None,
+        channel_of(ticket),
+    )
+    return dims, counters
+
+
+def apply(dims: tuple, counters: dict, sign: int = 1):
+    values = {c: sign * counters.get(c, 0) for c in COUNTERS}
+    now = now_datetime()
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Daily Rollup`
+            (name, day, agent_group, priority, ticket_type, channel,
+             {", ".join(COUNTERS)}, creation, modified, owner, modified_by)
+        VALUES (%(name)s, %(day)s, %(agent_group)s, %(priority)s, %(ticket_type)s, %(channel)s,
+            {", ".join(f"%({c})s" for c in COUNTERS)}, %(now)s, %(now)s, %(user)s, %(user)s)
+        ON DUPLICATE KEY UPDATE
+            {", ".join(f"{c} = {c} + VALUES({c})" for c in COUNTERS)},
+            modified = VALUES(modified)
+        """,
+        {
+            "name": rollup_key(*dims),
+            "day": dims[0],
+            "agent_group": dims[1],
+            "priority": dims[2],
+            "ticket_type": dims[3],
+            "channel": dims[4],
+            "now": now,
+            "user": frappe.session.user,
+            **values,
+        },
+    )
+
+
+def update_for_ticket(before, after):
+    old = contribution(before)
+    new = contribution(after)
+    if old == new:
+        return
+    if old:
+        apply(*old, sign=-1)
+    if new:
+        apply(*new)
+
+
+def on_ticket_update(doc, method=None):
+    update_for_ticket(doc.get_doc_before_save(), doc)
+
+
+def on_ticket_delete(doc, method=None):
+    update_for_ticket(doc, None)
+
+
+def rebuild(from_date=None, to_date=None, commit=True):
+    """Recompute the rows for tickets created in [from_date, to_date].
+
+    Without arguments the last `REPAIR_DAYS` days are rebuilt (scheduled daily).
+    """
+    to_date = getdate(to_date or nowdate())
+    from_date = getdate(from_date or add_days(to_date, -REPAIR_DAYS))
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "closed": CLOSED_STATUSES,
+        "now": now_datetime(),
+        "user": "Administrator",
+    }
+    channel = "IF(via_customer_portal = 1, 'Portal', 'Email')"
+    frappe.db.sql(
+        """
+        DELETE FROM `tabHD Ticket Daily Rollup`
+        WHERE day BETWEEN %(from_date)s AND %(to_date)s
+        """,
+        params,
+    )
+    frappe.db.sql(
+        f"""
+        INSERT INTO `tabHD Ticket Daily Rollup`
+            (name, day, agent_group, priority, ticket_type, channel,
+             {", ".join(COUNTERS)}, creation, modified, owner, modified_by)
+        SELECT
+            MD5(CONCAT_WS('|', DATE(creation), IFNULL(agent_group, ''), IFNULL(priority, ''),
+                IFNULL(ticket_type, ''), {channel})),
+            DATE(creation),
+            NULLIF(agent_group, ''),
+            NULLIF(priority, ''),
+            NULLIF(ticket_type, ''),
+            {channel},
+            COUNT(*),
+            SUM(status = 'Open'),
+            SUM(status IN %(closed)s),
+            SUM(IFNULL(agreement_status, '') = 'Fulfilled'),
+            SUM(IFNULL(agreement_status, '') = 'Failed'),
+            COUNT(first_responded_on),
+            IFNULL(SUM(TIMESTAMPDIFF(SECOND, creation, first_responded_on)), 0),
+            SUM(status IN %(closed)s AND resolution_date IS NOT NULL),
+            IFNULL(SUM(CASE WHEN status IN %(closed)s
+                THEN TIMESTAMPDIFF(DAY, creation, resolution_date) END), 0),
+            SUM(IFNULL(feedback_rating, 0) > 0),
+            IFNULL(SUM(CASE WHEN feedback_rating > 0 THEN feedback_rating END), 0),
+            %(now)s, %(now)s, %(user)s, %(user)s
+        FROM `tabHD Ticket`
+        WHERE creation >= %(from_date)s AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+        GROUP BY DATE(creation), IFNULL(agent_group, ''), IFNULL(priority, ''),
+            IFNULL(ticket_type, ''), {channel}
+        """,
+        params,
+    )
+    if commit:
+        frappe.db.commit()
+
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_range(from_date: str, to_date: str):
+    frappe.only_for("System Manager")
+    rebuild(from_date, to_date)
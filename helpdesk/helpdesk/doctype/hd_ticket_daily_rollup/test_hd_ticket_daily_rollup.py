@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from helpdesk.helpdesk.doctype.hd_ticket_daily_rollup.hd_ticket_daily_rollup import (
+    COUNTERS,
+    rebuild,
+)
+from helpdesk.test_utils import make_ticket
+
+
+class TestHDTicketDailyRollup(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.team = f"Rollup {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Team", "team_name": self.team}).insert(
+            ignore_permissions=True
+        )
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def totals(self):
+        return frappe.get_all(
+            "HD Ticket Daily Rollup",
+            filters={"agent_group": self.team, "day": nowdate()},
+            fields=[f"sum({c}) as {c}" for c in COUNTERS],
+        )[0]
+
+    def test_rollup_follows_ticket_lifecycle_and_rebuild(self):
+        first = make_ticket(agent_group=self.team)
+        second = make_ticket(agent_group=self.team)
+        totals = self.totals()
+        self.assertEqual(totals.created, 2)
+        self.assertEqual(totals.open_count, 2)
+
+        second.reload()
+        second.status = "Resolved"
+        second.feedback_rating = 0.6
+        second.save(ignore_permissions=True)
+        totals = self.totals()
+        self.assertEqual(totals.created, 2)
+        self.assertEqual(totals.open_count, 1)
+        self.assertEqual(totals.resolved, 1)
+        self.assertEqual(totals.feedback_count, 1)
+        self.assertAlmostEqual(totals.feedback_sum, 0.6)
+
+        frappe.delete_doc("HD Ticket", first.name, ignore_permissions=True, force=True)
+        incremental = self.totals()
+        self.assertEqual(incremental.created, 1)
+        self.assertEqual(incremental.open_count, 0)
+
+        rebuild(nowdate(), nowdate(), commit=False)
+        self.assertEqual(self.totals(), incremental)
@@ -0,0 +1,238 @@
+# Copyright (c) 2026, Frappe Technologies and contributors
+# For license information, please see license.txt
+
+"""
+Mergeable first response and resolution time distributions per day and team.
+
+Each row is one bucket of a log-bucketed histogram (the DDSketch mapping): a
+duration of `x` seconds falls in bucket `ceil(log(x) / log(GAMMA))`, so the
+bucket's representative value is within `RELATIVE_ACCURACY` of every duration
+in it. Buckets of any range of days and teams merge by summing their counts,
+which gives p50/p90/p99 for the range from a few hundred rows.
+
+Unlike t-digest or KLL summaries, a ticket can be taken out again by
+subtracting its bucket, so the rows stay exact when a ticket is edited or
+deleted, the same way HD Ticket Daily Rollup does. `rebuild` recomputes any
+date range and runs daily over the last week.
+"""
+
+import hashlib
+import math
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, get_datetime, getdate, now_datetime, nowdate
+
+from helpdesk.consts import CLOSED_STATUSES
+from helpdesk.utils import agent_only
+
+METRICS = ("First Response", "Resolution")
+QUANTILES = (0.5, 0.9, 0.99)
+RELATIVE_ACCURACY = 0.01
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+REPAIR_DAYS = 7
+
+
+class HDTicketTimeSketch(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index("HD Ticket Time Sketch", ["day", "agent_group", "metric"])
+
+
+def bucket_of(seconds: float) -> int:
+    # Up to a second (and clock skew below zero) share bucket 0
+    if seconds <= 1:
+        return 0
+    return math.ceil(math.log(seconds) / LOG_GAMMA)
+
+
+def bucket_value(bucket: int) -> float:
+    if bucket <= 0:
+        return 0.0
+    return 2 * GAMMA**bucket / (GAMMA + 1)
+
+
+def sketch_key(day, agent_group, metric, bucket) -> str:
+    parts = (getdate(day).isoformat(), agent_group or "", metric, str(bucket))
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+
+def contribution(ticket) -> list[tuple]:
+    """(day, team, metric, bucket) entries a ticket adds."""
+    if not ticket or not ticket.get("creation"):
+        return []
+    creation = get_datetime(ticket.creation)
+    dims = (getdate(creation), ticket.get("agent_group") or None)
+    entries = []
+    # Whole seconds, like TIMESTAMPDIFF in `rebuild`, so both agree on the bucket
+    if ticket.get("first_responded_on"):
+        seconds = int(
+            (get_datetime(ticket.first_responded_on) - creation).total_seconds()
+        )
+        entries.append((*dims, "First Response", bucket_of(seconds)))
+    if ticket.status in CLOSED_STATUSES and ticket.get("resolution_date"):
+        seconds = int((get_datetime(ticket.resolution_date) - creation).total_seconds())
+        entries.append((*dims, "Resolution", bucket_of(seconds)))
+    return entries
+
+
+def apply(entries: list[tuple], sign: int = 1):
+    if not entries:
+        return
+    now = now_datetime()
+    user = frappe.session.user
+    values = [
+        (sketch_key(*entry), *entry, sign, now, now, user, user) for entry in entries
+    ]
+    frappe.db.sql(
+        """
+        INSERT INTO `tabHD Ticket Time Sketch`
+            (name, day, agent_group, metric, bucket, count,
+             creation, modified, owner, modified_by)
+        VALUES {0}
+        ON DUPLICATE KEY UPDATE
+            count = count + VALUES(count),
+            modified = VALUES(modified)
+        """.format(
+            ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(values))
+        ),
+        [v for row in values for v in row],
+    )
+
+
+def update_for_ticket(before, after):
+    old = contribution(before)
+    new = contribution(after)
+    apply([e for e in old if e not in new], sign=-1)
+    apply([e for e in new if e not in old])
+
+
+def on_ticket_update(doc, method=None):
+    update_for_ticket(doc.get_doc_before_save(), doc)
+
+
+def on_ticket_delete(doc, method=None):
+    update_for_ticket(doc, None)
+
+
+def rebuild(from_date=None, to_date=None, commit=True):
+    """Recompute the buckets for tickets created in [from_date, to_date].
+
+    Without arguments the last `REPAIR_DAYS` days are rebuilt (scheduled daily).
+    """
+    to_date = getdate(to_date or nowdate())
+    from_date = getdate(from_date or add_days(to_date, -REPAIR_DAYS))
+    params = {
+        "from_date": from_date,
+        "to_date": to_date,
+        "closed": CLOSED_STATUSES,
+        "log_gamma": LOG_GAMMA,
+        "now": now_datetime(),
+        "user": "Administrator",
+    }
+    frappe.db.sql(
+        """
+        DELETE FROM `tabHD Ticket Time Sketch`
+        WHERE day BETWEEN %(from_date)s AND %(to_date)s
+        """,
+        params,
+    )
+    frappe.db.sql(
+        """
+        INSERT INTO `tabHD Ticket Time Sketch`
+            (name, day, agent_group, metric, bucket, count,
+             creation, modified, owner, modified_by)
+        SELECT
+            MD5(CONCAT_WS('|', day, IFNULL(agent_group, ''), metric, bucket)),
+            day, agent_group, metric, bucket, COUNT(*),
+            %(now)s, %(now)s, %(user)s, %(user)s
+        FROM (
+            SELECT
+                day, agent_group, metric,
+                CASE WHEN seconds <= 1 THEN 0
+                    ELSE CEIL(LN(seconds) / %(log_gamma)s) END AS bucket
+            FROM (
+                SELECT
+                    DATE(creation) AS day,
+                    NULLIF(agent_group, '') AS agent_group,
+                    'First Response' AS metric,
+                    TIMESTAMPDIFF(SECOND, creation, first_responded_on) AS seconds
+                FROM `tabHD Ticket`
+                WHERE creation >= %(from_date)s
+                    AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+                    AND first_responded_on IS NOT NULL
+                UNION ALL
+                SELECT
+                    DATE(creation), NULLIF(agent_group, ''), 'Resolution',
+                    TIMESTAMPDIFF(SECOND, creation, resolution_date)
+                FROM `tabHD Ticket`
+                WHERE creation >= %(from_date)s
+                    AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+                    AND status IN %(closed)s
+                    AND resolution_date IS NOT NULL
+            ) durations
+        ) buckets
+        GROUP BY day, IFNULL(agent_group, ''), metric, bucket
+        """,
+        params,
+    )
+    if commit:
+        frappe.db.commit()
+
+
+def get_percentiles(from_date, to_date, team=None, quantiles=QUANTILES) -> dict:
+    """
+    Merge the buckets of tickets created in [from_date, to_date] and return
+    `{metric: {"count": n, "p50": seconds, ...}}` per metric (scrubbed name).
+    """
+    filters = {"day": ["between", [from_date, to_date]]}
+    if team:
+        filters["agent_group"] = team
+    rows = frappe.get_all(
+        "HD Ticket Time Sketch",
+        filters=filters,
+        fields=["metric", "bucket", "sum(count) as count"],
+        group_by="metric, bucket",
+        order_by="metric, bucket",
+    )
+
+    buckets = {metric: [] for metric in METRICS}
+    for row in rows:
+        if row.count > 0:
+            buckets[row.metric].append((row.bucket, row.count))
+
+    result = frappe._dict()
+    for metric, counts in buckets.items():
+        total = sum(c for _, c in counts)
+        stats = frappe._dict(count=total)
+        for q in quantiles:
+            stats[f"p{round(q * 100)}"] = _quantile(counts, total, q)
+        result[frappe.scrub(metric)] = stats
+    return result
+
+
+def _quantile(counts, total, q):
+    if not total:
+        return None
+    rank = q * (total - 1)
+    seen = 0
+    for bucket, count in counts:
+        seen += count
+        if seen > rank:
+            return bucket_value(bucket)
+    return bucket_value(counts[-1][0])
+
+
+@frappe.whitelist()
+@agent_only
+def get_time_percentiles(from_date: str, to_date: str, team: str | None = None):
+    return get_percentiles(from_date, to_date, team)
+
+
+@frappe.whitelist(methods=["POST"])
+def rebuild_range(from_date: str, to_date: str):
+    frappe.only_for("System Manager")
+    rebuild(from_date, to_date)
@@ -0,0 +1,57 @@
+# Copyright (c) 2026, Frappe Technologies and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import add_to_date, nowdate
+
+from helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch import (
+    RELATIVE_ACCURACY,
+    get_percentiles,
+    rebuild,
+)
+from helpdesk.test_utils import make_ticket
+
+
+class TestHDTicketTimeSketch(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.team = f"Sketch {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Team", "team_name": self.team}).insert(
+            ignore_permissions=True
+        )
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def respond(self, minutes):
+        ticket = make_ticket(agent_group=self.team)
+        ticket.reload()
+        ticket.first_responded_on = add_to_date(ticket.creation, minutes=minutes)
+        ticket.save(ignore_permissions=True)
+        return ticket
+
+    def first_response(self):
+        return get_percentiles(nowdate(), nowdate(), self.team).first_response
+
+    def assertSeconds(self, value, minutes):
+        self.assertAlmostEqual(
+            value, minutes * 60, delta=minutes * 60 * RELATIVE_ACCURACY
+        )
+
+    def test_percentiles_follow_tickets_and_rebuild(self):
+        tickets = [self.respond(minutes) for minutes in (10, 20, 30, 40, 600)]
+        stats = self.first_response()
+        self.assertEqual(stats.count, 5)
+        self.assertSeconds(stats.p50, 30)
+        self.assertSeconds(stats.p99, 600)
+
+        frappe.delete_doc(
+            "HD Ticket", tickets[-1].name, ignore_permissions=True, force=True
+        )
+        incremental = self.first_response()
+        self.assertEqual(incremental.count, 4)
+        self.assertSeconds(incremental.p99, 40)
+
+        rebuild(nowdate(), nowdate(), commit=False)
+        self.assertEqual(self.first_response(), incremental)
@@ -119,4 +119,21 @@ class TestHelpdeskAISettings(FrappeTestCase):
         self.assertTrue(res.get("ok"))
         self.assertEqual(res.get("status"), "grace")
         st = frappe.get_single("HelpdeskAI Settings").reload()
-        self.assertEqual(st.last_check_status, "GRACE")
\ No newline at end of file
+        self.assertEqual(st.last_check_status, "GRACE")
+    # ---- Settings snapshot ------------------------------------------------
+
+    def test_snapshot_is_read_only_and_invalidated_on_save(self):
+        from helpdesk.helpdesk.utils.settings_snapshot import get_ai_settings
+
+        snap = get_ai_settings()
+        self.assertIs(get_ai_settings(), snap)  # TR: kayıt yoksa aynı nesne
+        with self.assertRaises(AttributeError):
+            snap.instance_id = "x"
+
+        self.st.instance_id = "SNAPSHOT-TEST"
+        self.st.save(ignore_permissions=True)
+        self.assertEqual(get_ai_settings().instance_id, "SNAPSHOT-TEST")
+
+        # TR: set_single_value da `modified`'ı değiştirir → snapshot yenilenir
+        frappe.db.set_single_value("HelpdeskAI Settings", "instance_id", "SET-SINGLE")
+        self.assertEqual(get_ai_settings().instance_id, "SET-SINGLE")
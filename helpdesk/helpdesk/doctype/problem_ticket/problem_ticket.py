@@ -1,8 +1,37 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
+import hashlib
+import re
+
 import frappe
 from frappe.model.document import Document
+from frappe.utils import cstr
            # [6] TR: HD Ticket'taki link kolon
 
+
+def normalize_subject(subject: str | None) -> str:
+    """TR: Büyük/küçük harf ve boşluk farkları aynı problemi ayırmasın."""
+    return re.sub(r"\s+", " ", cstr(subject)).strip().casefold()
+
+
+def get_subject_hash(subject: str | None) -> str | None:
+    """TR: Normalize edilmiş subject'in SHA-1'i (indeksli `subject_hash` kolonu)."""
+    norm = normalize_subject(subject)
+    if not norm:
+        return None
+    return hashlib.sha1(norm.encode("utf-8")).hexdigest()
+
+
 class ProblemTicket(Document):
-    pass
\ No newline at end of file
+    def validate(self):
+        self.subject_hash = get_subject_hash(self.subject)
+
+    def on_trash(self):
+        """TR: Bağlı kümeler silmeyi engellemesin; bağlantıyı kaldır."""
+        frappe.db.set_value(
+            "HD Ticket Cluster",
+            {"problem_ticket": self.name},
+            "problem_ticket",
+            None,
+            update_modified=False,
+        )
@@ -0,0 +1,35 @@
+// Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+// For license information, please see license.txt
+/* eslint-disable */
+
+frappe.query_reports["AI Interaction Analytics"] = {
+  filters: [
+    {
+      label: __("From Date"),
+      fieldname: "from_date",
+      fieldtype: "Date",
+      default: frappe.datetime.add_days(frappe.datetime.nowdate(), -7),
+      reqd: 1,
+    },
+    {
+      label: __("To Date"),
+      fieldname: "to_date",
+      fieldtype: "Date",
+      default: frappe.datetime.nowdate(),
+      reqd: 1,
+    },
+    {
+      label: __("Group By"),
+      fieldname: "group_by",
+      fieldtype: "Select",
+      options: ["Action", "Source", "Status", "Preview"],
+      default: "Action",
+    },
+    {
+      label: __("Hourly"),
+      fieldname: "hourly",
+      fieldtype: "Check",
+      default: 0,
+    },
+  ],
+};
@@ -0,0 +1,101 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, getdate
+
+from helpdesk.helpdesk.doctype.ai_interaction_rollup.ai_interaction_rollup import (
+    get_stats,
+)
+
+
+def execute(filters=None):
+    filters = frappe._dict(filters or {})
+    group_field = (filters.group_by or "Action").lower()
+    hourly = cint(filters.hourly)
+
+    data = get_stats(
+        getdate(filters.from_date),
+        add_days(getdate(filters.to_date), 1),
+        [group_field],
+        hourly=bool(hourly),
+    )
+    columns = get_columns(group_field, hourly)
+    chart = get_chart_data(data) if hourly else None
+    return columns, data, None, chart
+
+
+def get_columns(group_field, hourly):
+    columns = []
+    if hourly:
+        columns.append(
+            {
+                "label": _("Hour"),
+                "fieldname": "bucket",
+                "fieldtype": "Datetime",
+                "width": 160,
+            }
+        )
+    columns.append(
+        {
+            "label": _(group_field.title()),
+            "fieldname": group_field,
+            "fieldtype": "Check" if group_field == "preview" else "Data",
+            "width": 180,
+        }
+    )
+    columns += [
+        {
+            "label": _("Interactions"),
+            "fieldname": "total",
+            "fieldtype": "Int",
+            "width": 110,
+        },
+        {
+            "label": _("Previews"),
+            "fieldname": "previews",
+            "fieldtype": "Int",
+            "width": 100,
+        },
+        {
+            "label": _("Preview Rate %"),
+            "fieldname": "preview_rate",
+            "fieldtype": "Percent",
+            "width": 120,
+        },
+        {
+            "label": _("Failures"),
+            "fieldname": "failures",
+            "fieldtype": "Int",
+            "width": 100,
+        },
+        {
+            "label": _("Failure Rate %"),
+            "fieldname": "failure_rate",
+            "fieldtype": "Percent",
+            "width": 120,
+        },
+        {"label": _("Tokens"), "fieldname": "tokens", "fieldtype": "Int", "width": 100},
+        {
+            "label": _("Cost (USD)"),
+            "fieldname": "cost_usd",
+            "fieldtype": "Currency",
+            "width": 110,
+        },
+    ]
+    return columns
+
+
+def get_chart_data(data):
+    totals = {}
+    for row in data:
+        key = str(row.bucket)
+        totals[key] = totals.get(key, 0) + row.total
+    return {
+        "data": {
+            "labels": list(totals),
+            "datasets": [{"name": _("Interactions"), "values": list(totals.values())}],
+        },
+        "type": "line",
+    }
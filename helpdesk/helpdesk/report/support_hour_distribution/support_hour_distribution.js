@@ -5,18 +5,25 @@
 frappe.query_reports["Support Hour Distribution"] = {
   filters: [
     {
-      lable: __("From Date"),
+      label: __("From Date"),
       fieldname: "from_date",
       fieldtype: "Date",
       default: frappe.datetime.nowdate(),
       reqd: 1,
     },
     {
-      lable: __("To Date"),
+      label: __("To Date"),
       fieldname: "to_date",
       fieldtype: "Date",
       default: frappe.datetime.nowdate(),
       reqd: 1,
     },
+    {
+      label: __("Mode"),
+      fieldname: "mode",
+      fieldtype: "Select",
+      options: ["Time Slots", "Hour of Week"],
+      default: "Time Slots",
+    },
   ],
 };
@@ -5,88 +5,91 @@ from __future__ import unicode_literals
 
 import frappe
 from frappe import _
-from frappe.utils import add_to_date, get_datetime, getdate
-from six import iteritems
-
-time_slots = {
-    "12AM - 3AM": "00:00:00-03:00:00",
-    "3AM - 6AM": "03:00:00-06:00:00",
-    "6AM - 9AM": "06:00:00-09:00:00",
-    "9AM - 12PM": "09:00:00-12:00:00",
-    "12PM - 3PM": "12:00:00-15:00:00",
-    "3PM - 6PM": "15:00:00-18:00:00",
-    "6PM - 9PM": "18:00:00-21:00:00",
-    "9PM - 12AM": "21:00:00-23:00:00",
-}
+from frappe.utils import add_days, date_diff, getdate
+
+# Three-hour slots, indexed by HOUR(creation) DIV 3
+TIME_SLOTS = [
+    "12AM - 3AM",
+    "3AM - 6AM",
+    "6AM - 9AM",
+    "9AM - 12PM",
+    "12PM - 3PM",
+    "3PM - 6PM",
+    "6PM - 9PM",
+    "9PM - 12AM",
+]
+# Indexed by WEEKDAY(creation)
+WEEKDAYS = [
+    "Monday",
+    "Tuesday",
+    "Wednesday",
+    "Thursday",
+    "Friday",
+    "Saturday",
+    "Sunday",
+]
+HOURS = ["{0:02d}".format(hour) for hour in range(24)]
 
 
 def execute(filters=None):
-    columns, data = [], []
+    filters = frappe._dict(filters or {})
     if not filters.get("periodicity"):
         filters["periodicity"] = "Daily"
 
-    columns = get_columns()
-    data, timeslot_wise_count = get_data(filters)
-    chart = get_chart_data(timeslot_wise_count)
-    return columns, data, None, chart
+    if filters.get("mode") == "Hour of Week":
+        counts = get_counts(filters, "WEEKDAY(creation)", "HOUR(creation)")
+        return (
+            get_heatmap_columns(),
+            get_heatmap_data(counts),
+            None,
+            get_heatmap_chart(counts),
+        )
+
+    counts = get_counts(filters, "DATE(creation)", "HOUR(creation) DIV 3")
+    data, timeslot_wise_count = get_data(filters, counts)
+    return get_columns(), data, None, get_chart_data(timeslot_wise_count)
+
+
+def get_counts(filters, row_expr, column_expr):
+    """
+    Ticket counts per (row, column) bucket from one grouped scan of the
+    creation range (served by the HD Ticket creation index).
+    """
+    result = frappe.db.sql(
+        f"""
+        SELECT {row_expr} AS row_key, {column_expr} AS column_key, COUNT(*) AS count
+        FROM `tabHD Ticket`
+        WHERE creation >= %(from_date)s
+            AND creation < DATE_ADD(%(to_date)s, INTERVAL 1 DAY)
+        GROUP BY row_key, column_key
+        """,
+        {"from_date": filters.from_date, "to_date": filters.to_date},
+        as_dict=1,
+    )
+    return {(r.row_key, r.column_key): r.count for r in result}
 
 
-def get_data(filters):
+def get_data(filters, counts):
     start_date = getdate(filters.from_date)
     data = []
-    time_slot_wise_total_count = {}
-    while start_date <= getdate(filters.to_date):
-        hours_count = {"date": start_date}
-        for key, value in iteritems(time_slots):
-            start_time, end_time = value.split("-")
-            start_time = get_datetime(
-                "{0} {1}".format(start_date.strftime("%Y-%m-%d"), start_time)
-            )
-            end_time = get_datetime(
-                "{0} {1}".format(start_date.strftime("%Y-%m-%d"), end_time)
-            )
-            hours_count[key] = get_hours_count(start_time, end_time)
-            time_slot_wise_total_count[key] = (
-                time_slot_wise_total_count.get(key, 0) + hours_count[key]
-            )
-
-        if hours_count:
-            data.append(hours_count)
-
-        start_date = add_to_date(start_date, days=1)
+    time_slot_wise_total_count = dict.fromkeys(TIME_SLOTS, 0)
+    for offset in range(date_diff(filters.to_date, start_date) + 1):
+        date = add_days(start_date, offset)
+        hours_count = {"date": date}
+        for slot, label in enumerate(TIME_SLOTS):
+            hours_count[label] = counts.get((date, slot), 0)
+            time_slot_wise_total_count[label] += hours_count[label]
+        data.append(hours_count)
 
     return data, time_slot_wise_total_count
 
 
-def get_hours_count(start_time, end_time):
-    data = (
-        frappe.db.sql(
-            """ select count(*) from `tabIssue` where creation
-		between %(start_time)s and %(end_time)s""",
-            {"start_time": start_time, "end_time": end_time},
-            as_list=1,
-        )
-        or []
-    )
-
-    return data[0][0] if len(data) > 0 else 0
-
-
 def get_columns():
     columns = [
         {"fieldname": "date", "label": _("Date"), "fieldtype": "Date", "width": 100}
     ]
 
-    for label in [
-        "12AM - 3AM",
-        "3AM - 6AM",
-        "6AM - 9AM",
-        "9AM - 12PM",
-        "12PM - 3PM",
-        "3PM - 6PM",
-        "6PM - 9PM",
-        "9PM - 12AM",
-    ]:
+    for label in TIME_SLOTS:
         columns.append(
             {"fieldname": label, "label": _(label), "fieldtype": "Data", "width": 120}
         )
@@ -95,24 +98,49 @@ def get_columns():
 
 
 def get_chart_data(timeslot_wise_count):
-    total_count = []
-    timeslots = [
-        "12AM - 3AM",
-        "3AM - 6AM",
-        "6AM - 9AM",
-        "9AM - 12PM",
-        "12PM - 3PM",
-        "3PM - 6PM",
-        "6PM - 9PM",
-        "9PM - 12AM",
-    ]
+    datasets = [{"values": [timeslot_wise_count.get(slot, 0) for slot in TIME_SLOTS]}]
 
-    datasets = []
-    for data in timeslots:
-        total_count.append(timeslot_wise_count.get(data, 0))
-    datasets.append({"values": total_count})
-
-    # flake8: noqa
-    chart = {"data": {"labels": timeslots, "datasets": datasets}}
+    chart = {"data": {"labels": TIME_SLOTS, "datasets": datasets}}
     chart["type"] = "line"
     return chart
+
+
+def get_heatmap_data(counts):
+    data = []
+    for day, weekday in enumerate(WEEKDAYS):
+        row = {"weekday": _(weekday)}
+        for hour, label in enumerate(HOURS):
+            row[label] = counts.get((day, hour), 0)
+        row["total"] = sum(row[label] for label in HOURS)
+        data.append(row)
+    return data
+
+
+def get_heatmap_columns():
+    columns = [
+        {
+            "fieldname": "weekday",
+            "label": _("Weekday"),
+            "fieldtype": "Data",
+            "width": 110,
+        }
+    ]
+    for label in HOURS:
+        columns.append(
+            {"fieldname": label, "label": label, "fieldtype": "Int", "width": 55}
+        )
+    columns.append(
+        {"fieldname": "total", "label": _("Total"), "fieldtype": "Int", "width": 80}
+    )
+    return columns
+
+
+def get_heatmap_chart(counts):
+    datasets = [
+        {
+            "name": _(weekday),
+            "values": [counts.get((day, hour), 0) for hour in range(24)],
+        }
+        for day, weekday in enumerate(WEEKDAYS)
+    ]
+    return {"data": {"labels": HOURS, "datasets": datasets}, "type": "line"}
@@ -0,0 +1,39 @@
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import get_datetime, getdate
+
+from helpdesk.helpdesk.report.support_hour_distribution.support_hour_distribution import (
+    execute,
+)
+from helpdesk.test_utils import make_ticket
+
+
+class TestSupportHourDistribution(FrappeTestCase):
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def make_ticket_at(self, creation):
+        ticket = make_ticket()
+        ticket.db_set("creation", get_datetime(creation), update_modified=False)
+
+    def test_time_slots_and_hour_of_week(self):
+        # 2001-01-01 was a Monday; nothing else is created on these days
+        self.make_ticket_at("2001-01-01 01:30:00")
+        self.make_ticket_at("2001-01-01 22:15:00")
+        self.make_ticket_at("2001-01-02 22:45:00")
+        filters = {"from_date": "2001-01-01", "to_date": "2001-01-03"}
+
+        _, data, _, chart = execute(dict(filters))
+        self.assertEqual(
+            [row["date"] for row in data],
+            [getdate("2001-01-0%d" % d) for d in (1, 2, 3)],
+        )
+        self.assertEqual(data[0]["12AM - 3AM"], 1)
+        self.assertEqual(data[0]["9PM - 12AM"], 1)
+        self.assertEqual(data[1]["9PM - 12AM"], 1)
+        self.assertEqual(sum(chart["data"]["datasets"][0]["values"]), 3)
+
+        _, data, _, _ = execute({**filters, "mode": "Hour of Week"})
+        monday, tuesday = data[0], data[1]
+        self.assertEqual((monday["01"], monday["22"], monday["total"]), (1, 1, 2))
+        self.assertEqual((tuesday["22"], tuesday["total"]), (1, 1))
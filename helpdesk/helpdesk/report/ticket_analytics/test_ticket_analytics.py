@@ -1,7 +1,61 @@
 from __future__ import unicode_literals
 
-import unittest
+import frappe
+from frappe.tests.utils import FrappeTestCase
 
+from helpdesk.helpdesk.report.ticket_analytics.ticket_analytics import execute
+from helpdesk.test_utils import make_ticket
 
-class TestTicketAnalytics(unittest.TestCase):
-    pass
+
+class TestTicketAnalytics(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.ticket_type = f"Analytics {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Ticket Type", "name": self.ticket_type}).insert(
+            ignore_permissions=True
+        )
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def make_ticket_on(self, opening_date):
+        ticket = make_ticket(ticket_type=self.ticket_type)
+        ticket.db_set("opening_date", opening_date, update_modified=False)
+
+    def run_report(self, range, from_date="2001-01-01", to_date="2002-12-31"):
+        filters = {
+            "based_on": "Ticket Type",
+            "range": range,
+            "from_date": from_date,
+            "to_date": to_date,
+        }
+        columns, data = execute(filters)[:2]
+        (row,) = [r for r in data if r["ticket_type"] == self.ticket_type]
+        return columns, row
+
+    def test_periods_cover_the_whole_range(self):
+        self.make_ticket_on("2001-01-03")
+        self.make_ticket_on("2001-01-05")
+        self.make_ticket_on("2002-11-20")
+
+        columns, row = self.run_report("Weekly")
+        # Two years of weeks, no 52 period cap
+        self.assertEqual(len(columns), 2 + 105)
+        self.assertEqual(row["week_1_2001"], 2)
+        self.assertEqual(row["week_47_2002"], 1)
+        self.assertEqual(row["total"], 3)
+
+        columns, row = self.run_report("Quarterly")
+        self.assertEqual(len(columns), 2 + 8)
+        self.assertEqual((row["quarter_1_2001"], row["quarter_4_2002"]), (2, 1))
+
+    def test_week_of_the_next_iso_year_gets_its_year(self):
+        self.make_ticket_on("2002-01-02")
+        self.make_ticket_on("2002-12-31")
+
+        columns, row = self.run_report("Weekly", "2002-01-01", "2002-12-31")
+        labels = [c["label"] for c in columns[1:-1]]
+        self.assertEqual(len(labels), len(set(labels)))
+        # 2002-12-30 starts ISO week 1 of 2003
+        self.assertEqual((labels[0], labels[-1]), ("Week 1", "Week 1 2003"))
+        self.assertEqual((row["week_1"], row["week_1_2003"]), (1, 1))
@@ -31,9 +31,11 @@ frappe.query_reports["Ticket Analytics"] = {
       label: __("Range"),
       fieldtype: "Select",
       options: [
+        { value: "Daily", label: __("Daily") },
         { value: "Weekly", label: __("Weekly") },
         { value: "Monthly", label: __("Monthly") },
         { value: "Quarterly", label: __("Quarterly") },
+        { value: "Half-Yearly", label: __("Half-Yearly") },
         { value: "Yearly", label: __("Yearly") },
       ],
       default: "Weekly",
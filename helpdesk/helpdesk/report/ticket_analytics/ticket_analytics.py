@@ -3,19 +3,44 @@
 
 from __future__ import unicode_literals
 
-import json
-from datetime import date
-
 import frappe
 from frappe import _, scrub
-from frappe.utils import add_days, add_to_date, flt, getdate
+from frappe.utils import add_days, add_months, flt, getdate
 from six import iteritems
 
-
-def get_fiscal_year():
-    # TODO: handle this function properly
-    today_date = date.today()
-    return today_date
+from helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee import (
+    assigned_tickets_condition,
+)
+
+FIELD_MAP = {
+    "Contact": "contact",
+    "Ticket Type": "ticket_type",
+    "Ticket Priority": "priority",
+}
+MONTHS = [
+    "Jan",
+    "Feb",
+    "Mar",
+    "Apr",
+    "May",
+    "Jun",
+    "Jul",
+    "Aug",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dec",
+]
+# Range -> SQL expression for the first day of the period containing `d`
+PERIOD_START_SQL = {
+    "Daily": "{d}",
+    "Weekly": "DATE_SUB({d}, INTERVAL WEEKDAY({d}) DAY)",
+    "Monthly": "DATE_SUB({d}, INTERVAL (DAYOFMONTH({d}) - 1) DAY)",
+    "Quarterly": "MAKEDATE(YEAR({d}), 1) + INTERVAL (QUARTER({d}) - 1) QUARTER",
+    "Half-Yearly": "MAKEDATE(YEAR({d}), 1) + INTERVAL IF(MONTH({d}) > 6, 6, 0) MONTH",
+    "Yearly": "MAKEDATE(YEAR({d}), 1)",
+}
+MONTHS_PER_PERIOD = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}
 
 
 def execute(filters=None):
@@ -26,6 +51,8 @@ class TicketAnalytics:
     def __init__(self, filters=None):
         """Ticket Analytics Report"""
         self.filters = frappe._dict(filters or {})
+        if self.filters.range not in PERIOD_START_SQL:
+            self.filters.range = "Weekly"
         self.get_period_date_ranges()
 
     def run(self):
@@ -82,8 +109,8 @@ class TicketAnalytics:
                 }
             )
 
-        for end_date in self.periodic_daterange:
-            period = self.get_period(end_date)
+        for start_date in self.periodic_daterange:
+            period = self.get_period(start_date)
             self.columns.append(
                 {
                     "label": _(period),
@@ -103,106 +130,72 @@ class TicketAnalytics:
         )
 
     def get_data(self):
-        self.get_tickets()
         self.get_rows()
 
     def get_period(self, date):
-        months = [
-            "Jan",
-            "Feb",
-            "Mar",
-            "Apr",
-            "May",
-            "Jun",
-            "Jul",
-            "Aug",
-            "Sep",
-            "Oct",
-            "Nov",
-            "Dec",
-        ]
-
-        if self.filters.range == "Weekly":
-            period = "Week " + str(date.isocalendar()[1])
+        year = date.year
+        if self.filters.range == "Daily":
+            return "{0:02d} {1} {2}".format(date.day, MONTHS[date.month - 1], year)
+        elif self.filters.range == "Weekly":
+            # Weeks start on Monday, so the ISO week and year of the start date
+            year, week = date.isocalendar()[:2]
+            period = "Week " + str(week)
         elif self.filters.range == "Monthly":
-            period = str(months[date.month - 1])
+            period = MONTHS[date.month - 1]
         elif self.filters.range == "Quarterly":
             period = "Quarter " + str(((date.month - 1) // 3) + 1)
+        elif self.filters.range == "Half-Yearly":
+            period = "Half " + str(((date.month - 1) // 6) + 1)
         else:
-            year = get_fiscal_year()
-            period = str(year)
+            return str(year)
 
-        if (
-            getdate(self.filters.from_date).year != getdate(self.filters.to_date).year
-            and self.filters.range != "Yearly"
-        ):
-            period += " " + str(date.year)
+        # The last week of a year can belong to the next ISO year ("Week 1")
+        from_year = getdate(self.filters.from_date).year
+        if from_year != getdate(self.filters.to_date).year or year != from_year:
+            period += " " + str(year)
 
         return period
 
-    def get_period_date_ranges(self):
-        from dateutil.relativedelta import MO, relativedelta
-
-        from_date, to_date = getdate(self.filters.from_date), getdate(
-            self.filters.to_date
-        )
-
-        increment = {"Monthly": 1, "Quarterly": 3, "Half-Yearly": 6, "Yearly": 12}.get(
-            self.filters.range, 1
-        )
+    def get_period_start(self, date):
+        date = getdate(date)
+        if self.filters.range == "Daily":
+            return date
+        if self.filters.range == "Weekly":
+            return add_days(date, -date.weekday())
+        months = MONTHS_PER_PERIOD[self.filters.range]
+        return date.replace(month=(date.month - 1) // months * months + 1, day=1)
 
-        if self.filters.range in ["Monthly", "Quarterly"]:
-            from_date = from_date.replace(day=1)
-        elif self.filters.range == "Yearly":
-            from_date = get_fiscal_year()
-        else:
-            from_date = from_date + relativedelta(from_date, weekday=MO(-1))
+    def get_period_date_ranges(self):
+        """First day of every period overlapping the date range, without a cap."""
+        to_date = getdate(self.filters.to_date)
+        start = self.get_period_start(self.filters.from_date)
 
         self.periodic_daterange = []
-        for dummy in range(1, 53):
-            if self.filters.range == "Weekly":
-                period_end_date = add_days(from_date, 6)
+        while start <= to_date:
+            self.periodic_daterange.append(start)
+            if self.filters.range == "Daily":
+                start = add_days(start, 1)
+            elif self.filters.range == "Weekly":
+                start = add_days(start, 7)
             else:
-                period_end_date = add_to_date(from_date, months=increment, days=-1)
-            if self.filters.range == "Yearly" or period_end_date > to_date:
-                period_end_date = to_date
-
-            self.periodic_daterange.append(period_end_date)
-
-            from_date = add_days(period_end_date, 1)
-            if period_end_date == to_date:
-                break
-
-    def get_tickets(self):
-        filters = self.get_common_filters()
-        self.field_map = {
-            "Contact": "contact",
-            "Ticket Type": "ticket_type",
-            "Ticket Priority": "priority",
-            "Assigned To": "_assign",
-        }
-
-        self.entries = frappe.db.get_all(
-            "HD Ticket",
-            fields=[self.field_map.get(self.filters.based_on), "name", "opening_date"],
-            filters=filters,
-        )
+                start = add_months(start, MONTHS_PER_PERIOD[self.filters.range])
 
-    def get_common_filters(self):
-        filters = {}
-        filters["opening_date"] = (
-            "between",
-            [self.filters.from_date, self.filters.to_date],
-        )
+    def get_conditions(self):
+        """WHERE clause and values for the report filters."""
+        conditions = ["t.opening_date BETWEEN %(from_date)s AND %(to_date)s"]
+        values = {"from_date": self.filters.from_date, "to_date": self.filters.to_date}
 
         if self.filters.get("assigned_to"):
-            filters["_assign"] = ("like", "%" + self.filters.get("assigned_to") + "%")
+            conditions.append(
+                assigned_tickets_condition(self.filters.get("assigned_to"), "t.name")
+            )
 
         for entry in ["status", "priority", "contact"]:
             if self.filters.get(entry):
-                filters[entry] = self.filters.get(entry)
+                conditions.append(f"t.{entry} = %({entry})s")
+                values[entry] = self.filters.get(entry)
 
-        return filters
+        return " AND ".join(conditions), values
 
     def get_rows(self):
         self.data = []
@@ -219,8 +212,8 @@ class TicketAnalytics:
                 row = {"priority": entity}
 
             total = 0
-            for end_date in self.periodic_daterange:
-                period = self.get_period(end_date)
+            for start_date in self.periodic_daterange:
+                period = self.get_period(start_date)
                 amount = flt(period_data.get(period, 0.0))
                 row[scrub(period)] = amount
                 total += amount
@@ -230,29 +223,39 @@ class TicketAnalytics:
             self.data.append(row)
 
     def get_periodic_data(self):
-        self.ticket_periodic_data = frappe._dict()
-
-        for d in self.entries:
-            period = self.get_period(d.get("opening_date"))
-
-            if self.filters.based_on == "Assigned To":
-                if d._assign:
-                    for entry in json.loads(d._assign):
-                        self.ticket_periodic_data.setdefault(
-                            entry, frappe._dict()
-                        ).setdefault(period, 0.0)
-                        self.ticket_periodic_data[entry][period] += 1
+        """
+        Tickets are counted per (entity, period) by the database: the period
+        start is computed with SQL date functions on `opening_date`, so the
+        result has one row per entity and period whatever the ticket count.
+        """
+        conditions, values = self.get_conditions()
+        if self.filters.based_on == "Assigned To":
+            entity = "a.agent"
+            join = """
+                JOIN `tabHD Ticket Assignee` a
+                    ON a.ticket = t.name AND a.unassigned_on IS NULL"""
+        else:
+            entity = "t.{0}".format(FIELD_MAP.get(self.filters.based_on))
+            join = ""
+        period_start = PERIOD_START_SQL[self.filters.range].format(d="t.opening_date")
+
+        rows = frappe.db.sql(
+            f"""
+            SELECT {entity} AS entity, {period_start} AS period_start, COUNT(*) AS count
+            FROM `tabHD Ticket` t {join}
+            WHERE {conditions}
+            GROUP BY entity, period_start
+            """,
+            values,
+            as_dict=1,
+        )
 
-            else:
-                field = self.field_map.get(self.filters.based_on)
-                value = d.get(field)
-                if not value:
-                    value = _("Not Specified")
-
-                self.ticket_periodic_data.setdefault(value, frappe._dict()).setdefault(
-                    period, 0.0
-                )
-                self.ticket_periodic_data[value][period] += 1
+        self.ticket_periodic_data = frappe._dict()
+        for row in rows:
+            value = row.entity or _("Not Specified")
+            period = self.get_period(getdate(row.period_start))
+            data = self.ticket_periodic_data.setdefault(value, frappe._dict())
+            data[period] = data.get(period, 0.0) + row.count
 
     def get_chart_data(self):
         length = len(self.columns)
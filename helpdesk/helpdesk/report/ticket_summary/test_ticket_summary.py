@@ -0,0 +1,50 @@
+import frappe
+from frappe.desk.form.assign_to import add as add_assignment
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import nowdate
+
+from helpdesk.helpdesk.report.ticket_summary.ticket_summary import execute
+from helpdesk.test_utils import make_ticket
+
+
+class TestTicketSummary(FrappeTestCase):
+    def setUp(self):
+        frappe.set_user("Administrator")
+        self.ticket_type = f"Summary {frappe.generate_hash(length=6)}"
+        frappe.get_doc({"doctype": "HD Ticket Type", "name": self.ticket_type}).insert(
+            ignore_permissions=True
+        )
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def run_report(self, based_on):
+        filters = {
+            "based_on": based_on,
+            "from_date": nowdate(),
+            "to_date": nowdate(),
+            "ticket_type": self.ticket_type,
+        }
+        return execute(filters)[1]
+
+    def test_grouped_counts_and_averages(self):
+        first = make_ticket(ticket_type=self.ticket_type)
+        second = make_ticket(ticket_type=self.ticket_type)
+        first.db_set("first_response_time", 100, update_modified=False)
+        second.db_set(
+            {"status": "Resolved", "first_response_time": 300}, update_modified=False
+        )
+        add_assignment(
+            {"doctype": "HD Ticket", "name": first.name, "assign_to": ["Administrator"]}
+        )
+
+        (row,) = self.run_report("Ticket Type")
+        self.assertEqual(row["ticket_type"], self.ticket_type)
+        self.assertEqual(
+            (row["open"], row["resolved"], row["total_tickets"]), (1, 1, 2)
+        )
+        self.assertEqual(row["avg_first_response_time"], 200)
+
+        (row,) = self.run_report("Assigned To")
+        self.assertEqual((row["user"], row["total_tickets"]), ("Administrator", 1))
+        self.assertEqual(row["avg_first_response_time"], 100)
@@ -3,13 +3,29 @@
 
 from __future__ import unicode_literals
 
-import json
-
 import frappe
 from frappe import _, scrub
 from frappe.utils import flt
 from six import iteritems
 
+from helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee import (
+    assigned_tickets_condition,
+)
+
+FIELD_MAP = {
+    "Contact": "contact",
+    "Ticket Type": "ticket_type",
+    "Ticket Priority": "priority",
+}
+# Report column -> HD Ticket field it averages
+METRIC_FIELDS = {
+    "avg_response_time": "avg_response_time",
+    "avg_first_response_time": "first_response_time",
+    "avg_hold_time": "total_hold_time",
+    "avg_resolution_time": "resolution_time",
+    "avg_user_resolution_time": "user_resolution_time",
+}
+
 
 def execute(filters=None):
     return TicketSummary(filters).run()
@@ -129,50 +145,24 @@ class TicketSummary:
             )
 
     def get_data(self):
-        self.get_tickets()
         self.get_rows()
 
-    def get_tickets(self):
-        filters = self.get_common_filters()
-        self.field_map = {
-            "Contact": "contact",
-            "Ticket Type": "ticket_type",
-            "Ticket Priority": "priority",
-            "Assigned To": "_assign",
-        }
-
-        self.entries = frappe.db.get_all(
-            "HD Ticket",
-            fields=[
-                self.field_map.get(self.filters.based_on),
-                "name",
-                "opening_date",
-                "status",
-                "avg_response_time",
-                "first_response_time",
-                "total_hold_time",
-                "user_resolution_time",
-                "resolution_time",
-                "agreement_status",
-            ],
-            filters=filters,
-        )
-
-    def get_common_filters(self):
-        filters = {}
-        filters["opening_date"] = (
-            "between",
-            [self.filters.from_date, self.filters.to_date],
-        )
+    def get_conditions(self):
+        """WHERE clause and values for the report filters."""
+        conditions = ["t.opening_date BETWEEN %(from_date)s AND %(to_date)s"]
+        values = {"from_date": self.filters.from_date, "to_date": self.filters.to_date}
 
         if self.filters.get("assigned_to"):
-            filters["_assign"] = ("like", "%" + self.filters.get("assigned_to") + "%")
+            conditions.append(
+                assigned_tickets_condition(self.filters.get("assigned_to"), "t.name")
+            )
 
         for entry in ["status", "priority", "contact", "ticket_type"]:
             if self.filters.get(entry):
-                filters[entry] = self.filters.get(entry)
+                conditions.append(f"t.{entry} = %({entry})s")
+                values[entry] = self.filters.get(entry)
 
-        return filters
+        return " AND ".join(conditions), values
 
     def get_rows(self):
         self.data = []
@@ -205,147 +195,56 @@ class TicketSummary:
             self.data.append(row)
 
     def get_summary_data(self):
-        self.ticket_summary_data = frappe._dict()
-
-        for d in self.entries:
-            status = d.status
-            agreement_status = scrub(d.agreement_status)
-
-            if self.filters.based_on == "Assigned To":
-                if d._assign:
-                    for entry in json.loads(d._assign):
-                        self.ticket_summary_data.setdefault(
-                            entry, frappe._dict()
-                        ).setdefault(status, 0.0)
-                        self.ticket_summary_data.setdefault(
-                            entry, frappe._dict()
-                        ).setdefault(agreement_status, 0.0)
-                        self.ticket_summary_data.setdefault(
-                            entry, frappe._dict()
-                        ).setdefault("total_tickets", 0.0)
-                        self.ticket_summary_data[entry][status] += 1
-                        self.ticket_summary_data[entry][agreement_status] += 1
-                        self.ticket_summary_data[entry]["total_tickets"] += 1
-
-            else:
-                field = self.field_map.get(self.filters.based_on)
-                value = d.get(field)
-                if not value:
-                    value = _("Not Specified")
-
-                self.ticket_summary_data.setdefault(value, frappe._dict()).setdefault(
-                    status, 0.0
-                )
-                self.ticket_summary_data.setdefault(value, frappe._dict()).setdefault(
-                    agreement_status, 0.0
-                )
-                self.ticket_summary_data.setdefault(value, frappe._dict()).setdefault(
-                    "total_tickets", 0.0
-                )
-                self.ticket_summary_data[value][status] += 1
-                self.ticket_summary_data[value][agreement_status] += 1
-                self.ticket_summary_data[value]["total_tickets"] += 1
-
-        self.get_metrics_data()
-
-    def get_metrics_data(self):
-        ticket = []
-
-        metrics_list = [
-            "avg_response_time",
-            "avg_first_response_time",
-            "avg_hold_time",
-            "avg_resolution_time",
-            "avg_user_resolution_time",
-        ]
+        """
+        Counts and metric totals per (entity, status, SLA status) come from one
+        grouped query, so memory grows with the number of entities rather than
+        with the number of tickets in the range.
+        """
+        conditions, values = self.get_conditions()
+        assigned_to = self.filters.based_on == "Assigned To"
+        if assigned_to:
+            entity = "a.agent"
+            join = """
+                JOIN `tabHD Ticket Assignee` a
+                    ON a.ticket = t.name AND a.unassigned_on IS NULL"""
+        else:
+            entity = "t.{0}".format(FIELD_MAP.get(self.filters.based_on))
+            join = ""
+
+        metric_columns = ", ".join(
+            f"SUM(t.{field}) AS sum_{field}, COUNT(t.{field}) AS count_{field}"
+            for field in METRIC_FIELDS.values()
+        )
+        rows = frappe.db.sql(
+            f"""
+            SELECT
+                {entity} AS entity, t.status, t.agreement_status,
+                COUNT(*) AS tickets, {metric_columns}
+            FROM `tabHD Ticket` t {join}
+            WHERE {conditions}
+            GROUP BY {entity}, t.status, t.agreement_status
+            """,
+            values,
+            as_dict=1,
+        )
 
-        for entry in self.entries:
-            ticket.append(entry.name)
-
-        field = self.field_map.get(self.filters.based_on)
-
-        if ticket:
-            if self.filters.based_on == "Assigned To":
-                assignment_map = frappe._dict()
-                for d in self.entries:
-                    if d._assign:
-                        for entry in json.loads(d._assign):
-                            for metric in metrics_list:
-                                self.ticket_summary_data.setdefault(
-                                    entry, frappe._dict()
-                                ).setdefault(metric, 0.0)
-
-                            self.ticket_summary_data[entry]["avg_response_time"] += (
-                                d.get("avg_response_time") or 0.0
-                            )
-                            self.ticket_summary_data[entry][
-                                "avg_first_response_time"
-                            ] += (d.get("first_response_time") or 0.0)
-                            self.ticket_summary_data[entry]["avg_hold_time"] += (
-                                d.get("total_hold_time") or 0.0
-                            )
-                            self.ticket_summary_data[entry]["avg_resolution_time"] += (
-                                d.get("resolution_time") or 0.0
-                            )
-                            self.ticket_summary_data[entry][
-                                "avg_user_resolution_time"
-                            ] += (d.get("user_resolution_time") or 0.0)
-
-                            if not assignment_map.get(entry):
-                                assignment_map[entry] = 0
-                            assignment_map[entry] += 1
-
-                for entry in assignment_map:
-                    for metric in metrics_list:
-                        self.ticket_summary_data[entry][metric] /= flt(
-                            assignment_map.get(entry)
-                        )
-
-            else:
-                data = frappe.db.sql(
-                    """
-					SELECT
-						{0}, AVG(first_response_time) as avg_frt,
-						AVG(avg_response_time) as avg_resp_time,
-						AVG(total_hold_time) as avg_hold_time,
-						AVG(resolution_time) as avg_resolution_time,
-						AVG(user_resolution_time) as avg_user_resolution_time
-					FROM `tabHD Ticket`
-					WHERE
-						name IN %(ticket)s
-					GROUP BY {0}
-				""".format(
-                        field
-                    ),
-                    {"ticket": ticket},
-                    as_dict=1,
-                )
-
-                for entry in data:
-                    value = entry.get(field)
-                    if not value:
-                        value = _("Not Specified")
-
-                    for metric in metrics_list:
-                        self.ticket_summary_data.setdefault(
-                            value, frappe._dict()
-                        ).setdefault(metric, 0.0)
-
-                    self.ticket_summary_data[value]["avg_response_time"] = (
-                        entry.get("avg_resp_time") or 0.0
-                    )
-                    self.ticket_summary_data[value]["avg_first_response_time"] = (
-                        entry.get("avg_frt") or 0.0
-                    )
-                    self.ticket_summary_data[value]["avg_hold_time"] = (
-                        entry.get("avg_hold_time") or 0.0
-                    )
-                    self.ticket_summary_data[value]["avg_resolution_time"] = (
-                        entry.get("avg_resolution_time") or 0.0
-                    )
-                    self.ticket_summary_data[value]["avg_user_resolution_time"] = (
-                        entry.get("avg_user_resolution_time") or 0.0
-                    )
+        self.ticket_summary_data = frappe._dict()
+        totals = {}
+        for row in rows:
+            value = row.entity or _("Not Specified")
+            data = self.ticket_summary_data.setdefault(value, frappe._dict())
+            agreement_status = scrub(row.agreement_status)
+            for key in (row.status, agreement_status, "total_tickets"):
+                data[key] = data.get(key, 0.0) + row.tickets
+
+            for metric, field in METRIC_FIELDS.items():
+                total = totals.setdefault((value, metric), [0.0, 0])
+                total[0] += row.get(f"sum_{field}") or 0.0
+                # Per assignee, tickets without a value count as zero
+                total[1] += row.tickets if assigned_to else row.get(f"count_{field}")
+
+        for (value, metric), (total, count) in totals.items():
+            self.ticket_summary_data[value][metric] = total / count if count else 0.0
 
     def get_chart_data(self):
         self.chart = []
@@ -357,7 +256,7 @@ class TicketSummary:
         closed_tickets = []
 
         entity = self.filters.based_on
-        entity_field = self.field_map.get(entity)
+        entity_field = FIELD_MAP.get(entity)
         if entity == "Assigned To":
             entity_field = "user"
 
@@ -0,0 +1,138 @@
+"""
+Read-only, typed snapshots of the helpdesk settings singletons.
+
+Hot paths (ticket hooks, list permission queries, the ingest API, license
+checks) read a handful of settings fields per call. Loading the full single
+document, or issuing one `get_single_value` query per field, is wasteful for
+values that change a few times a year.
+
+A snapshot is built once per process from `tabSingles` and reused while the
+singleton's `modified` is unchanged. Both `save()` and
+`frappe.db.set_single_value` move `modified`, so every worker sees a write as
+soon as its transaction can, and forgets a rolled back one, for the price of
+one indexed `tabSingles` lookup per read.
+
+Usage:
+
+    from helpdesk.helpdesk.utils.settings_snapshot import get_hd_settings
+
+    if get_hd_settings().restrict_tickets_by_agent_group:
+        ...
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+import frappe
+from frappe.model import no_value_fields
+from frappe.query_builder import DocType
+from frappe.utils import cint, flt, get_datetime, getdate
+
+HD_SETTINGS = "HD Settings"
+AI_SETTINGS = "HelpdeskAI Settings"
+
+INT_FIELDTYPES = ("Check", "Int")
+FLOAT_FIELDTYPES = ("Float", "Currency", "Percent", "Duration")
+# Secrets stay behind `get_password`; layout and table fields carry no value
+SKIP_FIELDTYPES = (*no_value_fields, "Password")
+
+# (site, doctype) -> (version, snapshot)
+_snapshots: dict[tuple[str, str], tuple[str, "SettingsSnapshot"]] = {}
+
+
+class SettingsSnapshot(Mapping):
+    """Immutable view of a single doctype with values coerced by fieldtype.
+
+    Fields are available as attributes and through the mapping interface.
+    Unknown attributes raise `AttributeError`, so `getattr(st, f, default)`
+    keeps working as it does with a `Document`.
+    """
+
+    __slots__ = ("doctype", "_values")
+
+    def __init__(self, doctype: str, values: dict[str, Any]):
+        object.__setattr__(self, "doctype", doctype)
+        object.__setattr__(self, "_values", values)
+
+    def __getattr__(self, fieldname: str) -> Any:
+        try:
+            return self._values[fieldname]
+        except KeyError:
+            raise AttributeError(f"{self.doctype} has no field {fieldname}") from None
+
+    def __setattr__(self, key, value):
+        raise AttributeError(f"{self.doctype} snapshot is read-only")
+
+    def __getitem__(self, fieldname: str) -> Any:
+        return self._values[fieldname]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __repr__(self) -> str:
+        return f"<SettingsSnapshot {self.doctype}>"
+
+
+def _coerce(fieldtype: str, value: Any) -> Any:
+    if fieldtype in INT_FIELDTYPES:
+        return cint(value)
+    if fieldtype in FLOAT_FIELDTYPES:
+        return flt(value)
+    if value in (None, ""):
+        return None
+    if fieldtype == "Datetime":
+        return get_datetime(value)
+    if fieldtype == "Date":
+        return getdate(value)
+    return value
+
+
+def _load(doctype: str) -> SettingsSnapshot:
+    stored = frappe.db.get_singles_dict(doctype)
+    values = {}
+    for df in frappe.get_meta(doctype).fields:
+        if df.fieldtype in SKIP_FIELDTYPES or not df.fieldname:
+            continue
+        value = stored.get(df.fieldname)
+        # Never-saved fields fall back to the doctype default, like a new doc would
+        if value is None and df.default is not None:
+            value = df.default
+        values[df.fieldname] = _coerce(df.fieldtype, value)
+    return SettingsSnapshot(doctype, values)
+
+
+def _get_version(doctype: str) -> str | None:
+    Singles = DocType("Singles")
+    version = (
+        frappe.qb.from_(Singles)
+        .select(Singles.value)
+        .where((Singles.doctype == doctype) & (Singles.field == "modified"))
+        .run()
+    )
+    return version[0][0] if version else None
+
+
+def get_settings(doctype: str) -> SettingsSnapshot:
+    """Snapshot of `doctype`, rebuilt only after the singleton was written."""
+    version = _get_version(doctype)
+    key = (frappe.local.site, doctype)
+    cached = _snapshots.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    snapshot = _load(doctype)
+    _snapshots[key] = (version, snapshot)
+    return snapshot
+
+
+def get_hd_settings() -> SettingsSnapshot:
+    return get_settings(HD_SETTINGS)
+
+
+def get_ai_settings() -> SettingsSnapshot:
+    return get_settings(AI_SETTINGS)
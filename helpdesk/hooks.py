@@ -31,12 +31,26 @@ scheduler_events = {
         "helpdesk.search.download_corpus",
     ],
     "daily": [
-        "helpdesk.helpdesk.doctype.hd_ticket.hd_ticket.close_tickets_after_n_days"
+        "helpdesk.helpdesk.doctype.hd_ticket.hd_ticket.close_tickets_after_n_days",
+        "helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox.clear_sent_events",
+        "helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster.rebuild",
+        "helpdesk.helpdesk.doctype.ai_interaction_log.ai_interaction_log.archive_old_logs",
+        "helpdesk.helpdesk.doctype.hd_ticket_daily_rollup.hd_ticket_daily_rollup.rebuild",
+        "helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch.rebuild",
     ],
     "hourly": [
         "helpdesk.api.license.validate_and_update"
 
     ],
+    "cron": {
+        "* * * * *": [
+            "helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox.dispatch",
+            "helpdesk.api.ai_log.flush",
+        ],
+        "*/5 * * * *": [
+            "helpdesk.api.dashboard.prewarm_cache",
+        ],
+    },
 }
 
 website_route_rules = [
@@ -56,6 +70,39 @@ doc_events = {
     "Assignment Rule": {
         "on_trash": "helpdesk.extends.assignment_rule.on_assignment_rule_trash",
     },      
+    "HD Ticket": {
+        "on_update": [
+            "helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox.record_ticket_event",
+            "helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster.on_ticket_update",
+            "helpdesk.helpdesk.doctype.hd_ticket_daily_rollup.hd_ticket_daily_rollup.on_ticket_update",
+            "helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch.on_ticket_update",
+            "helpdesk.api.dashboard.invalidate_cache",
+        ],
+        "on_trash": [
+            "helpdesk.helpdesk.doctype.hd_event_outbox.hd_event_outbox.record_ticket_event",
+            "helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee.on_ticket_delete",
+            "helpdesk.api.dashboard.invalidate_cache",
+        ],
+        "after_delete": [
+            "helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster.on_ticket_delete",
+            "helpdesk.helpdesk.doctype.hd_ticket_daily_rollup.hd_ticket_daily_rollup.on_ticket_delete",
+            "helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch.on_ticket_delete",
+        ],
+    },
+    "ToDo": {
+        "after_insert": "helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee.sync_from_todo",
+        "on_update": "helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee.sync_from_todo",
+        "on_trash": "helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee.on_todo_trash",
+    },
+    "HD Team": {
+        "on_update": "helpdesk.api.ingest.invalidate_catalog",
+        "after_rename": "helpdesk.api.ingest.invalidate_catalog",
+        "on_trash": "helpdesk.api.ingest.invalidate_catalog",
+    },
+    "HD Team Member": {
+        "on_update": "helpdesk.api.ingest.invalidate_catalog",
+        "on_trash": "helpdesk.api.ingest.invalidate_catalog",
+    },
     
 }
 
@@ -77,8 +124,12 @@ override_doctype_class = {
 }
 
 ignore_links_on_delete = [
+    "HD Event Outbox",
     "HD Notification",
     "HD Ticket Comment",
+    # Rollup rows keep history for teams, priorities and types deleted later
+    "HD Ticket Daily Rollup",
+    "HD Ticket Time Sketch",
 ]
 
 # 5) Desk tarafına global CSS enjekte
@@ -0,0 +1,5 @@
+from helpdesk.helpdesk.doctype.hd_ticket_assignee.hd_ticket_assignee import rebuild
+
+
+def execute():
+    rebuild()
@@ -0,0 +1,6 @@
+from helpdesk.helpdesk.doctype.hd_ticket_cluster.hd_ticket_cluster import rebuild_all
+
+
+def execute():
+    # The scheduled rebuild only repairs the last days
+    rebuild_all()
@@ -0,0 +1,11 @@
+import frappe
+
+from helpdesk.helpdesk.doctype.hd_ticket_daily_rollup.hd_ticket_daily_rollup import (
+    rebuild,
+)
+
+
+def execute():
+    first = frappe.db.get_value("HD Ticket", {}, "min(creation)")
+    if first:
+        rebuild(from_date=first)
@@ -0,0 +1,11 @@
+import frappe
+
+from helpdesk.helpdesk.doctype.hd_ticket_time_sketch.hd_ticket_time_sketch import (
+    rebuild,
+)
+
+
+def execute():
+    first = frappe.db.get_value("HD Ticket", {}, "min(creation)")
+    if first:
+        rebuild(from_date=first)
@@ -0,0 +1,19 @@
+import frappe
+
+from helpdesk.helpdesk.doctype.problem_ticket.problem_ticket import get_subject_hash
+
+
+def execute():
+    rows = frappe.get_all(
+        "Problem Ticket",
+        filters={"subject_hash": ["is", "not set"]},
+        fields=["name", "subject"],
+    )
+    for row in rows:
+        frappe.db.set_value(
+            "Problem Ticket",
+            row.name,
+            "subject_hash",
+            get_subject_hash(row.subject),
+            update_modified=False,
+        )